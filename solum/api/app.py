@@ -27,7 +27,28 @@ API_SERVICE_OPTS = [
                help='The port for the solum API server'),
     cfg.StrOpt('host',
                default='127.0.0.1',
-               help='The listen IP for the solum API server')
+               help='The listen IP for the solum API server'),
+    cfg.IntOpt('workers',
+               default=1,
+               help='Number of solum API worker processes. With 1 the '
+                    'API is served from the main process; 0 starts one '
+                    'worker per CPU.'),
+    cfg.IntOpt('max_concurrent_requests',
+               default=100,
+               help='Maximum number of requests each API worker serves '
+                    'concurrently.'),
+    cfg.IntOpt('backlog',
+               default=4096,
+               help='Number of connections queued on the listen socket '
+                    'before new ones are refused.'),
+    cfg.IntOpt('tcp_keepidle',
+               default=600,
+               help='Idle time in seconds before TCP keepalive probes are '
+                    'sent on client connections.'),
+    cfg.IntOpt('graceful_shutdown_timeout',
+               default=60,
+               help='Seconds a worker waits for in-flight requests to '
+                    'finish when it is restarted or stopped.'),
 ]
 
 API_PLAN_OPTS = [
@@ -15,6 +15,7 @@
 # under the License.
 
 from solum.api import auth
+from solum.api import database
 from solum.api import release
 
 # Pecan Application Configurations
@@ -23,6 +24,7 @@ app = {
     'modules': ['solum.api'],
     'debug': False,
     'hooks': [auth.AuthInformationHook(),
+              database.SessionScopeHook(),
               release.ReleaseReporter(),
               ]
 }
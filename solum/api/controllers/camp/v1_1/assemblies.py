@@ -35,7 +35,7 @@ class AssembliesController(rest.RestController):
 
         handlr = (assembly_handler.
                   AssemblyHandler(pecan.request.security_context))
-        asem_objs = handlr.get_all()
+        asem_objs = handlr.get_all(columns=['uuid', 'name'])
         a_links = []
         for m in asem_objs:
             a_links.append(common_types.Link(href=uris.ASSEM_URI_STR %
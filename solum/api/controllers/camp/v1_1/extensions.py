@@ -38,7 +38,7 @@ class ExtensionsController(rest.RestController):
 
         handlr = (extension_handler.
                   ExtensionHandler(pecan.request.security_context))
-        ext_objs = handlr.get_all()
+        ext_objs = handlr.get_all(columns=['uuid', 'name'])
         e_links = []
         for m in ext_objs:
             e_links.append(common_types.Link(href=uris.EXTN_URI_STR %
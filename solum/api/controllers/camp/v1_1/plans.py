@@ -27,6 +27,7 @@ import wsmeext.pecan as wsme_pecan
 from solum.api.controllers.camp.v1_1.datamodel import plans as model
 from solum.api.controllers.camp.v1_1 import uris
 from solum.api.controllers import common_types
+from solum.api.controllers import pagination
 from solum.api.handlers import plan_handler as plan_handler
 from solum.common import exception
 from solum.common import yamlutils
@@ -87,14 +88,21 @@ class PlansController(rest.RestController):
         return model.Plan(**plan_dict)
 
     @exception.wrap_wsme_controller_exception
-    @wsme_pecan.wsexpose(model.Plans)
-    def get(self):
+    @wsme_pecan.wsexpose(model.Plans, int, wtypes.text, wtypes.text,
+                         wtypes.text, wtypes.text)
+    def get(self, limit=None, marker=None, sort_key=None, sort_dir=None,
+            name=None):
         puri = uris.PLANS_URI_STR % pecan.request.host_url
         pdef_uri = uris.DEPLOY_PARAMS_URI % pecan.request.host_url
         desc = "Solum CAMP API plans collection resource."
 
+        query = pagination.query_args(limit, marker, sort_key, sort_dir,
+                                      name=name)
+        # The links only need these; leave raw_content in the database.
+        query['columns'] = ['uuid', 'name']
         handler = plan_handler.PlanHandler(pecan.request.security_context)
-        plan_objs = handler.get_all()
+        plan_objs = handler.get_all(**query)
+        pagination.set_next_link(query, plan_objs)
         p_links = []
         for m in plan_objs:
             p_links.append(common_types.Link(href=uris.PLAN_URI_STR %
@@ -33,7 +33,7 @@ class ServicesController(rest.RestController):
         desc = "Solum CAMP API services collection resource."
 
         handlr = service_handler.ServiceHandler(pecan.request.security_context)
-        service_objs = handlr.get_all()
+        service_objs = handlr.get_all(columns=['uuid', 'name'])
         s_links = []
         for m in service_objs:
             s_links.append(common_types.Link(href=uris.SERV_URI_STR %
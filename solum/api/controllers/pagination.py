@@ -0,0 +1,79 @@
+# Copyright 2015 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Paging, filtering and sorting of collection requests.
+
+Collections accept ``limit``, ``marker``, ``sort_key`` and ``sort_dir``
+query parameters plus a few per-resource field filters. When a page is
+full, the URL of the next one is returned in a ``Link: <url>; rel="next"``
+header, so the response bodies keep their existing shape.
+"""
+
+from oslo.config import cfg
+import pecan
+from six.moves.urllib import parse as urlparse
+
+from solum.common import exception
+from solum.openstack.common.gettextutils import _
+
+
+PAGINATION_OPTS = [
+    cfg.IntOpt('max_limit',
+               default=1000,
+               help='Maximum number of items returned in a single page of '
+                    'a collection, whatever limit was requested.'),
+]
+
+cfg.CONF.register_opts(PAGINATION_OPTS, group='api')
+
+
+def query_args(limit=None, marker=None, sort_key=None, sort_dir=None,
+               **filters):
+    """Return the get_all() keyword arguments for a collection request.
+
+    Only the parameters given by the client are included, so a request
+    without any of them lists the whole collection as before.
+    """
+    query = {}
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit <= 0:
+            raise exception.BadRequest(reason=_('limit must be positive.'))
+        query['limit'] = min(limit, cfg.CONF.api.max_limit)
+    if marker is not None:
+        query['marker'] = marker
+    if sort_key is not None:
+        query['sort_key'] = sort_key
+    if sort_dir is not None:
+        query['sort_dir'] = sort_dir
+    filters = dict((k, v) for k, v in filters.items() if v is not None)
+    if filters:
+        query['filters'] = filters
+    return query
+
+
+def set_next_link(query, items, marker_attr='uuid'):
+    """Point the client at the next page when this one is full."""
+    limit = query.get('limit')
+    if limit is None or len(items) < limit:
+        return
+    params = dict(pecan.request.params)
+    params['limit'] = limit
+    params['marker'] = getattr(items[-1], marker_attr)
+    next_url = '%s%s?%s' % (pecan.request.host_url, pecan.request.path,
+                            urlparse.urlencode(sorted(params.items())))
+    pecan.response.headers['Link'] = '<%s>; rel="next"' % next_url
@@ -15,8 +15,10 @@
 import pecan
 from pecan import rest
 import wsme
+from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
 
+from solum.api.controllers import pagination
 from solum.api.controllers.v1.datamodel import assembly
 import solum.api.controllers.v1.userlog as userlog_controller
 from solum.api.handlers import assembly_handler
@@ -108,11 +110,18 @@ class AssembliesController(rest.RestController):
             handler.create(js_data), pecan.request.host_url)
 
     @exception.wrap_wsme_controller_exception
-    @wsme_pecan.wsexpose([assembly.Assembly])
-    def get_all(self):
+    @wsme_pecan.wsexpose([assembly.Assembly], int, wtypes.text, wtypes.text,
+                         wtypes.text, wtypes.text, wtypes.text, wtypes.text)
+    def get_all(self, limit=None, marker=None, sort_key=None, sort_dir=None,
+                status=None, name=None, plan_uuid=None):
         """Return all assemblies, based on the query provided."""
         request.check_request_for_https()
+        query = pagination.query_args(limit, marker, sort_key, sort_dir,
+                                      status=status, name=name,
+                                      plan_uuid=plan_uuid)
         handler = assembly_handler.AssemblyHandler(
             pecan.request.security_context)
+        assemblies = handler.get_all(**query)
+        pagination.set_next_link(query, assemblies)
         return [assembly.Assembly.from_db_model(assm, pecan.request.host_url)
-                for assm in handler.get_all()]
+                for assm in assemblies]
@@ -12,8 +12,10 @@
 
 import pecan
 from pecan import rest
+from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
 
+from solum.api.controllers import pagination
 from solum.api.controllers.v1.datamodel import component
 from solum.api.handlers import component_handler
 from solum.common import exception
@@ -76,10 +78,16 @@ class ComponentsController(rest.RestController):
             pecan.request.host_url)
 
     @exception.wrap_wsme_controller_exception
-    @wsme_pecan.wsexpose([component.Component])
-    def get_all(self):
+    @wsme_pecan.wsexpose([component.Component], int, wtypes.text,
+                         wtypes.text, wtypes.text, wtypes.text, wtypes.text)
+    def get_all(self, limit=None, marker=None, sort_key=None, sort_dir=None,
+                name=None, assembly_uuid=None):
         """Return all components, based on the query provided."""
+        query = pagination.query_args(limit, marker, sort_key, sort_dir,
+                                      name=name, assembly_uuid=assembly_uuid)
         handler = component_handler.ComponentHandler(
             pecan.request.security_context)
+        components = handler.get_all(**query)
+        pagination.set_next_link(query, components)
         return [component.Component.from_db_model(ser, pecan.request.host_url)
-                for ser in handler.get_all()]
+                for ser in components]
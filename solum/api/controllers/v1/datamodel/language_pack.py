@@ -119,6 +119,11 @@ class LanguagePack(api_types.Base):
     lp_metadata = wtypes.text
     """The languagepack meta data."""
 
+    prewarm = bool
+    """Whether every worker fetches the languagepack once it is built.
+    Defaults to True.
+    """
+
     @classmethod
     def from_image(cls, image, host_url):
         as_dict = {}
@@ -127,6 +132,7 @@ class LanguagePack(api_types.Base):
         as_dict['name'] = image['name']
         as_dict['type'] = 'language_pack'
         as_dict['uri'] = '%s/v1/%s/%s' % (host_url, 'language_packs', image_id)
+        as_dict['prewarm'] = image['prewarm']
         image_tags = image['tags']
         comp_versions = []
         run_versions = []
@@ -201,6 +207,7 @@ class LanguagePack(api_types.Base):
                    base_image_id='4dae5a09ef2b4d8cbf3594b0eb4f6b94',
                    created_image_id='4afasa09ef2b4d8cbf3594b0ec4f6b94',
                    image_format='docker',
+                   prewarm=True,
                    language_pack_name='java-1.4-1.7',
                    language_pack_type='org.openstack.solum.Java',
                    language_pack_id='123456789abcdef',
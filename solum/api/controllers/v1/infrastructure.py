@@ -14,8 +14,10 @@
 
 import pecan
 from pecan import rest
+from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
 
+from solum.api.controllers import pagination
 from solum.api.controllers.v1.datamodel import infrastructure
 from solum.api.handlers import infrastructure_handler
 from solum.common import exception
@@ -82,13 +84,19 @@ class InfrastructureStacksController(rest.RestController):
             pecan.request.host_url)
 
     @exception.wrap_wsme_controller_exception
-    @wsme_pecan.wsexpose([infrastructure.InfrastructureStack])
-    def get_all(self):
+    @wsme_pecan.wsexpose([infrastructure.InfrastructureStack], int,
+                         wtypes.text, wtypes.text, wtypes.text, wtypes.text)
+    def get_all(self, limit=None, marker=None, sort_key=None, sort_dir=None,
+                name=None):
         """Return all stacks, based on the query provided."""
+        query = pagination.query_args(limit, marker, sort_key, sort_dir,
+                                      name=name)
         handler = infrastructure_handler.InfrastructureStackHandler(
             pecan.request.security_context)
+        stacks = handler.get_all(**query)
+        pagination.set_next_link(query, stacks)
         return [infrastructure.InfrastructureStack.from_db_model(
-            assm, pecan.request.host_url) for assm in handler.get_all()]
+            assm, pecan.request.host_url) for assm in stacks]
 
 
 class InfrastructureController(rest.RestController):
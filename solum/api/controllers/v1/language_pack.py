@@ -14,8 +14,10 @@
 
 import pecan
 from pecan import rest
+from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
 
+from solum.api.controllers import pagination
 from solum.api.controllers.v1.datamodel import language_pack
 import solum.api.controllers.v1.userlog as userlog_controller
 from solum.api.handlers import language_pack_handler
@@ -81,11 +83,17 @@ class LanguagePacksController(rest.RestController):
                            data.lp_metadata), host_url)
 
     @exception.wrap_wsme_controller_exception
-    @wsme_pecan.wsexpose([language_pack.LanguagePack])
-    def get_all(self):
+    @wsme_pecan.wsexpose([language_pack.LanguagePack], int, wtypes.text,
+                         wtypes.text, wtypes.text, wtypes.text, wtypes.text)
+    def get_all(self, limit=None, marker=None, sort_key=None, sort_dir=None,
+                status=None, name=None):
         """Return all languagepacks, based on the query provided."""
+        query = pagination.query_args(limit, marker, sort_key, sort_dir,
+                                      status=status, name=name)
         handler = language_pack_handler.LanguagePackHandler(
             pecan.request.security_context)
         host_url = pecan.request.host_url
+        images = handler.get_all(**query)
+        pagination.set_next_link(query, images)
         return [language_pack.LanguagePack.from_db_model(img, host_url)
-                for img in handler.get_all()]
+                for img in images]
@@ -15,6 +15,7 @@ from pecan import rest
 from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
 
+from solum.api.controllers import pagination
 from solum.api.controllers.v1.datamodel import operation
 from solum.api.handlers import operation_handler
 from solum.common import exception
@@ -77,10 +78,16 @@ class OperationsController(rest.RestController):
             data.as_dict(objects.registry.Operation)), pecan.request.host_url)
 
     @exception.wrap_wsme_controller_exception
-    @wsme_pecan.wsexpose([operation.Operation])
-    def get_all(self):
+    @wsme_pecan.wsexpose([operation.Operation], int, wtypes.text, wtypes.text,
+                         wtypes.text, wtypes.text)
+    def get_all(self, limit=None, marker=None, sort_key=None, sort_dir=None,
+                name=None):
         """Return all operations, based on the query provided."""
+        query = pagination.query_args(limit, marker, sort_key, sort_dir,
+                                      name=name)
         handler = operation_handler.OperationHandler(
             pecan.request.security_context)
+        operations = handler.get_all(**query)
+        pagination.set_next_link(query, operations)
         return [operation.Operation.from_db_model(obj, pecan.request.host_url)
-                for obj in handler.get_all()]
+                for obj in operations]
@@ -15,8 +15,10 @@
 import pecan
 from pecan import rest
 import wsme
+from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
 
+from solum.api.controllers import pagination
 from solum.api.controllers.v1.datamodel import pipeline
 from solum.api.controllers.v1 import execution
 from solum.api.handlers import pipeline_handler
@@ -101,10 +103,16 @@ class PipelinesController(rest.RestController):
             handler.create(js_data), pecan.request.host_url)
 
     @exception.wrap_wsme_controller_exception
-    @wsme_pecan.wsexpose([pipeline.Pipeline])
-    def get_all(self):
+    @wsme_pecan.wsexpose([pipeline.Pipeline], int, wtypes.text, wtypes.text,
+                         wtypes.text, wtypes.text, wtypes.text)
+    def get_all(self, limit=None, marker=None, sort_key=None, sort_dir=None,
+                name=None, plan_uuid=None):
         """Return all pipelines."""
+        query = pagination.query_args(limit, marker, sort_key, sort_dir,
+                                      name=name, plan_uuid=plan_uuid)
         handler = pipeline_handler.PipelineHandler(
             pecan.request.security_context)
+        pipelines = handler.get_all(**query)
+        pagination.set_next_link(query, pipelines)
         return [pipeline.Pipeline.from_db_model(obj, pecan.request.host_url)
-                for obj in handler.get_all()]
+                for obj in pipelines]
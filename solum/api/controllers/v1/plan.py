@@ -22,6 +22,7 @@ from wsme.rest import json as wsme_json
 from wsme import types as wsme_types
 import wsmeext.pecan as wsme_pecan
 
+from solum.api.controllers import pagination
 from solum.api.controllers.v1.datamodel import plan
 from solum.api.handlers import plan_handler
 from solum.common import exception
@@ -164,18 +165,23 @@ class PlansController(rest.RestController):
 
     @exception.wrap_pecan_controller_exception
     @pecan.expose()
-    def get_all(self):
+    def get_all(self, limit=None, marker=None, sort_key=None, sort_dir=None,
+                name=None):
         """Return all plans, based on the query provided."""
+        query = pagination.query_args(limit, marker, sort_key, sort_dir,
+                                      name=name)
         handler = plan_handler.PlanHandler(pecan.request.security_context)
+        plans = handler.get_all(**query)
+        pagination.set_next_link(query, plans)
 
         if pecan.request.accept is not None and 'yaml' in pecan.request.accept:
             plan_serialized = yamlutils.dump([yaml_content(obj)
-                                              for obj in handler.get_all()
+                                              for obj in plans
                                               if obj and obj.raw_content])
         else:
             plan_serialized = wsme_json.encode_result(
                 [plan.Plan.from_db_model(obj, pecan.request.host_url)
-                 for obj in handler.get_all()],
+                 for obj in plans],
                 wsme_types.ArrayType(plan.Plan))
         pecan.response.status = 200
         return plan_serialized
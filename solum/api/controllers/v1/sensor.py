@@ -15,6 +15,7 @@ from pecan import rest
 from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
 
+from solum.api.controllers import pagination
 from solum.api.controllers.v1.datamodel import sensor
 from solum.api.handlers import sensor_handler
 from solum.common import exception
@@ -72,9 +73,15 @@ class SensorsController(rest.RestController):
         return sensor.Sensor.from_db_model(obj, pecan.request.host_url)
 
     @exception.wrap_wsme_controller_exception
-    @wsme_pecan.wsexpose([sensor.Sensor])
-    def get_all(self):
+    @wsme_pecan.wsexpose([sensor.Sensor], int, wtypes.text, wtypes.text,
+                         wtypes.text, wtypes.text)
+    def get_all(self, limit=None, marker=None, sort_key=None, sort_dir=None,
+                name=None):
         """Return all sensors, based on the query provided."""
+        query = pagination.query_args(limit, marker, sort_key, sort_dir,
+                                      name=name)
         handler = sensor_handler.SensorHandler(pecan.request.security_context)
+        sensors = handler.get_all(**query)
+        pagination.set_next_link(query, sensors)
         return [sensor.Sensor.from_db_model(obj, pecan.request.host_url)
-                for obj in handler.get_all()]
+                for obj in sensors]
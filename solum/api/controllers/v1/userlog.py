@@ -14,8 +14,10 @@
 
 import pecan
 from pecan import rest
+from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
 
+from solum.api.controllers import pagination
 from solum.api.controllers.v1.datamodel import userlog
 from solum.api.handlers import userlog_handler
 from solum.common import exception
@@ -29,11 +31,14 @@ class UserlogsController(rest.RestController):
         self._resource_id = resource_id
 
     @exception.wrap_pecan_controller_exception
-    @wsme_pecan.wsexpose([userlog.Userlog])
-    def get_all(self):
+    @wsme_pecan.wsexpose([userlog.Userlog], int, wtypes.text, wtypes.text,
+                         wtypes.text)
+    def get_all(self, limit=None, marker=None, sort_key=None, sort_dir=None):
         """Return all Userlogs, based on the query provided."""
+        query = pagination.query_args(limit, marker, sort_key, sort_dir)
         handler = userlog_handler.UserlogHandler(
             pecan.request.security_context)
-        ulogs = handler.get_all_by_id(self._resource_id)
+        ulogs = handler.get_all_by_id(self._resource_id, **query)
+        pagination.set_next_link(query, ulogs, marker_attr='id')
         return [userlog.Userlog.from_db_model(ulog, pecan.request.host_url)
                 for ulog in ulogs]
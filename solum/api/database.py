@@ -0,0 +1,34 @@
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from pecan import hooks
+
+from solum import objects
+from solum.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+
+class SessionScopeHook(hooks.PecanHook):
+    """Serve each request from a single database session and connection."""
+
+    def before(self, state):
+        objects.IMPL.begin_scope()
+
+    def after(self, state):
+        checkouts = objects.IMPL.end_scope()
+        if checkouts is not None:
+            LOG.debug("%s %s: %d database connection checkouts" %
+                      (state.request.method, state.request.path, checkouts))
@@ -53,6 +53,7 @@ IMAGE_STATES = image.States
 class AssemblyHandler(handler.Handler):
     """Fulfills a request on the assembly resource."""
 
+    @objects.replica_reads
     def get(self, id):
         """Return an assembly."""
         return objects.registry.Assembly.get_by_uuid(self.context, id)
@@ -182,6 +183,7 @@ class AssemblyHandler(handler.Handler):
             test_cmd=test_cmd,
             run_cmd=run_cmd)
 
-    def get_all(self):
+    @objects.replica_reads
+    def get_all(self, **query):
         """Return all assemblies, based on the query provided."""
-        return objects.registry.AssemblyList.get_all(self.context)
+        return objects.registry.AssemblyList.get_all(self.context, **query)
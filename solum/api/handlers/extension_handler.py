@@ -44,6 +44,6 @@ class ExtensionHandler(handler.Handler):
         db_obj.create(self.context)
         return db_obj
 
-    def get_all(self):
+    def get_all(self, **query):
         """Return all operations."""
-        return objects.registry.ExtensionList.get_all(self.context)
+        return objects.registry.ExtensionList.get_all(self.context, **query)
@@ -42,7 +42,7 @@ class Handler(object):
         excp = solum_exception.NotImplemented()
         raise excp
 
-    def get_all(self):
+    def get_all(self, **query):
         """Return all resources, based on the query provided."""
         excp = solum_exception.NotImplemented()
         raise excp
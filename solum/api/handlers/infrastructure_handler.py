@@ -63,11 +63,11 @@ class InfrastructureStackHandler(handler.Handler):
         return db_obj
 
     def _create_zaqar_queue(self, queue_name):
-        osc = clients.OpenStackClients(self.context)
+        osc = clients.cached_clients(self.context)
         osc.zaqar().queue(queue_name)
 
     def _deploy_infra(self, image_id):
-        osc = clients.OpenStackClients(self.context)
+        osc = clients.cached_clients(self.context)
 
         parameters = {'image': image_id}
 
@@ -78,6 +78,7 @@ class InfrastructureStackHandler(handler.Handler):
                                                  parameters=parameters)
         return created_stack['stack']['id']
 
-    def get_all(self):
+    def get_all(self, **query):
         """Return all stacks, based on the query provided."""
-        return objects.registry.InfrastructureStackList.get_all(self.context)
+        return objects.registry.InfrastructureStackList.get_all(
+            self.context, **query)
@@ -43,9 +43,11 @@ class LanguagePackHandler(handler.Handler):
         """Return a languagepack."""
         return objects.registry.Image.get_lp_by_name_or_uuid(self.context, id)
 
-    def get_all(self):
+    @objects.replica_reads
+    def get_all(self, **query):
         """Return all languagepacks."""
-        return objects.registry.Image.get_all_languagepacks(self.context)
+        return objects.registry.Image.get_all_languagepacks(self.context,
+                                                           **query)
 
     def create(self, data, lp_metadata):
         """Create a new languagepack."""
@@ -42,6 +42,6 @@ class OperationHandler(handler.Handler):
         db_obj.create(self.context)
         return db_obj
 
-    def get_all(self):
+    def get_all(self, **query):
         """Return all operations."""
-        return objects.registry.OperationList.get_all(self.context)
+        return objects.registry.OperationList.get_all(self.context, **query)
@@ -40,6 +40,7 @@ class PipelineHandler(handler.Handler):
         if context is not None:
             self._clients = clients.OpenStackClients(context)
 
+    @objects.replica_reads
     def get(self, id):
         """Return an pipeline."""
         return objects.registry.Pipeline.get_by_uuid(self.context, id)
@@ -159,7 +160,7 @@ class PipelineHandler(handler.Handler):
         ex_obj.create(self.context)
 
     def _ensure_workbook(self, pipeline):
-        osc = clients.OpenStackClients(self.context)
+        osc = clients.cached_clients(self.context)
         try:
             osc.mistral().workbooks.get(pipeline.workbook_name)
         except Exception as excp:
@@ -211,6 +212,7 @@ class PipelineHandler(handler.Handler):
 
         return db_obj
 
-    def get_all(self):
+    @objects.replica_reads
+    def get_all(self, **query):
         """Return all pipelines, based on the query provided."""
-        return objects.registry.PipelineList.get_all(self.context)
+        return objects.registry.PipelineList.get_all(self.context, **query)
@@ -49,6 +49,7 @@ sys_param_store = CONF.api.system_param_store
 class PlanHandler(handler.Handler):
     """Fulfills a request on the plan resource."""
 
+    @objects.replica_reads
     def get(self, id):
         """Return a plan."""
         return objects.registry.Plan.get_by_uuid(self.context, id)
@@ -92,9 +93,10 @@ class PlanHandler(handler.Handler):
             self._create_params(db_obj.id, user_params, sys_params)
         return db_obj
 
-    def get_all(self):
+    @objects.replica_reads
+    def get_all(self, **query):
         """Return all plans."""
-        return objects.registry.PlanList.get_all(self.context)
+        return objects.registry.PlanList.get_all(self.context, **query)
 
     def _generate_sys_params(self, plan_obj, data):
         # NOTE: this method may modify the input 'data'
@@ -44,6 +44,6 @@ class SensorHandler(handler.Handler):
         db_obj.create(self.context)
         return db_obj
 
-    def get_all(self):
+    def get_all(self, **query):
         """Return all sensors."""
-        return objects.registry.SensorList.get_all(self.context)
+        return objects.registry.SensorList.get_all(self.context, **query)
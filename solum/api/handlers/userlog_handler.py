@@ -22,10 +22,12 @@ LOG = logging.getLogger(__name__)
 
 class UserlogHandler(handler.Handler):
 
-    def get_all(self):
+    @objects.replica_reads
+    def get_all(self, **query):
         """Return all userlogs, based on the query provided."""
-        return objects.registry.UserlogList.get_all(self.context)
+        return objects.registry.UserlogList.get_all(self.context, **query)
 
-    def get_all_by_id(self, resource_uuid):
+    @objects.replica_reads
+    def get_all_by_id(self, resource_uuid, **query):
         return objects.registry.UserlogList.get_all_by_id(
-            self.context, resource_uuid=resource_uuid)
+            self.context, resource_uuid=resource_uuid, **query)
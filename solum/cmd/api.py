@@ -17,12 +17,12 @@
 import logging as std_logging
 import os
 import sys
-from wsgiref import simple_server
 
 from oslo.config import cfg
 
 from solum.api import app as api_app
 from solum.common import service
+from solum.common import wsgi
 from solum.openstack.common.gettextutils import _
 from solum.openstack.common import log as logging
 
@@ -37,7 +37,13 @@ def main():
 
     # Create the WSGI server and start it
     host, port = cfg.CONF.api.host, cfg.CONF.api.port
-    srv = simple_server.make_server(host, port, app)
+    srv = wsgi.Server(app, host, port,
+                      workers=cfg.CONF.api.workers,
+                      pool_size=cfg.CONF.api.max_concurrent_requests,
+                      backlog=cfg.CONF.api.backlog,
+                      tcp_keepidle=cfg.CONF.api.tcp_keepidle,
+                      shutdown_timeout=cfg.CONF.api.graceful_shutdown_timeout)
+    srv.start()
 
     LOG.info(_('Starting server in PID %s') % os.getpid())
     LOG.debug("Configuration:")
@@ -25,6 +25,7 @@ from solum.common.rpc import service
 from solum.common import trace_data
 from solum.openstack.common.gettextutils import _
 from solum.openstack.common import log as logging
+from solum.worker import executor
 from solum.worker.handlers import noop as noop_handler
 from solum.worker.handlers import shell as shell_handler
 
@@ -50,7 +51,7 @@ def main():
     }
 
     endpoints = [
-        handlers[cfg.CONF.worker.handler](),
+        executor.QueuedHandler(handlers[cfg.CONF.worker.handler]()),
     ]
 
     server = service.Service(cfg.CONF.worker.topic,
@@ -0,0 +1,74 @@
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Small in-process caches.
+
+A TTLCache lives for the whole process, so every cache is registered
+here and clear_all() empties them all, for instance between tests.
+"""
+
+import collections
+import time
+
+
+_caches = []
+
+
+def clear_all():
+    for c in _caches:
+        c.clear()
+
+
+class TTLCache(object):
+    """A dict whose entries expire, bounded to max_size entries.
+
+    When full, the least recently used entry is dropped. Hits and misses
+    are counted so callers can report how well the cache does.
+    """
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # key -> (value, expiry time)
+        self._data = collections.OrderedDict()
+        _caches.append(self)
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        entry = self._data.pop(key, None)
+        if entry is None or entry[1] <= time.time():
+            self.misses += 1
+            return default
+        self._data[key] = entry
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key, value, ttl):
+        self._data.pop(key, None)
+        self._data[key] = (value, time.time() + ttl)
+        if self.max_size is not None:
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
@@ -12,9 +12,33 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+"""Read the templates and workbooks shipped in etc/solum.
+
+Files are read once and kept in memory until their mtime changes. Their
+parsed forms are cached as well, by content, and render_user_data()
+fills the user_data script of a Heat template into text prepared once
+per template, rather than parsing and dumping the template each time.
+"""
+
+import json
 import os.path
 
+import yaml
+
+from solum.common import cache
 from solum.common import exception
+from solum.common import yamlutils
+
+
+# file path -> (mtime, content)
+_files = {}
+
+# document text -> parsed document, or (template text, resource) ->
+# template text with a placeholder for user_data
+_parsed = cache.TTLCache(max_size=32)
+PARSED_TTL = 3600
+
+_USER_DATA_MARK = 'SOLUM_USER_DATA_PLACEHOLDER'
 
 
 def get(entity, name, content_type='yaml'):
@@ -26,9 +50,52 @@ def get(entity, name, content_type='yaml'):
     file_path = os.path.join(proj_dir, 'etc', 'solum', entity,
                              '%s.%s' % (name, content_type))
     file_path = os.path.realpath(file_path)
+    try:
+        mtime = os.path.getmtime(file_path)
+    except OSError:
+        mtime = None
+    cached = _files.get(file_path)
+    if mtime is not None and cached is not None and cached[0] == mtime:
+        return cached[1]
+
     try:
         with open(file_path) as fd:
-            return fd.read()
+            content = fd.read()
     except Exception:
         raise exception.ObjectNotFound(
             name=entity, id=name)
+    if mtime is not None:
+        _files[file_path] = (mtime, content)
+    return content
+
+
+def load_yaml(text):
+    """Parse a YAML (or JSON) document, once per distinct text.
+
+    The result is shared between callers and must not be modified.
+    """
+    parsed = _parsed.get(text)
+    if parsed is None:
+        parsed = yaml.load(text, Loader=yamlutils.yaml_loader)
+        _parsed.set(text, parsed, PARSED_TTL)
+    return parsed
+
+
+def render_user_data(template, user_data, resource='compute_instance'):
+    """Return template with the user_data script of resource replaced.
+
+    :param template: Heat template text whose resource has a user_data
+                     property with a str_replace function
+    :param user_data: the script to put in its template
+    """
+    key = (template, resource)
+    skeleton = _parsed.get(key)
+    if skeleton is None:
+        body = yaml.load(template, Loader=yamlutils.yaml_loader)
+        properties = body['resources'][resource]['properties']
+        properties['user_data']['str_replace']['template'] = _USER_DATA_MARK
+        skeleton = yaml.dump(body, Dumper=yamlutils.yaml_dumper,
+                             default_flow_style=False)
+        _parsed.set(key, skeleton, PARSED_TTL)
+    # A JSON string is also a valid double-quoted YAML scalar.
+    return skeleton.replace(_USER_DATA_MARK, json.dumps(user_data), 1)
@@ -20,6 +20,7 @@ from oslo.config import cfg
 from swiftclient import client as swiftclient
 from zaqarclient.queues.v1 import client as zaqarclient
 
+from solum.common import cache
 from solum.common import exception
 from solum.common import solum_barbicanclient
 from solum.common import solum_keystoneclient
@@ -36,6 +37,20 @@ GLOBAL_CLIENT_OPTS = [
                help=_(
                    'Region of endpoint in Identity service catalog to use'
                    ' for all clients.')),
+    cfg.IntOpt('catalog_cache_ttl',
+               default=300,
+               help=_(
+                   'Seconds the endpoints found in the Identity service'
+                   ' catalog are cached. 0 disables the cache.')),
+    cfg.IntOpt('client_cache_ttl',
+               default=3600,
+               help=_(
+                   'Maximum number of seconds the clients of a token are'
+                   ' reused. They are also dropped when the token is about'
+                   ' to expire. 0 disables the cache.')),
+    cfg.IntOpt('client_cache_size',
+               default=1000,
+               help=_('Maximum number of tokens whose clients are cached.')),
 ]
 
 barbican_client_opts = [
@@ -157,6 +172,14 @@ cfg.CONF.register_opts(neutron_client_opts, group='neutron_client')
 cfg.CONF.register_opts(swift_client_opts, group='swift_client')
 cfg.CONF.register_opts(mistral_client_opts, group='mistral_client')
 
+# Seconds before its expiry a token is considered stale.
+TOKEN_STALE_DURATION = 300
+
+# (project, region, service type, endpoint type) -> URL
+_endpoints = cache.TTLCache()
+# trust id or token -> OpenStackClients
+_clients = cache.TTLCache()
+
 
 def get_client_option(client, option):
     value = getattr(getattr(cfg.CONF, '%s_client' % client), option)
@@ -167,6 +190,24 @@ def get_client_option(client, option):
         return value
 
 
+def cached_clients(context):
+    """Return the OpenStackClients of context, shared by its token.
+
+    Jobs carrying the same token or trust reuse the same clients instead
+    of authenticating again, until the token is about to expire.
+    """
+    ttl = cfg.CONF.client_cache_ttl
+    key = context and (context.trust_id or context.auth_token)
+    if not ttl or not key:
+        return OpenStackClients(context)
+    _clients.max_size = cfg.CONF.client_cache_size
+    osc = _clients.get(key)
+    if osc is None or osc.token_expiring():
+        osc = OpenStackClients(context)
+        _clients.set(key, osc, ttl)
+    return osc
+
+
 class OpenStackClients(object):
     """Convenience class to create and cache client instances."""
 
@@ -182,7 +223,25 @@ class OpenStackClients(object):
         self._mistral = None
 
     def url_for(self, **kwargs):
-        return self.keystone().client.service_catalog.url_for(**kwargs)
+        ttl = cfg.CONF.catalog_cache_ttl
+        project = self.context and self.context.tenant
+        if not ttl or not project:
+            return self.keystone().client.service_catalog.url_for(**kwargs)
+
+        key = (project, kwargs.get('region_name'),
+               kwargs.get('service_type'), kwargs.get('endpoint_type'))
+        url = _endpoints.get(key)
+        if url is None:
+            url = self.keystone().client.service_catalog.url_for(**kwargs)
+            _endpoints.set(key, url, ttl)
+        return url
+
+    def token_expiring(self):
+        """Whether the token of these clients is about to expire."""
+        if self._keystone is None or self._keystone.auth_ref is None:
+            return False
+        return self._keystone.auth_ref.will_expire_soon(
+            stale_duration=TOKEN_STALE_DURATION)
 
     @property
     def auth_url(self):
@@ -12,11 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
 import inspect
 
+from solum.common import cache
 from solum.openstack.common import context
 
 
+# token hash -> auth_token_info of the token
+_token_info = cache.TTLCache(max_size=1000)
+
+
 class RequestContext(context.RequestContext):
     def __init__(self, auth_token=None, user=None, tenant=None, domain=None,
                  user_domain=None, project_domain=None, is_admin=False,
@@ -52,3 +58,21 @@ class RequestContext(context.RequestContext):
                    if arg != 'self']
         kwargs = dict((k, v) for (k, v) in values.items() if k in allowed)
         return cls(**kwargs)
+
+
+def _token_key(auth_token):
+    return hashlib.sha256(auth_token.encode('utf-8')).hexdigest()
+
+
+def remember_token_info(auth_token, auth_token_info, ttl):
+    """Keep the token info of auth_token for ttl seconds.
+
+    The token info carries the whole service catalog, so it is left out
+    of RPC messages and looked up here on the receiving side instead.
+    """
+    _token_info.set(_token_key(auth_token), auth_token_info, ttl)
+
+
+def recall_token_info(auth_token):
+    """Return the remembered token info of auth_token, or None."""
+    return _token_info.get(_token_key(auth_token))
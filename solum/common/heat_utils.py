@@ -13,15 +13,74 @@
 #    limitations under the License.
 
 
+from oslo.config import cfg
+
+from solum.common import cache
+from solum.common import clients
+from solum.openstack.common.gettextutils import _
+
+
+HEAT_UTILS_OPTS = [
+    cfg.IntOpt('network_cache_ttl',
+               default=300,
+               help=_('Seconds the public and private networks found for a '
+                      'project are cached. 0 disables the cache.')),
+]
+
+cfg.CONF.register_opts(HEAT_UTILS_OPTS)
+
+# (project, region) -> network parameters
+_networks = cache.TTLCache()
+
+
 def get_network_parameters(osc):
+    """Return the public and private networks to deploy on.
+
+    The result is cached per project and neutron region for
+    network_cache_ttl seconds.
+    """
+    ttl = cfg.CONF.network_cache_ttl
+    project = osc.context and osc.context.tenant
+    if not ttl or not project:
+        return _list_network_parameters(osc)
+
+    key = (project, clients.get_client_option('neutron', 'region_name'))
+    params = _networks.get(key)
+    if params is None:
+        params = _list_network_parameters(osc)
+        _networks.set(key, params, ttl)
+    return dict(params)
+
+
+def invalidate_network_parameters(project, region=None):
+    """Forget the cached networks of project, for instance after a failure.
+
+    :param region: the neutron region, the configured one if None
+    """
+    if region is None:
+        region = clients.get_client_option('neutron', 'region_name')
+    _networks.pop((project, region))
+
+
+def network_cache_stats():
+    return {'size': len(_networks),
+            'hits': _networks.hits,
+            'misses': _networks.misses}
+
+
+def _list_network_parameters(osc):
     # TODO(julienvey) In the long term, we should have optional parameters
     # if the user wants to override this default behaviour
     params = {}
-    tenant_networks = osc.neutron().list_networks()
-    for tenant_network in tenant_networks['networks']:
-        if tenant_network['router:external']:
-            params['public_net'] = tenant_network['id']
-        else:
-            params['private_net'] = tenant_network['id']
-            params['private_subnet'] = tenant_network['subnets'][0]
+    neutron = osc.neutron()
+    # Only ask for the networks and fields used below.
+    public = neutron.list_networks(**{'router:external': True,
+                                      'fields': ['id']})
+    for tenant_network in public['networks']:
+        params['public_net'] = tenant_network['id']
+    private = neutron.list_networks(**{'router:external': False,
+                                       'fields': ['id', 'subnets']})
+    for tenant_network in private['networks']:
+        params['private_net'] = tenant_network['id']
+        params['private_subnet'] = tenant_network['subnets'][0]
     return params
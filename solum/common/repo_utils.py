@@ -41,9 +41,9 @@ def get_http_connection():
     return httplib2.Http(timeout=http_req_timeout)
 
 
-def is_reachable(url):
+def is_reachable(url, conn=None):
     reachable = False
-    conn = get_http_connection()
+    conn = conn or get_http_connection()
     resp, _ = conn.request(url, 'GET')
     if resp is not None and resp['status'] == '200':
         reachable = True
@@ -14,6 +14,8 @@
 
 """Common RPC service and API tools for Solum."""
 
+import os
+
 import eventlet
 from oslo.config import cfg
 from oslo import messaging
@@ -23,6 +25,18 @@ from solum import objects
 from solum.openstack.common import jsonutils
 
 
+RPC_OPTS = [
+    cfg.BoolOpt('compact_rpc_context',
+                default=True,
+                help='Leave the token info, which holds the whole service '
+                     'catalog, and unset fields out of the request context '
+                     'sent with RPC messages. The receiver uses the token '
+                     'info it already knows for the token, or asks '
+                     'Keystone once.'),
+]
+
+cfg.CONF.register_opts(RPC_OPTS)
+
 # NOTE(paulczar):
 # Ubuntu 14.04 forces librabbitmq when kombu is used
 # Unfortunately it forces a version that has a crash
@@ -62,10 +76,95 @@ class RequestContextSerializer(messaging.Serializer):
         return self._base.deserialize_entity(context, entity)
 
     def serialize_context(self, context):
-        return context.to_dict()
+        data = context.to_dict()
+        if cfg.CONF.compact_rpc_context:
+            data = dict((k, v) for k, v in data.items()
+                        if v is not None and k != 'auth_token_info')
+        return data
 
     def deserialize_context(self, context):
-        return solum.common.context.RequestContext.from_dict(context)
+        ctxt = solum.common.context.RequestContext.from_dict(context)
+        if ctxt.auth_token and ctxt.auth_token_info is None:
+            ctxt.auth_token_info = solum.common.context.recall_token_info(
+                ctxt.auth_token)
+        return ctxt
+
+
+_transport = None
+_transport_pid = None
+# topic -> RPCClient on the shared transport
+_clients = {}
+# id(context) -> callable sending the messages held back for the context
+_held = {}
+
+
+def get_transport():
+    """Return the transport shared by the RPC servers and clients.
+
+    A transport owns the broker connections, so a process that forked
+    builds its own.
+    """
+    global _transport, _transport_pid
+    if _transport is None or _transport_pid != os.getpid():
+        _transport = messaging.get_transport(cfg.CONF,
+                                             aliases=TRANSPORT_ALIASES)
+        _transport_pid = os.getpid()
+        _clients.clear()
+    return _transport
+
+
+def _new_client(transport, topic):
+    serializer = RequestContextSerializer(JsonPayloadSerializer())
+    return messaging.RPCClient(transport, messaging.Target(topic=topic),
+                               serializer=serializer)
+
+
+def _get_client(topic):
+    transport = get_transport()
+    if topic not in _clients:
+        _clients[topic] = _new_client(transport, topic)
+    return _clients[topic]
+
+
+def hold_until_send(context, flush):
+    """Have flush called before the next message sent with context.
+
+    Messages that are held back, such as batched status updates, must
+    not be overtaken by the casts and calls that follow them.
+    """
+    _held[id(context)] = flush
+
+
+def release(context):
+    """Forget what was held back for context, without sending it."""
+    _held.pop(id(context), None)
+
+
+def _send_held(context):
+    flush = _held.pop(id(context), None)
+    if flush is not None:
+        flush()
+
+
+class SessionScopedEndpoint(object):
+    """Run each method of an RPC endpoint in its own database session scope.
+
+    The object calls made while handling one message then share a session
+    and a connection, see begin_scope in the database backend.
+    """
+
+    def __init__(self, endpoint):
+        self._endpoint = endpoint
+
+    def __getattr__(self, name):
+        attr = getattr(self._endpoint, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        def scoped(*args, **kwargs):
+            with objects.IMPL.session_scope():
+                return attr(*args, **kwargs)
+        return scoped
 
 
 class Service(object):
@@ -73,10 +172,10 @@ class Service(object):
 
     def __init__(self, topic, server, handlers):
         serializer = RequestContextSerializer(JsonPayloadSerializer())
-        transport = messaging.get_transport(cfg.CONF,
-                                            aliases=TRANSPORT_ALIASES)
+        transport = get_transport()
         # TODO(asalkeld) add support for version='x.y'
         target = messaging.Target(topic=topic, server=server)
+        handlers = [SessionScopedEndpoint(h) for h in handlers]
         self._server = messaging.get_rpc_server(transport, target, handlers,
                                                 serializer=serializer)
 
@@ -88,22 +187,28 @@ class Service(object):
 
 class API(object):
     def __init__(self, transport=None, context=None, topic=None):
-        serializer = RequestContextSerializer(JsonPayloadSerializer())
-        if transport is None:
-            transport = messaging.get_transport(cfg.CONF,
-                                                aliases=TRANSPORT_ALIASES)
+        # The client is shared by all the APIs of a topic; the context
+        # is given with each call.
         self._context = context
         if topic is None:
             topic = ''
-        target = messaging.Target(topic=topic)
-        self._client = messaging.RPCClient(transport, target,
-                                           serializer=serializer)
+        if transport is None:
+            self._client = _get_client(topic)
+        else:
+            self._client = _new_client(transport, topic)
 
     def _call(self, method, *args, **kwargs):
+        _send_held(self._context)
         return self._client.call(self._context, method, *args, **kwargs)
 
     def _cast(self, method, *args, **kwargs):
+        _send_held(self._context)
         self._client.cast(self._context, method, *args, **kwargs)
 
+    def _prepare(self, **kwargs):
+        """Return the client narrowed to kwargs, see RPCClient.prepare."""
+        _send_held(self._context)
+        return self._client.prepare(**kwargs)
+
     def echo(self, message):
         self._cast('echo', message=message)
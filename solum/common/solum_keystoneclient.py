@@ -26,6 +26,9 @@ from solum.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
 
+# Seconds the token info fetched for a token is reused.
+TOKEN_INFO_TTL = 600
+
 trust_opts = [
     cfg.ListOpt('trusts_delegated_roles',
                 default=['solum_assembly_update'],
@@ -75,6 +78,13 @@ class KeystoneClientV3(object):
             self._client = self._v3_client_init()
         return self._client
 
+    @property
+    def auth_ref(self):
+        """The token of the client, None until it is authenticated."""
+        if not self._client:
+            return None
+        return self._client.auth_ref
+
     @property
     def admin_client(self):
         if not self._admin_client:
@@ -126,6 +136,8 @@ class KeystoneClientV3(object):
         client = kc_v3.Client(**kwargs)
         if 'auth_ref' not in kwargs:
             client.authenticate()
+            if 'token' in kwargs:
+                self._remember_token_info(client.auth_ref)
         # If we are authenticating with a trust set the context auth_token
         # with the trust scoped token
         if 'trust_id' in kwargs:
@@ -142,6 +154,14 @@ class KeystoneClientV3(object):
 
         return client
 
+    def _remember_token_info(self, auth_ref):
+        # The next contexts of this token arrive without token info; let
+        # them use this one rather than authenticating again.
+        token_info = {'token': dict(auth_ref)}
+        self.context.auth_token_info = token_info
+        context.remember_token_info(self.context.auth_token, token_info,
+                                    TOKEN_INFO_TTL)
+
     def _service_admin_creds(self):
         # Import auth_token to have keystone_authtoken settings setup.
         importutils.import_module('keystonemiddleware.auth_token')
@@ -0,0 +1,186 @@
+# Copyright 2014 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Multi-process, green-threaded WSGI server for the Solum API."""
+
+import errno
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+
+import eventlet
+import eventlet.wsgi
+
+from solum.openstack.common.gettextutils import _
+from solum.openstack.common import log as logging
+
+
+# NOTE: the request handlers block on keystone, heat and the database.
+# Those calls must yield to other green threads for a worker to serve
+# more than one request at a time.
+eventlet.monkey_patch()
+
+LOG = logging.getLogger(__name__)
+
+
+class _WSGILogStream(object):
+    """Adapts eventlet.wsgi request logging onto the solum logger."""
+
+    def write(self, msg):
+        LOG.debug(msg.rstrip())
+
+
+class Server(object):
+    """Serve a WSGI application from a pool of forked worker processes.
+
+    Each worker serves up to ``pool_size`` concurrent requests from its
+    own green thread pool. The parent process only supervises: it
+    respawns workers that die, and on SIGHUP it replaces every worker
+    gracefully (in-flight requests finish, new ones go to new workers).
+
+    With ``workers=1`` the application is served straight from the
+    calling process, which is convenient for development and debugging.
+    """
+
+    def __init__(self, app, host, port, workers=1, pool_size=100,
+                 backlog=4096, tcp_keepidle=600, shutdown_timeout=60):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers if workers > 0 else _cpu_count()
+        self.pool_size = pool_size
+        self.backlog = backlog
+        self.tcp_keepidle = tcp_keepidle
+        self.shutdown_timeout = shutdown_timeout
+        self.running = True
+        self._sock = None
+        self._children = set()
+        self._stale_children = set()
+
+    def start(self):
+        """Bind the listening socket, before any worker is forked."""
+        info = socket.getaddrinfo(self.host, self.port, socket.AF_UNSPEC,
+                                  socket.SOCK_STREAM)[0]
+        sock = eventlet.listen(info[-1], family=info[0],
+                               backlog=self.backlog)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE,
+                            self.tcp_keepidle)
+        self._sock = sock
+
+    def serve_forever(self):
+        if self._sock is None:
+            self.start()
+
+        if self.workers == 1:
+            self._run_server()
+            return
+
+        signal.signal(signal.SIGTERM, self._kill_children)
+        signal.signal(signal.SIGINT, self._kill_children)
+        signal.signal(signal.SIGHUP, self._hup)
+
+        LOG.info(_('Starting %d API workers') % self.workers)
+        while len(self._children) < self.workers:
+            self._run_child()
+        self._wait_on_children()
+
+    def _run_server(self):
+        pool = eventlet.GreenPool(self.pool_size)
+        try:
+            eventlet.wsgi.server(self._sock, self.app,
+                                 custom_pool=pool,
+                                 log=_WSGILogStream())
+        except socket.error as err:
+            # The listening socket was closed by a graceful shutdown.
+            if err.errno not in (errno.EINVAL, errno.EBADF):
+                raise
+        with eventlet.Timeout(self.shutdown_timeout, False):
+            pool.waitall()
+
+    def _run_child(self):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGHUP, self._child_hup)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            # The parent forwards interrupts; a child handling them
+            # too would only be respawned needlessly.
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            self._run_server()
+            LOG.info(_('API worker %d exiting') % os.getpid())
+            sys.exit(0)
+        LOG.info(_('Started API worker %d') % pid)
+        self._children.add(pid)
+
+    def _child_hup(self, *args):
+        """Stop accepting new requests and let the pool drain."""
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        eventlet.wsgi.is_accepting = False
+        self._sock.close()
+
+    def _hup(self, *args):
+        """Replace every worker without dropping in-flight requests."""
+        LOG.info(_('Caught SIGHUP, restarting API workers'))
+        self._stale_children.update(self._children)
+        self._children.clear()
+        for pid in self._stale_children:
+            self._signal_child(pid, signal.SIGHUP)
+        while len(self._children) < self.workers:
+            self._run_child()
+
+    def _kill_children(self, *args):
+        self.running = False
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        for pid in self._children | self._stale_children:
+            self._signal_child(pid, signal.SIGTERM)
+
+    def _signal_child(self, pid, signum):
+        try:
+            os.kill(pid, signum)
+        except OSError as err:
+            if err.errno != errno.ESRCH:
+                raise
+
+    def _wait_on_children(self):
+        while self.running or self._children or self._stale_children:
+            try:
+                pid, status = os.wait()
+            except OSError as err:
+                if err.errno == errno.ECHILD:
+                    break
+                if err.errno != errno.EINTR:
+                    raise
+                continue
+            if not (os.WIFEXITED(status) or os.WIFSIGNALED(status)):
+                continue
+            if pid in self._stale_children:
+                self._stale_children.discard(pid)
+            elif pid in self._children:
+                self._children.discard(pid)
+                if self.running:
+                    LOG.warn(_('API worker %d died, respawning') % pid)
+                    self._run_child()
+        LOG.info(_('All API workers have exited'))
+
+
+def _cpu_count():
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
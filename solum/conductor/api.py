@@ -14,11 +14,68 @@
 
 """API for interfacing with Solum Conductor."""
 
+import collections
+
+import eventlet
 from oslo.config import cfg
 
 from solum.common.rpc import service
 
 
+class _Batcher(object):
+    """Collect the status updates sent with one context.
+
+    Within the batch window, later updates of an assembly or image are
+    merged into the earlier ones, so a build going BUILDING, BUILT,
+    DEPLOYING in quick succession costs the conductor one row update.
+    A batch is sent early when any other message is sent with its
+    context, so that the updates reach the conductor first.
+    """
+
+    def __init__(self):
+        # id(context) -> (API, {(method, object id): kwargs})
+        self._batches = {}
+
+    def add(self, api, method, obj_id, kwargs):
+        key = id(api._context)
+        if key not in self._batches:
+            self._batches[key] = (api, collections.OrderedDict())
+            service.hold_until_send(api._context,
+                                    lambda: self.flush(key))
+            eventlet.spawn_after(cfg.CONF.conductor.update_batch_window,
+                                 self.flush, key)
+        updates = self._batches[key][1]
+        previous = updates.get((method, obj_id))
+        if previous is not None:
+            kwargs = _coalesce(method, previous, kwargs)
+        updates[(method, obj_id)] = kwargs
+        if len(updates) >= cfg.CONF.conductor.update_batch_size:
+            self.flush(key)
+
+    def flush(self, key):
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+        api, updates = batch
+        service.release(api._context)
+        api._cast('apply_updates',
+                  updates=[{'method': method, 'args': kwargs}
+                           for (method, _id), kwargs in updates.items()])
+
+
+def _coalesce(method, previous, kwargs):
+    if method == 'update_assembly':
+        data = dict(previous['data'])
+        data.update(kwargs['data'])
+        return dict(kwargs, data=data)
+    if method == 'update_image' and not kwargs.get('external_ref'):
+        return dict(kwargs, external_ref=previous.get('external_ref'))
+    return kwargs
+
+
+_batcher = _Batcher()
+
+
 class API(service.API):
     def __init__(self, transport=None, context=None):
         cfg.CONF.import_opt('topic', 'solum.conductor.config',
@@ -26,15 +83,23 @@ class API(service.API):
         super(API, self).__init__(transport, context,
                                   topic=cfg.CONF.conductor.topic)
 
+    def _update(self, method, obj_id, **kwargs):
+        if cfg.CONF.conductor.update_batch_window > 0:
+            _batcher.add(self, method, obj_id, kwargs)
+        else:
+            self._cast(method, **kwargs)
+
     def build_job_update(self, build_id, state, description, created_image_id,
-                         assembly_id):
-        self._cast('build_job_update', build_id=build_id, state=state,
-                   description=description, created_image_id=created_image_id,
-                   assembly_id=assembly_id)
+                         assembly_id, build_key=None):
+        self._update('build_job_update', build_id, build_id=build_id,
+                     state=state, description=description,
+                     created_image_id=created_image_id,
+                     assembly_id=assembly_id, build_key=build_key)
 
     def update_assembly(self, assembly_id, data):
-        self._cast('update_assembly', assembly_id=assembly_id, data=data)
+        self._update('update_assembly', assembly_id, assembly_id=assembly_id,
+                     data=data)
 
     def update_image(self, image_id, status, external_ref=None):
-        self._cast('update_image', image_id=image_id, status=status,
-                   external_ref=external_ref)
+        self._update('update_image', image_id, image_id=image_id,
+                     status=status, external_ref=external_ref)
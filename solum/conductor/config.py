@@ -24,6 +24,20 @@ SERVICE_OPTS = [
     cfg.StrOpt('host',
                default='localhost',
                help='The location of the conductor rpc queue'),
+    cfg.FloatOpt('update_batch_window',
+                 default=0.0,
+                 help='Seconds during which the status updates sent with '
+                      'one request context are collected, coalesced and '
+                      'then sent to the conductor as one batch. Any other '
+                      'message sent with the context sends the batch '
+                      'first, but reads of the database may see the '
+                      'previous status until the batch is applied. 0 '
+                      'sends each update on its own.'),
+    cfg.IntOpt('update_batch_size',
+               default=100,
+               help='Number of collected status updates after which a '
+                    'batch is sent without waiting for the window to '
+                    'end.'),
 ]
 
 opt_group = cfg.OptGroup(
@@ -16,9 +16,12 @@
 
 from sqlalchemy import exc as sqla_exc
 
+from solum.common import exception
 from solum import objects
 from solum.objects import assembly
+from solum.objects import image
 from solum.openstack.common import log as logging
+from solum.worker import api as worker_api
 
 LOG = logging.getLogger(__name__)
 
@@ -34,16 +37,20 @@ class Handler(object):
         LOG.debug("%s" % message)
 
     def build_job_update(self, ctxt, build_id, state, description,
-                         created_image_id, assembly_id):
-        to_update = {'state': state,
-                     'external_ref': created_image_id,
-                     'description': str(description)}
+                         created_image_id, assembly_id, build_key=None):
+        to_update = _build_job_data(state, description, created_image_id,
+                                    build_key)
         try:
-            objects.registry.Image.update_and_save(ctxt, build_id, to_update)
+            if not objects.registry.Image.update_in_place(ctxt, build_id,
+                                                          to_update):
+                LOG.debug("Image %s not updated" % build_id)
         except sqla_exc.SQLAlchemyError as ex:
             LOG.error("Failed to update image, ID: %s" % build_id)
             LOG.exception(ex)
 
+        self._create_build_component(ctxt, created_image_id, assembly_id)
+
+    def _create_build_component(self, ctxt, created_image_id, assembly_id):
         # create the component if needed.
         if assembly_id is None:
             return
@@ -70,17 +77,109 @@ class Handler(object):
 
     def update_assembly(self, ctxt, assembly_id, data):
         try:
-            objects.registry.Assembly.update_and_save(ctxt, assembly_id, data)
+            if not objects.registry.Assembly.update_in_place(ctxt,
+                                                             assembly_id,
+                                                             data):
+                LOG.debug("Assembly %s not updated, missing or being "
+                          "deleted" % assembly_id)
         except sqla_exc.SQLAlchemyError as ex:
             LOG.error("Failed to update assembly status, ID: %s" % assembly_id)
             LOG.exception(ex)
 
     def update_image(self, ctxt, image_id, status, external_ref=None):
-        to_update = {'status': status}
-        if external_ref:
-            to_update['external_ref'] = external_ref
+        to_update = _image_data(status, external_ref)
         try:
-            objects.registry.Image.update_and_save(ctxt, image_id, to_update)
+            if not objects.registry.Image.update_in_place(ctxt, image_id,
+                                                          to_update):
+                LOG.debug("Image %s not updated" % image_id)
+                return
         except sqla_exc.SQLAlchemyError as ex:
             LOG.error("Failed to update image, ID: %s" % image_id)
             LOG.exception(ex)
+            return
+        if status == image.States.READY:
+            self._prewarm_lp(ctxt, image_id, external_ref)
+
+    def apply_updates(self, ctxt, updates):
+        """Apply a batch of updates in one transaction.
+
+        :param updates: list of {'method': name, 'args': kwargs} where
+                        name is update_assembly, update_image or
+                        build_job_update and kwargs its arguments
+        """
+        assemblies = []
+        images = []
+        build_jobs = []
+        ready_lps = []
+        for update in updates:
+            method, args = update['method'], update['args']
+            if method == 'update_assembly':
+                assemblies.append((args['assembly_id'], args['data']))
+            elif method == 'update_image':
+                images.append((args['image_id'],
+                               _image_data(args['status'],
+                                           args.get('external_ref'))))
+                if args['status'] == image.States.READY:
+                    ready_lps.append((args['image_id'],
+                                      args.get('external_ref')))
+            elif method == 'build_job_update':
+                images.append((args['build_id'],
+                               _build_job_data(args['state'],
+                                               args['description'],
+                                               args['created_image_id'],
+                                               args.get('build_key'))))
+                build_jobs.append(args)
+            else:
+                LOG.error("Unknown update %s" % method)
+
+        session = objects.registry.Assembly.get_session()
+        try:
+            with session.begin():
+                objects.registry.Assembly.bulk_update(ctxt, assemblies,
+                                                      session=session)
+                objects.registry.Image.bulk_update(ctxt, images,
+                                                   session=session)
+        except sqla_exc.SQLAlchemyError as ex:
+            LOG.error("Failed to apply a batch of %d updates, applying "
+                      "them one by one" % len(updates))
+            LOG.exception(ex)
+            for update in updates:
+                if update['method'] in ('update_assembly', 'update_image',
+                                        'build_job_update'):
+                    getattr(self, update['method'])(ctxt, **update['args'])
+            return
+
+        for args in build_jobs:
+            self._create_build_component(ctxt, args['created_image_id'],
+                                         args['assembly_id'])
+        for image_id, external_ref in ready_lps:
+            self._prewarm_lp(ctxt, image_id, external_ref)
+
+    def _prewarm_lp(self, ctxt, image_id, external_ref):
+        """Tell the workers to fetch a languagepack that became READY."""
+        try:
+            lp = objects.registry.Image.get_by_id(ctxt, image_id)
+        except exception.ResourceNotFound:
+            return
+        if lp.prewarm is False:
+            LOG.debug("Languagepack %s opted out of prewarming" % lp.uuid)
+            return
+        # A replica may not have the new external_ref yet.
+        worker_api.API(context=ctxt).prewarm_lp(
+            lp.uuid, external_ref or lp.external_ref)
+
+
+def _image_data(status, external_ref):
+    to_update = {'status': status}
+    if external_ref:
+        to_update['external_ref'] = external_ref
+    return to_update
+
+
+def _build_job_data(state, description, created_image_id, build_key=None):
+    to_update = {'status': state,
+                 'external_ref': created_image_id,
+                 'description': str(description)}
+    if build_key:
+        to_update['build_key'] = build_key
+    return to_update
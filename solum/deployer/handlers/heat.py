@@ -14,21 +14,16 @@
 
 """Solum Deployer Heat handler."""
 
-import socket
-import time
-
-from heatclient import exc
-import httplib2
+import eventlet
 from oslo.config import cfg
 from sqlalchemy import exc as sqla_exc
-import yaml
 
 from solum.common import catalog
 from solum.common import clients
 from solum.common import exception
 from solum.common import heat_utils
-from solum.common import repo_utils
 from solum.conductor import api as conductor_api
+from solum.deployer import watcher
 from solum import objects
 from solum.objects import assembly
 from solum.openstack.common import log as logging
@@ -48,7 +43,8 @@ SERVICE_OPTS = [
                default=500,
                help=('Number of attempts to query the Docker DU for '
                      'finding out the status of the created app and '
-                     'getting url of the DU created in the stack')),
+                     'getting url of the DU created in the stack. The '
+                     'probes of all the ports of the DU count.')),
     cfg.IntOpt('wait_interval',
                default=1,
                help=('Sleep time interval between two attempts of querying '
@@ -79,6 +75,8 @@ class Handler(object):
     def __init__(self):
         super(Handler, self).__init__()
         objects.load()
+        self._watcher = watcher.StatusWatcher(
+            update_assembly, lambda stack: self._parse_server_url(stack))
 
     def echo(self, ctxt, message):
         LOG.debug("%s" % message)
@@ -91,44 +89,60 @@ class Handler(object):
 
     def destroy_assembly(self, ctxt, assem_id):
         assem = objects.registry.Assembly.get_by_id(ctxt, assem_id)
-        stack_id = self._find_id_if_stack_exists(assem)
+        self._destroy_assembly(ctxt, assem)
 
-        if stack_id is not None:
-            osc = clients.OpenStackClients(ctxt)
+    def _destroy_assembly(self, ctxt, assem):
+        """Delete the stack of an assembly, then the assembly.
 
-            try:
-                osc.heat().stacks.delete(stack_id)
-            except Exception as e:
-                LOG.exception(e)
+        :returns: an event sent True once the assembly is destroyed, or
+                  False if its stack could not be deleted
+        """
+        assem_id = assem.id
+        stack_id = self._find_id_if_stack_exists(assem)
+        destroyed = eventlet.event.Event()
 
-            wait_interval = cfg.CONF.deployer.wait_interval
-            growth_factor = cfg.CONF.deployer.growth_factor
-            for count in range(cfg.CONF.deployer.max_attempts):
-                stack_status = self._get_stack_status(osc, stack_id)
-                if stack_status == "DELETE_COMPLETE":
-                    assem.destroy(ctxt)
-                    return
-                time.sleep(wait_interval)
-                wait_interval *= growth_factor
-            update_assembly(ctxt, assem_id,
-                            {'status': STATES.ERROR_STACK_DELETE_FAILED})
-        else:
+        if stack_id is None:
             assem.destroy(ctxt)
+            destroyed.send(True)
+            return destroyed
+
+        osc = clients.cached_clients(ctxt)
+        try:
+            osc.heat().stacks.delete(stack_id)
+        except Exception as e:
+            LOG.exception(e)
+
+        def stack_deleted(deleted):
+            if deleted:
+                assem.destroy(ctxt)
+            destroyed.send(deleted)
+
+        self._watcher.watch_delete(ctxt, assem_id, osc, stack_id,
+                                   stack_deleted)
+        return destroyed
 
     def destroy_app(self, ctxt, app_id):
         # Destroy a plan's assemblies, and then the plan.
         plan = objects.registry.Plan.get_by_id(ctxt, app_id)
 
-        # Fetch all assemblies by plan id, and self.destroy() them.
-        assemblies = objects.registry.AssemblyList.get_all(ctxt)
+        # Delete the stacks of all the assemblies of the plan at once; the
+        # watcher follows them together.
+        assemblies = objects.registry.AssemblyList.get_all(
+            ctxt, filters={'plan_id': app_id})
+        destroyed = []
         for assem in assemblies:
-            if app_id == assem.plan_id:
-                self.destroy_assembly(ctxt, assem.id)
-
-        plan.destroy(ctxt)
+            update_assembly(ctxt, assem.id, {'status': STATES.DELETING})
+            destroyed.append(self._destroy_assembly(ctxt, assem))
+        # Waiting on the watcher may take minutes.
+        objects.IMPL.release_scope()
+        if all([event.wait() for event in destroyed]):
+            plan.destroy(ctxt)
+        else:
+            LOG.error("Plan %s kept, some of its assemblies could not be "
+                      "destroyed." % app_id)
 
     def deploy(self, ctxt, assembly_id, image_id, ports):
-        osc = clients.OpenStackClients(ctxt)
+        osc = clients.cached_clients(ctxt)
 
         assem = objects.registry.Assembly.get_by_id(ctxt,
                                                     assembly_id)
@@ -165,6 +179,7 @@ class Handler(object):
             LOG.excepion(onf_ex)
             update_assembly(ctxt, assembly_id, {'status': STATES.ERROR})
             return
+        description = catalog.load_yaml(template).get('description')
 
         if cfg.CONF.api.image_format == 'vm':
             if cfg.CONF.worker.image_storage == 'docker_registry':
@@ -195,6 +210,8 @@ class Handler(object):
                 LOG.error("Error updating Heat Stack for,"
                           " assembly %s" % assembly_id)
                 LOG.exception(e)
+                # The cached networks may be gone.
+                heat_utils.invalidate_network_parameters(ctxt.tenant)
                 update_assembly(ctxt, assembly_id, {'status': STATES.ERROR})
                 return
         else:
@@ -206,6 +223,7 @@ class Handler(object):
                 LOG.error("Error creating Heat Stack for,"
                           " assembly %s" % assembly_id)
                 LOG.exception(exp)
+                heat_utils.invalidate_network_parameters(ctxt.tenant)
                 update_assembly(ctxt, assembly_id, {'status': STATES.ERROR})
                 return
             stack_id = created_stack['stack']['id']
@@ -213,8 +231,7 @@ class Handler(object):
             LOG.debug("Stack id: %s" % stack_id)
 
             comp_name = 'Heat_Stack_for_%s' % assem.name
-            comp_description = 'Heat Stack %s' % (
-                yaml.load(template).get('description'))
+            comp_description = 'Heat Stack %s' % description
             try:
                 objects.registry.Component.assign_and_create(
                     ctxt, assem, comp_name, 'heat_stack', comp_description,
@@ -229,74 +246,8 @@ class Handler(object):
         self._check_stack_status(ctxt, assembly_id, osc, stack_id, ports)
 
     def _check_stack_status(self, ctxt, assembly_id, osc, stack_id, ports):
-
-        wait_interval = cfg.CONF.deployer.wait_interval
-        growth_factor = cfg.CONF.deployer.growth_factor
-
-        stack = None
-
-        for count in range(cfg.CONF.deployer.max_attempts):
-            time.sleep(wait_interval)
-            wait_interval *= growth_factor
-            try:
-                stack = osc.heat().stacks.get(stack_id)
-            except Exception as e:
-                LOG.exception(e)
-                continue
-
-            if stack.status == 'COMPLETE':
-                break
-            elif stack.status == 'FAILED':
-                update_assembly(ctxt, assembly_id,
-                                {'status': STATES.ERROR_STACK_CREATE_FAILED})
-                return
-
-        if stack is None or (stack and stack.status == ""):
-            update_assembly(ctxt, assembly_id,
-                            {'status': STATES.ERROR_STACK_CREATE_FAILED})
-            return
-
-        host_ip = self._parse_server_url(stack)
-        if host_ip is None:
-            LOG.exception("Could not parse url from heat stack.")
-            update_assembly(ctxt, assembly_id,
-                            {'status': STATES.ERROR})
-            return
-
-        du_is_up = False
-        to_upd = {'status': STATES.WAITING_FOR_DOCKER_DU,
-                  'application_uri': host_ip}
-        update_assembly(ctxt, assembly_id, to_upd)
-        LOG.debug("HOST IP:%s, PORTS:%s" % (host_ip, ports))
-        port_idx = 0
-        for count in range(cfg.CONF.deployer.du_attempts):
-            if port_idx > len(ports) - 1:
-                du_is_up = True
-                break
-
-            time.sleep(1)
-            du_url = 'http://{host}:{port}'.format(host=host_ip,
-                                                   port=ports[port_idx])
-            try:
-                if repo_utils.is_reachable(du_url):
-                    port_idx += 1
-            except socket.timeout:
-                LOG.debug("Connection to %s timed out, assembly ID: %s" %
-                          (du_url, assembly_id))
-            except (httplib2.HttpLib2Error, socket.error) as serr:
-                if count % 5 == 0:
-                    LOG.exception(serr)
-                else:
-                    LOG.debug(".")
-            except Exception as exp:
-                LOG.exception(exp)
-                update_assembly(ctxt, assembly_id, {'status': STATES.ERROR})
-                return
-        if du_is_up:
-            to_update = {'status': STATES.READY, 'application_uri': host_ip}
-        else:
-            to_update = {'status': STATES.ERROR_DU_CREATION}
-        update_assembly(ctxt, assembly_id, to_update)
+        """Hand the stack over to the status watcher and return."""
+        self._watcher.watch_create(ctxt, assembly_id, osc, stack_id, ports)
 
     def _parse_server_url(self, heat_output):
         """Parse server url from heat-stack-show output."""
@@ -309,14 +260,6 @@ class Handler(object):
             return assem.heat_stack_component.heat_stack_id
         return None
 
-    def _get_stack_status(self, osc, stack_id):
-        try:
-            stack = osc.heat().stacks.get(stack_id)
-            if stack is not None:
-                return stack.stack_status
-        except exc.HTTPNotFound:
-            return None
-
     def _get_template_for_docker_reg(self, assem, template, ports):
         du_name = '/'.join([cfg.CONF.worker.docker_reg_endpoint,
                             str(assem.uuid)])
@@ -330,15 +273,7 @@ class Handler(object):
                                            du=du_name)
 
         LOG.debug("run_docker:%s" % run_docker)
-
-        template_bdy = yaml.safe_load(template)
-        comp_instance = template_bdy['resources']['compute_instance']
-        user_data = comp_instance['properties']['user_data']
-        user_data['str_replace']['template'] = run_docker
-        comp_instance['properties']['user_data'] = user_data
-        template_bdy['resources']['compute_instance'] = comp_instance
-        template = yaml.dump(template_bdy)
-        return template
+        return catalog.render_user_data(template, run_docker)
 
     def _get_template_for_swift(self, assem, template,
                                 origin_image_tar_location, ports):
@@ -374,15 +309,6 @@ class Handler(object):
 
         LOG.debug("run_docker:%s" % run_docker)
 
-        template_bdy = yaml.safe_load(template)
-        comp_instance = template_bdy['resources']['compute_instance']
-        user_data = comp_instance['properties']['user_data']
-        user_data['str_replace']['template'] = run_docker
-        comp_instance['properties']['user_data'] = user_data
-        template_bdy['resources']['compute_instance'] = comp_instance
-
-        template = yaml.safe_dump(template_bdy,
-                                  encoding='utf-8',
-                                  allow_unicode=True)
+        template = catalog.render_user_data(template, run_docker)
         LOG.debug("template:%s" % template)
         return template
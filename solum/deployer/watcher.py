@@ -0,0 +1,346 @@
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Track the Heat stacks and DUs the deployer is waiting on.
+
+A deploy used to sleep inside the RPC handler until its stack was up and
+its DU answered, pinning the handler for minutes. Instead the handler
+hands the stack to a StatusWatcher and returns. The watcher runs in a
+single green thread: each round it lists the due stacks of a tenant in
+one Heat call, probes every due port of the waiting DUs concurrently
+over a shared pool of HTTP connections, and reports the outcome through
+update_assembly.
+"""
+
+import random
+import socket
+import time
+
+import eventlet
+from eventlet import pools
+import httplib2
+from oslo.config import cfg
+
+from solum.common import repo_utils
+from solum.objects import assembly
+from solum.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+STATES = assembly.States
+
+WATCHER_OPTS = [
+    cfg.FloatOpt('watch_interval',
+                 default=1.0,
+                 help=('Seconds between two rounds of the deploy status '
+                       'watcher. A DU port is probed at most once per '
+                       'round.')),
+    cfg.IntOpt('max_concurrent_probes',
+               default=100,
+               help='Maximum number of DU probes run at the same time.'),
+    cfg.FloatOpt('du_probe_timeout',
+                 default=2.0,
+                 help='Timeout in seconds of a single DU port probe.'),
+    cfg.FloatOpt('du_probe_interval',
+                 default=1.0,
+                 help=('Seconds before probing a DU port again after its '
+                       'first failed probe. The delay doubles, with '
+                       'jitter, after every further failure.')),
+    cfg.FloatOpt('du_probe_max_interval',
+                 default=10.0,
+                 help='Upper bound of the delay between two DU port probes.'),
+    cfg.FloatOpt('du_wait_timeout',
+                 default=500.0,
+                 help=('Seconds to wait for all the ports of a DU to '
+                       'answer once its stack is complete. The DU is '
+                       'failed at its first unanswered probe after that, '
+                       'or once it has been probed du_attempts times.')),
+    cfg.IntOpt('stack_list_batch_size',
+               default=100,
+               help='Maximum number of stacks queried in one Heat call.'),
+]
+
+cfg.CONF.register_opts(WATCHER_OPTS, group='deployer')
+
+
+class _Watch(object):
+    """A stack the deployer is waiting on, and then its DU."""
+
+    def __init__(self, ctxt, assembly_id, osc, stack_id, ports=None,
+                 done=None):
+        self.ctxt = ctxt
+        self.assembly_id = assembly_id
+        self.osc = osc
+        self.stack_id = stack_id
+        self.ports = ports or []
+        self.done = done
+        self.attempts = 0
+        self.started_at = time.time()
+        self.wait_interval = cfg.CONF.deployer.wait_interval
+        self.next_check = self.started_at + self.wait_interval
+        self.host_ip = None
+        self.stack_done_at = None
+        # port -> (failed probes, time of the next probe)
+        self.pending_ports = {}
+        # probes of all the ports of the DU
+        self.probes = 0
+
+    def retry(self):
+        """Schedule the next check; False once out of attempts."""
+        self.attempts += 1
+        self.wait_interval *= cfg.CONF.deployer.growth_factor
+        self.next_check = time.time() + self.wait_interval
+        return self.attempts < cfg.CONF.deployer.max_attempts
+
+    def due_ports(self, now):
+        return [port for port, (failures, next_probe)
+                in sorted(self.pending_ports.items()) if next_probe <= now]
+
+    def probe_failed(self, port):
+        """Back off port with jitter; False once out of attempts or time."""
+        failures = self.pending_ports[port][0] + 1
+        delay = min(cfg.CONF.deployer.du_probe_interval * 2 ** (failures - 1),
+                    cfg.CONF.deployer.du_probe_max_interval)
+        # Spread the probes of DUs that came up together.
+        delay = random.uniform(delay / 2, delay)
+        now = time.time()
+        self.pending_ports[port] = (failures, now + delay)
+        return (self.probes < cfg.CONF.deployer.du_attempts and
+                now - self.stack_done_at < cfg.CONF.deployer.du_wait_timeout)
+
+
+class StatusWatcher(object):
+    """Follow many pending stacks from one green thread.
+
+    :param update_assembly: called as update_assembly(ctxt, assembly_id,
+                            data) to report progress
+    :param parse_url: returns the DU host of a complete stack, or None
+    """
+
+    def __init__(self, update_assembly, parse_url):
+        self._update_assembly = update_assembly
+        self._parse_url = parse_url
+        self._creating = {}
+        self._deleting = {}
+        self._dus = {}
+        self._thread = None
+        self._http = pools.Pool(
+            max_size=cfg.CONF.deployer.max_concurrent_probes,
+            create=lambda: httplib2.Http(
+                timeout=cfg.CONF.deployer.du_probe_timeout))
+
+    def __len__(self):
+        return len(self._creating) + len(self._deleting) + len(self._dus)
+
+    def watch_create(self, ctxt, assembly_id, osc, stack_id, ports):
+        """Wait for stack_id to be created and its DU to answer."""
+        self._creating[stack_id] = _Watch(ctxt, assembly_id, osc, stack_id,
+                                          ports)
+        self._start()
+
+    def watch_delete(self, ctxt, assembly_id, osc, stack_id, done):
+        """Wait for stack_id to be deleted.
+
+        :param done: called as done(deleted) once the stack is gone or
+                     the deployer gave up on it
+        """
+        self._creating.pop(stack_id, None)
+        self._dus.pop(stack_id, None)
+        self._deleting[stack_id] = _Watch(ctxt, assembly_id, osc, stack_id,
+                                          done=done)
+        self._start()
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = eventlet.spawn_n(self._run)
+
+    def _run(self):
+        try:
+            while len(self):
+                eventlet.sleep(cfg.CONF.deployer.watch_interval)
+                try:
+                    self.poll()
+                except Exception as e:
+                    LOG.exception(e)
+        finally:
+            self._thread = None
+
+    def poll(self):
+        """Run one round of checks on everything that is due."""
+        now = time.time()
+        due = [w for w in self._creating.values() if w.next_check <= now]
+        due += [w for w in self._deleting.values() if w.next_check <= now]
+        for tenant_watches in _by_tenant(due).values():
+            batch_size = cfg.CONF.deployer.stack_list_batch_size
+            for start in range(0, len(tenant_watches), batch_size):
+                self._check_stacks(tenant_watches[start:start + batch_size])
+
+        now = time.time()
+        probes = [(watch, port) for watch in list(self._dus.values())
+                  for port in watch.due_ports(now)]
+        if probes:
+            pool = eventlet.GreenPool(cfg.CONF.deployer.max_concurrent_probes)
+            for watch, port in probes:
+                pool.spawn_n(self._probe_du, watch, port)
+            pool.waitall()
+            self._prune_connections()
+
+    def _check_stacks(self, watches):
+        heat = watches[0].osc.heat()
+        try:
+            stacks = dict((stack.id, stack) for stack in heat.stacks.list(
+                filters={'id': [w.stack_id for w in watches]}))
+        except Exception as e:
+            LOG.exception(e)
+            stacks = None
+
+        # A watch may have been replaced or dropped while Heat answered.
+        for watch in watches:
+            if self._deleting.get(watch.stack_id) is watch:
+                self._check_delete(watch, stacks)
+            elif self._creating.get(watch.stack_id) is watch:
+                self._check_create(watch, stacks)
+
+    def _check_create(self, watch, stacks):
+        stack = None if stacks is None else stacks.get(watch.stack_id)
+        if stack is not None and stack.status == 'COMPLETE':
+            try:
+                # Only a stack show carries the outputs.
+                stack = watch.osc.heat().stacks.get(watch.stack_id)
+            except Exception as e:
+                LOG.exception(e)
+            else:
+                if self._creating.get(watch.stack_id) is not watch:
+                    return
+                self._creating.pop(watch.stack_id)
+                self._stack_created(watch, stack)
+                return
+        elif stack is not None and stack.status == 'FAILED':
+            self._creating.pop(watch.stack_id)
+            self._update(watch, {'status': STATES.ERROR_STACK_CREATE_FAILED})
+            return
+
+        if not watch.retry():
+            self._creating.pop(watch.stack_id)
+            self._update(watch, {'status': STATES.ERROR_STACK_CREATE_FAILED})
+
+    def _stack_created(self, watch, stack):
+        host_ip = self._parse_url(stack)
+        if host_ip is None:
+            LOG.error("Could not parse url from heat stack %s." %
+                      watch.stack_id)
+            self._update(watch, {'status': STATES.ERROR})
+            return
+
+        LOG.debug("HOST IP:%s, PORTS:%s" % (host_ip, watch.ports))
+        self._update(watch, {'status': STATES.WAITING_FOR_DOCKER_DU,
+                             'application_uri': host_ip})
+        watch.host_ip = host_ip
+        watch.stack_done_at = time.time()
+        watch.pending_ports = dict((port, (0, watch.stack_done_at))
+                                   for port in watch.ports)
+        self._dus[watch.stack_id] = watch
+        if not watch.ports:
+            self._du_ready(watch)
+
+    def _check_delete(self, watch, stacks):
+        if stacks is not None:
+            stack = stacks.get(watch.stack_id)
+            # Deleted stacks drop out of the listing.
+            if stack is None or stack.stack_status == 'DELETE_COMPLETE':
+                self._deleting.pop(watch.stack_id)
+                watch.done(True)
+                return
+
+        if not watch.retry():
+            self._deleting.pop(watch.stack_id)
+            self._update(watch, {'status': STATES.ERROR_STACK_DELETE_FAILED})
+            watch.done(False)
+
+    def _probe_du(self, watch, port):
+        du_url = 'http://{host}:{port}'.format(host=watch.host_ip, port=port)
+        reachable = False
+        watch.probes += 1
+        with self._http.item() as conn:
+            try:
+                reachable = repo_utils.is_reachable(du_url, conn)
+            except socket.timeout:
+                _close(conn, du_url)
+                LOG.debug("Connection to %s timed out, assembly ID: %s" %
+                          (du_url, watch.assembly_id))
+            except (httplib2.HttpLib2Error, socket.error) as serr:
+                _close(conn, du_url)
+                if watch.pending_ports[port][0] % 5 == 0:
+                    LOG.exception(serr)
+                else:
+                    LOG.debug(".")
+            except Exception as exp:
+                _close(conn, du_url)
+                LOG.exception(exp)
+                if self._dus.get(watch.stack_id) is watch:
+                    self._dus.pop(watch.stack_id)
+                    self._update(watch, {'status': STATES.ERROR})
+                return
+
+        if self._dus.get(watch.stack_id) is not watch:
+            # Another port of this DU already failed it, or the stack is
+            # being deleted.
+            return
+        if reachable:
+            del watch.pending_ports[port]
+            if not watch.pending_ports:
+                self._du_ready(watch)
+        elif not watch.probe_failed(port):
+            self._dus.pop(watch.stack_id)
+            self._update(watch, {'status': STATES.ERROR_DU_CREATION})
+
+    def _du_ready(self, watch):
+        self._dus.pop(watch.stack_id, None)
+        now = time.time()
+        LOG.info("Assembly %s ready %.1fs after deploy (stack %.1fs, "
+                 "DU %.1fs)" % (watch.assembly_id, now - watch.started_at,
+                                watch.stack_done_at - watch.started_at,
+                                now - watch.stack_done_at))
+        self._update(watch, {'status': STATES.READY,
+                             'application_uri': watch.host_ip})
+
+    def _update(self, watch, data):
+        self._update_assembly(watch.ctxt, watch.assembly_id, data)
+
+    def _prune_connections(self):
+        # DUs come and go; keep-alive sockets only to the ports still
+        # waited on, so that they do not pile up.
+        waited = set('http:%s:%s' % (watch.host_ip, port)
+                     for watch in self._dus.values()
+                     for port in watch.pending_ports)
+        for http in self._http.free_items:
+            for key in list(http.connections):
+                if key not in waited:
+                    http.connections.pop(key).close()
+
+
+def _close(http, url):
+    """Drop the connection of http to url, which may be broken."""
+    scheme, _, authority = url.partition('://')
+    conn = http.connections.pop('%s:%s' % (scheme, authority), None)
+    if conn is not None:
+        conn.close()
+
+
+def _by_tenant(watches):
+    tenants = {}
+    for watch in watches:
+        tenants.setdefault(watch.ctxt.tenant, []).append(watch)
+    return tenants
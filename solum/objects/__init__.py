@@ -25,6 +25,8 @@ and all objects should be retrieved via
 in application code.
 """
 
+import functools
+
 from oslo.config import cfg
 from oslo.db import api
 
@@ -54,6 +56,19 @@ def new_schema():
     return cfg.CONF.database.schema_mode != 'old'
 
 
+def replica_reads(func):
+    """Decorator letting the reads made by func go to the database replica.
+
+    For handler methods that only read and can live with replication lag,
+    see replica_reads in the backend.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with IMPL.replica_reads():
+            return func(*args, **kwargs)
+    return wrapper
+
+
 def load():
     """Ensure that the object model is initialized."""
     global registry
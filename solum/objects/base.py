@@ -46,8 +46,10 @@ class CrudMixin(object):
 
 class CrudListMixin(object):
     @classmethod
-    def get_all(cls, context):
+    def get_all(cls, context, **query):
         """Retrieve all applications for the active context.
 
-        Context may be global or tenant scoped.
+        Context may be global or tenant scoped. The query may hold
+        filters and a page to return, see
+        solum.objects.sqlalchemy.models.model_query.
         """
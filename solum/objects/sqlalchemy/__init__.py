@@ -12,24 +12,160 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import contextlib
 import sys
 
+from eventlet import corolocal
 from oslo.config import cfg
 from oslo.db.sqlalchemy import session
+import sqlalchemy as sa
 
 
+cfg.CONF.import_opt('slave_connection', 'oslo.db.options', group='database')
+
 _FACADE = None
 
+# Per green thread, whether or not eventlet has patched threading yet:
+# the services import this module before they monkey patch.
+_scope = corolocal.local()
+
 
 def get_facade():
     global _FACADE
 
     if not _FACADE:
         _FACADE = session.EngineFacade.from_config(cfg.CONF)
+        engines = set([_FACADE.get_engine(),
+                       _FACADE.get_engine(use_slave=True)])
+        for engine in engines:
+            sa.event.listen(engine, 'checkout', _checked_out)
     return _FACADE
 
 get_engine = lambda: get_facade().get_engine()
-get_session = lambda: get_facade().get_session()
+
+
+def _checked_out(dbapi_connection, connection_record, connection_proxy):
+    if getattr(_scope, 'depth', 0):
+        _scope.checkouts += 1
+
+
+def _reads_from_slave():
+    return (getattr(_scope, 'replica_reads', 0) and
+            not getattr(_scope, 'wrote', False) and
+            cfg.CONF.database.slave_connection)
+
+
+def _new_session(use_slave, bind=None):
+    new = get_facade().get_session(use_slave=use_slave)
+    if bind is not None:
+        new.bind = bind
+    if not use_slave:
+        begin = new.begin
+
+        def tracked_begin(*args, **kwargs):
+            # Reads made after a write must see it; see replica_reads.
+            _scope.wrote = True
+            if bind is not None:
+                # Transactions begun while another is open become
+                # part of it.
+                kwargs.setdefault('subtransactions', True)
+            return begin(*args, **kwargs)
+        new.begin = tracked_begin
+    return new
+
+
+def get_session(use_slave=False):
+    """Return the session of the current scope, or a new one outside any.
+
+    :param use_slave: the caller only reads. Within replica_reads(), and
+                      until something is written, such reads are served
+                      from the database.slave_connection replica.
+    """
+    use_slave = bool(use_slave and _reads_from_slave())
+    if not getattr(_scope, 'depth', 0):
+        return _new_session(use_slave)
+    if use_slave not in _scope.sessions:
+        # One connection per database serves the whole scope.
+        connection = get_facade().get_engine(use_slave=use_slave).connect()
+        _scope.sessions[use_slave] = (_new_session(use_slave, connection),
+                                      connection)
+    return _scope.sessions[use_slave][0]
+
+
+def begin_scope():
+    """Share one session between the object calls made until end_scope().
+
+    Meant to span one unit of work, such as an API request or an RPC
+    message. The connection is checked out on first use and held until
+    the scope ends. Scopes may nest; the outermost one counts.
+    """
+    _scope.depth = getattr(_scope, 'depth', 0) + 1
+    if _scope.depth == 1:
+        _scope.sessions = {}
+        _scope.checkouts = 0
+        _scope.wrote = False
+
+
+def end_scope():
+    """End the scope begun last.
+
+    :returns: the number of connections checked out from the pool during
+              the outermost scope, None if a scope is still open
+    """
+    if not getattr(_scope, 'depth', 0):
+        return None
+    _scope.depth -= 1
+    if _scope.depth:
+        return None
+    _close_sessions()
+    return _scope.checkouts
+
+
+def release_scope():
+    """Give back the connections of the current scope, and keep it open.
+
+    For a unit of work about to wait a long time without the database.
+    The objects it loaded are detached; its next object call checks out
+    a connection again.
+    """
+    if getattr(_scope, 'depth', 0):
+        _close_sessions()
+
+
+def _close_sessions():
+    sessions, _scope.sessions = _scope.sessions, {}
+    for scoped, connection in sessions.values():
+        try:
+            scoped.close()
+        finally:
+            connection.close()
+
+
+@contextlib.contextmanager
+def session_scope():
+    begin_scope()
+    try:
+        yield
+    finally:
+        end_scope()
+
+
+@contextlib.contextmanager
+def replica_reads():
+    """Let the reads made in the block go to the slave_connection replica.
+
+    Once the block, or the scope it runs in, has begun a transaction on
+    the primary, later reads go to the primary again so that they see
+    what was written. Does nothing unless slave_connection is set.
+    """
+    if not getattr(_scope, 'replica_reads', 0) and \
+            not getattr(_scope, 'depth', 0):
+        _scope.wrote = False
+    _scope.replica_reads = getattr(_scope, 'replica_reads', 0) + 1
+    try:
+        yield
+    finally:
+        _scope.replica_reads -= 1
 
 
 def get_backend():
@@ -40,6 +176,7 @@ def get_backend():
 def cleanup():
     global _FACADE
 
+    _scope.__dict__.clear()
     if _FACADE:
         _FACADE._session_maker.close_all()
         _FACADE.get_engine().dispose()
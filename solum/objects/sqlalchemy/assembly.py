@@ -32,19 +32,23 @@ class Assembly(sql.Base, abstract.Assembly):
     __table_args__ = sql.table_args()
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
-    uuid = sa.Column(sa.String(36), nullable=False)
-    project_id = sa.Column(sa.String(36))
+    uuid = sa.Column(sa.String(36), nullable=False, unique=True, index=True)
+    project_id = sa.Column(sa.String(36), index=True)
     user_id = sa.Column(sa.String(36))
-    trigger_id = sa.Column(sa.String(36))
+    trigger_id = sa.Column(sa.String(36), index=True)
     trust_id = sa.Column(sa.String(255))
     name = sa.Column(sa.String(100))
     description = sa.Column(sa.String(255))
     tags = sa.Column(sa.Text)
-    plan_id = sa.Column(sa.Integer, sa.ForeignKey('plan.id'), nullable=False)
+    plan_id = sa.Column(sa.Integer, sa.ForeignKey('plan.id'), nullable=False,
+                        index=True)
     status = sa.Column(sa.String(36))
     application_uri = sa.Column(sa.String(1024))
     username = sa.Column(sa.String(256))
-    workflow = sa.Column(sql.YAMLEncodedDict(1024))
+    _workflow = sa.Column('workflow', sa.Text(1024))
+    workflow = sql.LazyJSONDict('_workflow')
+    version = sa.Column(sa.Integer, nullable=False, default=0,
+                        server_default='0')
 
     @classmethod
     def _raise_trigger_not_found(cls, item_id):
@@ -68,14 +72,24 @@ class Assembly(sql.Base, abstract.Assembly):
         else:
             return True
 
+    @classmethod
+    def _updatable_criterion(cls, values):
+        if (values.get('status') ==
+                ASSEMBLY_STATES.ERROR_STACK_DELETE_FAILED):
+            # The outcome of the delete itself.
+            return None
+        return sa.or_(cls.status.is_(None),
+                      cls.status != ASSEMBLY_STATES.DELETING)
+
     @property
     def plan_uuid(self):
-        return objects.registry.Plan.get_by_id(None, self.plan_id).uuid
+        return self._get_related_uuid(objects.registry.Plan, self.plan_id)
 
     @plan_uuid.setter
     def plan_uuid(self, value):
         plan = objects.registry.Plan.get_by_uuid(None, value)
         self.plan_id = plan.id
+        self._cache_related_uuid(objects.registry.Plan, plan.id, value)
 
     @property
     def _extra_keys(self):
@@ -84,8 +98,11 @@ class Assembly(sql.Base, abstract.Assembly):
     @property
     def components(self):
         session = sql.Base.get_session()
-        return session.query(component.Component).filter_by(
+        comps = session.query(component.Component).filter_by(
             assembly_id=self.id).all()
+        for comp in comps:
+            comp._cache_related_uuid(Assembly, self.id, self.uuid)
+        return comps
 
     @retry
     def destroy(self, context):
@@ -107,7 +124,12 @@ class AssemblyList(abstract.AssemblyList):
     """Represent a list of assemblies in sqlalchemy."""
 
     @classmethod
-    def get_all(cls, context):
-        mq = sql.model_query(context, Assembly).order_by(
-            'updated_at desc', 'created_at desc')
-        return AssemblyList(mq)
+    def get_all(cls, context, **query):
+        query.setdefault('default_sort_key', 'updated_at')
+        query.setdefault('default_sort_dir', 'desc')
+        columns = query.get('columns')
+        items = sql.model_query(context, Assembly, **query).all()
+        if columns is None or 'plan_id' in columns:
+            items = sql.load_related_uuids(items, objects.registry.Plan,
+                                           'plan_id')
+        return AssemblyList(items)
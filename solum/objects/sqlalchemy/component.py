@@ -29,8 +29,8 @@ class Component(sql.Base, abstract.Component):
     __table_args__ = sql.table_args()
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
-    uuid = sa.Column(sa.String(36))
-    project_id = sa.Column(sa.String(36))
+    uuid = sa.Column(sa.String(36), unique=True, index=True)
+    project_id = sa.Column(sa.String(36), index=True)
     user_id = sa.Column(sa.String(36))
     name = sa.Column(sa.String(100))
     component_type = sa.Column(sa.String(100))
@@ -43,14 +43,15 @@ class Component(sql.Base, abstract.Component):
 
     @property
     def assembly_uuid(self):
-        if self.assembly_id is None:
-            return None
-        return objects.registry.Assembly.get_by_id(None, self.assembly_id).uuid
+        return self._get_related_uuid(objects.registry.Assembly,
+                                      self.assembly_id)
 
     @assembly_uuid.setter
     def assembly_uuid(self, assembly_uuid):
         assembly = objects.registry.Assembly.get_by_uuid(None, assembly_uuid)
         self.assembly_id = assembly.id
+        self._cache_related_uuid(objects.registry.Assembly, assembly.id,
+                                 assembly_uuid)
 
     @property
     def _extra_keys(self):
@@ -74,9 +75,16 @@ class Component(sql.Base, abstract.Component):
         return comp
 
 
+# Assembly.heat_stack_component looks components up by both columns.
+sa.Index('ix_component_assembly_id_component_type',
+         Component.assembly_id, Component.component_type)
+
+
 class ComponentList(abstract.ComponentList):
     """Represent a list of components in sqlalchemy."""
 
     @classmethod
-    def get_all(cls, context):
-        return ComponentList(sql.model_query(context, Component))
+    def get_all(cls, context, **query):
+        return ComponentList(sql.load_related_uuids(
+            sql.model_query(context, Component, **query).all(),
+            objects.registry.Assembly, 'assembly_id'))
@@ -26,13 +26,14 @@ class Execution(sql.Base, abstract.Execution):
     __table_args__ = sql.table_args()
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
-    uuid = sa.Column(sa.String(36))
-    pipeline_id = sa.Column(sa.Integer, sa.ForeignKey('pipeline.id'))
+    uuid = sa.Column(sa.String(36), unique=True, index=True)
+    pipeline_id = sa.Column(sa.Integer, sa.ForeignKey('pipeline.id'),
+                            index=True)
 
 
 class ExecutionList(abstract.ExecutionList):
     """Represent a list of executions in sqlalchemy."""
 
     @classmethod
-    def get_all(cls, context):
-        return ExecutionList(sql.model_query(context, Execution))
+    def get_all(cls, context, **query):
+        return ExecutionList(sql.model_query(context, Execution, **query))
@@ -25,8 +25,8 @@ class Extension(sql.Base, abstract.Extension):
 
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True,
                            autoincrement=True)
-    uuid = sqlalchemy.Column(sqlalchemy.String(36))
-    project_id = sqlalchemy.Column(sqlalchemy.String(36))
+    uuid = sqlalchemy.Column(sqlalchemy.String(36), unique=True, index=True)
+    project_id = sqlalchemy.Column(sqlalchemy.String(36), index=True)
     user_id = sqlalchemy.Column(sqlalchemy.String(36))
     description = sqlalchemy.Column(sqlalchemy.String(255))
     name = sqlalchemy.Column(sqlalchemy.String(100))
@@ -38,5 +38,5 @@ class ExtensionList(abstract.ExtensionList):
     """Represent a list of extensions in sqlalchemy."""
 
     @classmethod
-    def get_all(cls, context):
-        return ExtensionList(sql.model_query(context, Extension))
+    def get_all(cls, context, **query):
+        return ExtensionList(sql.model_query(context, Extension, **query))
@@ -35,12 +35,12 @@ class Image(sql.Base, abstract.Image):
     __table_args__ = sql.table_args()
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
-    uuid = sa.Column(sa.String(36), nullable=False)
+    uuid = sa.Column(sa.String(36), nullable=False, unique=True, index=True)
     name = sa.Column(sa.String(100))
     source_uri = sa.Column(sa.String(1024))
     source_format = sa.Column(sa.String(36))
     description = sa.Column(sa.String(255))
-    project_id = sa.Column(sa.String(36))
+    project_id = sa.Column(sa.String(36), index=True)
     user_id = sa.Column(sa.String(36))
     tags = sa.Column(sa.Text)
     status = sa.Column(sa.String(12))
@@ -49,6 +49,10 @@ class Image(sql.Base, abstract.Image):
     image_format = sa.Column(sa.String(12))
     artifact_type = sa.Column(sa.String(36))
     external_ref = sa.Column(sa.String(1024))
+    build_key = sa.Column(sa.String(64))
+    prewarm = sa.Column(sa.Boolean, default=True, server_default='1')
+    version = sa.Column(sa.Integer, nullable=False, default=0,
+                        server_default='0')
 
     @classmethod
     def get_lp_by_name_or_uuid(cls, context, name_or_uuid):
@@ -74,26 +78,61 @@ class Image(sql.Base, abstract.Image):
             cls._raise_not_found(name)
 
     @classmethod
-    def get_all_languagepacks(cls, context):
-        """Return all images that are languagepacks."""
+    def get_by_build_key(cls, context, build_key):
+        """Return the last successful build of these inputs, or None.
+
+        A build is skipped once a later one produced the same image
+        reference from other inputs: a docker registry, for one, reuses
+        the image name for every build of an assembly.
+        """
         session = Image.get_session()
+        # Never across projects, even for an admin.
+        query = session.query(cls).filter_by(project_id=context.tenant,
+                                             build_key=build_key,
+                                             status=abstract.States.READY)
+        image = query.order_by(cls.id.desc()).first()
+        if image is None:
+            return None
+
+        latest = session.query(cls).filter_by(
+            project_id=context.tenant, external_ref=image.external_ref,
+            status=abstract.States.READY).order_by(cls.id.desc()).first()
+        if latest.build_key != build_key:
+            return None
+        return image
+
+    @classmethod
+    def get_all_languagepacks(cls, context, **query):
+        """Return all images that are languagepacks."""
+        session = Image.get_session(use_slave=True)
         result = session.query(cls)
+        columns = query.pop('columns', None)
+        if columns is not None:
+            result = result.options(sql.load_only(cls, columns))
         result = result.filter_by(artifact_type='language_pack')
         result = result.filter(
             Image.project_id.in_([operator_id, context.tenant]))
-        return result.all()
+        result = sql.filter_query(cls, result, query.pop('filters', None))
+        return sql.paginate_query(cls, result, **query).all()
+
+
+# Language packs are looked up by name within artifact_type.
+sa.Index('ix_image_artifact_type_name', Image.artifact_type, Image.name)
+sa.Index('ix_image_project_id_build_key', Image.project_id, Image.build_key)
 
 
 class ImageList(abstract.ImageList):
     """Represent a list of images in sqlalchemy."""
 
     @classmethod
-    def get_all(cls, context):
+    def get_all(cls, context, **query):
         """Return all images."""
-        return ImageList(sql.model_query(context, Image))
+        return ImageList(sql.model_query(context, Image, **query))
 
     @classmethod
-    def get_all_languagepacks(cls, context):
+    def get_all_languagepacks(cls, context, **query):
         """Return all images that are languagepacks."""
-        return ImageList(sql.model_query(
-            context, Image).filter_by(artifact_type='language_pack'))
+        filters = dict(query.pop('filters', None) or {},
+                       artifact_type='language_pack')
+        return ImageList(sql.model_query(context, Image, filters=filters,
+                                         **query))
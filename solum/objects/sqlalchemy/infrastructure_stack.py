@@ -26,8 +26,8 @@ class InfrastructureStack(sql.Base, abstract.InfrastructureStack):
     __table_args__ = sql.table_args()
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
-    uuid = sa.Column(sa.String(36), nullable=False)
-    project_id = sa.Column(sa.String(36))
+    uuid = sa.Column(sa.String(36), nullable=False, unique=True, index=True)
+    project_id = sa.Column(sa.String(36), index=True)
     user_id = sa.Column(sa.String(36))
     image_id = sa.Column(sa.String(36))
     heat_stack_id = sa.Column(sa.String(36))
@@ -40,6 +40,6 @@ class InfrastructureStackList(abstract.InfrastructureStackList):
     """Represent a list of infrastructure_stacks in sqlalchemy."""
 
     @classmethod
-    def get_all(cls, context):
-        return InfrastructureStackList(sql.model_query(context,
-                                                       InfrastructureStack))
+    def get_all(cls, context, **query):
+        return InfrastructureStackList(sql.model_query(
+            context, InfrastructureStack, **query))
@@ -0,0 +1,38 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""add version to assembly and image
+
+Revision ID: 3c8e4b5a1d2f
+Revises: 4a8d0e9c2b7f
+Create Date: 2015-03-30 14:12:40.118273
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3c8e4b5a1d2f'
+down_revision = '4a8d0e9c2b7f'
+
+
+def upgrade():
+    for table in ('assembly', 'image'):
+        op.add_column(table,
+                      sa.Column('version', sa.Integer, nullable=False,
+                                server_default='0'))
+
+
+def downgrade():
+    for table in ('image', 'assembly'):
+        op.drop_column(table, 'version')
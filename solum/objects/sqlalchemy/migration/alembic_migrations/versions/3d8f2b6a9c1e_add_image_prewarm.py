@@ -0,0 +1,35 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""add prewarm to image
+
+Revision ID: 3d8f2b6a9c1e
+Revises: 7a2c9e4f1b3d
+Create Date: 2015-04-13 10:27:05.614392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3d8f2b6a9c1e'
+down_revision = '7a2c9e4f1b3d'
+
+
+def upgrade():
+    op.add_column('image', sa.Column('prewarm', sa.Boolean,
+                                     server_default='1'))
+
+
+def downgrade():
+    op.drop_column('image', 'prewarm')
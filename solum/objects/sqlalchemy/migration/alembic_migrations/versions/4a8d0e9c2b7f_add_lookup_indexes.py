@@ -0,0 +1,71 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""add indexes for lookup columns
+
+Revision ID: 4a8d0e9c2b7f
+Revises: 1f57763d7871
+Create Date: 2015-03-23 11:02:17.526318
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '4a8d0e9c2b7f'
+down_revision = '1f57763d7871'
+
+UUID_TABLES = ['sensor', 'operation', 'image', 'extension', 'plan',
+               'assembly', 'pipeline', 'execution', 'infrastructure_stack',
+               'component', 'service']
+
+PROJECT_TABLES = ['sensor', 'operation', 'image', 'extension', 'plan',
+                  'assembly', 'pipeline', 'infrastructure_stack',
+                  'component', 'service']
+
+# (table, columns) for the remaining lookups, most selective column first
+# where the query shape allows it.
+LOOKUP_INDEXES = [
+    ('assembly', ['trigger_id']),
+    ('assembly', ['plan_id']),
+    ('pipeline', ['trigger_id']),
+    ('pipeline', ['plan_id']),
+    ('parameter', ['plan_id']),
+    ('execution', ['pipeline_id']),
+    ('component', ['assembly_id', 'component_type']),
+    ('image', ['artifact_type', 'name']),
+    ('userlogs', ['project_id', 'resource_uuid', 'created_at']),
+]
+
+
+def _index_name(table, columns):
+    return 'ix_%s_%s' % (table, '_'.join(columns))
+
+
+def upgrade():
+    for table in UUID_TABLES:
+        op.create_index(_index_name(table, ['uuid']), table, ['uuid'],
+                        unique=True)
+    for table in PROJECT_TABLES:
+        op.create_index(_index_name(table, ['project_id']), table,
+                        ['project_id'])
+    for table, columns in LOOKUP_INDEXES:
+        op.create_index(_index_name(table, columns), table, columns)
+
+
+def downgrade():
+    for table, columns in reversed(LOOKUP_INDEXES):
+        op.drop_index(_index_name(table, columns), table_name=table)
+    for table in reversed(PROJECT_TABLES):
+        op.drop_index(_index_name(table, ['project_id']), table_name=table)
+    for table in reversed(UUID_TABLES):
+        op.drop_index(_index_name(table, ['uuid']), table_name=table)
@@ -0,0 +1,75 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""store plan, parameter and workflow documents as json
+
+Revision ID: 5b7e1d4c9a3f
+Revises: 3c8e4b5a1d2f
+Create Date: 2015-04-02 10:47:21.530912
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+from solum.common import yamlutils
+
+# revision identifiers, used by Alembic.
+revision = '5b7e1d4c9a3f'
+down_revision = '3c8e4b5a1d2f'
+
+COLUMNS = [('plan', 'raw_content'),
+           ('parameter', 'user_defined_params'),
+           ('parameter', 'sys_defined_params'),
+           ('assembly', 'workflow')]
+
+
+def _load(value):
+    # JSON, or YAML written before this revision.
+    try:
+        return json.loads(value)
+    except ValueError:
+        return yamlutils.load(value)
+
+
+def _dump_json(value):
+    # YAML may hold dates, which JSON keeps as strings.
+    return json.dumps(value, default=str)
+
+
+def _convert(encode):
+    conn = op.get_bind()
+    for table_name, column_name in COLUMNS:
+        table = sa.table(table_name, sa.column('id', sa.Integer),
+                         sa.column(column_name, sa.Text))
+        column = table.c[column_name]
+        rows = conn.execute(sa.select([table.c.id, column]).where(
+            column.isnot(None))).fetchall()
+        for row_id, value in rows:
+            try:
+                new_value = encode(_load(value))
+            except ValueError:
+                # Unreadable either way; leave it as it is.
+                continue
+            if new_value != value:
+                conn.execute(table.update().where(
+                    table.c.id == row_id).values({column_name: new_value}))
+
+
+def upgrade():
+    _convert(_dump_json)
+
+
+def downgrade():
+    _convert(yamlutils.dump)
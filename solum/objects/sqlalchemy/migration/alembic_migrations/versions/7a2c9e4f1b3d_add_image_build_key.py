@@ -0,0 +1,37 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""add build_key to image
+
+Revision ID: 7a2c9e4f1b3d
+Revises: 5b7e1d4c9a3f
+Create Date: 2015-04-06 14:12:40.318275
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7a2c9e4f1b3d'
+down_revision = '5b7e1d4c9a3f'
+
+
+def upgrade():
+    op.add_column('image', sa.Column('build_key', sa.String(length=64)))
+    op.create_index('ix_image_project_id_build_key', 'image',
+                    ['project_id', 'build_key'])
+
+
+def downgrade():
+    op.drop_index('ix_image_project_id_build_key', table_name='image')
+    op.drop_column('image', 'build_key')
@@ -25,8 +25,10 @@ from oslo.db import exception as db_exc
 from oslo.db.sqlalchemy import models
 import six
 from six import moves
+import sqlalchemy as sa
 from sqlalchemy import exc as sqla_exc
 from sqlalchemy.ext import declarative
+from sqlalchemy import orm
 from sqlalchemy.orm import exc
 from sqlalchemy import types
 
@@ -34,6 +36,7 @@ from solum.common import exception
 from solum.common import yamlutils
 from solum import objects
 from solum.objects import sqlalchemy as object_sqla
+from solum.openstack.common import jsonutils
 from solum.openstack.common import log as logging
 from solum.openstack.common import uuidutils
 
@@ -92,12 +95,167 @@ def model_query(context, model, *args, **kwargs):
 
     :param context: context to query under
     :param session: if present, the session to use
+    :param filters: if present, a dict of column name to required value,
+                    see filter_query
+    :param columns: if present, the names of the only columns to load,
+                    for callers that render a few fields of each row;
+                    the others are loaded on first access
+    :param limit, marker, sort_key, sort_dir: if present, see paginate_query
     """
 
-    session = kwargs.get('session') or object_sqla.get_session()
+    session = (kwargs.pop('session', None) or
+               object_sqla.get_session(use_slave=True))
 
     query = session.query(model, *args)
-    return filter_by_project(context, query)
+    columns = kwargs.pop('columns', None)
+    if columns is not None:
+        query = query.options(load_only(model, columns))
+    query = filter_by_project(context, query)
+    query = filter_query(model, query, kwargs.pop('filters', None))
+    return paginate_query(model, query, **kwargs)
+
+
+def load_only(model, columns):
+    """Return a query option loading only the named columns of model.
+
+    The primary key is always loaded.
+    """
+    mapper = sa.inspect(model)
+    keys = []
+    for name in columns:
+        column = _model_column(model, name)
+        if column is None:
+            raise exception.BadRequest(reason='Unknown column %s.' % name)
+        keys.append(mapper.get_property_by_column(column).key)
+    return orm.load_only(*keys)
+
+
+def filter_query(model, query, filters):
+    """Restrict query to the rows matching every filter.
+
+    A filter on '<parent>_uuid' matches the '<parent>_id' foreign key of
+    the model against the parent row with that uuid, in the same query.
+    """
+    for key, value in sorted((filters or {}).items()):
+        column = _model_column(model, key)
+        if column is None and key.endswith('_uuid'):
+            column = _model_column(model, key[:-len('uuid')] + 'id')
+            if column is not None and column.foreign_keys:
+                parent = list(column.foreign_keys)[0].column.table
+                value = sa.select([parent.c.id]).where(
+                    parent.c.uuid == value).as_scalar()
+            else:
+                column = None
+        if column is None:
+            raise exception.BadRequest(
+                reason='Unknown filter %s.' % key)
+        query = query.filter(column == value)
+    return query
+
+
+def paginate_query(model, query, limit=None, marker=None, sort_key=None,
+                   sort_dir=None, default_sort_key=None,
+                   default_sort_dir='asc'):
+    """Order query and return one page of it, using keyset pagination.
+
+    Pages are read with a WHERE on the sort key of the last row of the
+    previous page rather than with an OFFSET, so reading deep pages costs
+    the same as reading the first one. The id column breaks ties.
+
+    :param limit: maximum number of rows to return
+    :param marker: uuid (or id, for models without a uuid column) of the
+                   last row of the previous page
+    :param sort_key: column to sort on
+    :param sort_dir: 'asc' or 'desc'
+    :param default_sort_key, default_sort_dir: ordering used when the
+                   caller does not ask for one
+    :returns: query unchanged if no ordering or page is asked for
+    """
+    if limit is not None and limit <= 0:
+        raise exception.BadRequest(reason='limit must be positive.')
+    if sort_dir not in (None, 'asc', 'desc'):
+        raise exception.BadRequest(
+            reason="sort_dir must be 'asc' or 'desc'.")
+    if all(arg is None for arg in (limit, marker, sort_key, sort_dir,
+                                   default_sort_key)):
+        return query
+
+    sort_key = sort_key or default_sort_key or 'id'
+    sort_dir = sort_dir or default_sort_dir
+    if _model_column(model, sort_key) is None:
+        raise exception.BadRequest(
+            reason='Unknown sort key %s.' % sort_key)
+    keys = [sort_key] if sort_key == 'id' else [sort_key, 'id']
+    order = sa.desc if sort_dir == 'desc' else sa.asc
+
+    if marker is not None:
+        marker_key = 'uuid' if _model_column(model, 'uuid') is not None \
+            else 'id'
+        marker_row = query.with_entities(model).filter(
+            getattr(model, marker_key) == marker).first()
+        if marker_row is None:
+            raise exception.BadRequest(
+                reason='Marker %s not found.' % marker)
+        after = []
+        for i, key in enumerate(keys):
+            clause = [_equal(_model_column(model, k), getattr(marker_row, k))
+                      for k in keys[:i]]
+            clause.append(_after(_model_column(model, key),
+                                 getattr(marker_row, key), sort_dir))
+            after.append(sa.and_(*clause))
+        query = query.filter(sa.or_(*after))
+
+    query = query.order_by(*[order(_model_column(model, k)) for k in keys])
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def _model_column(model, name):
+    return model.__table__.columns.get(name)
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _after(column, value, sort_dir):
+    # NULLs sort first in ascending order on both MySQL and SQLite.
+    if sort_dir == 'asc':
+        return column.isnot(None) if value is None else column > value
+    if value is None:
+        return sa.false()
+    return sa.or_(column < value, column.is_(None))
+
+
+def load_related_uuids(items, model, fk_name, session=None, batch_size=500):
+    """Resolve the uuids referenced through fk_name for all items at once.
+
+    Serializing a list of objects that expose the uuid of a parent (such as
+    Assembly.plan_uuid) would otherwise query the parent table once per
+    item.
+
+    :param items: objects holding the foreign key
+    :param model: the model class the foreign key points to
+    :param fk_name: name of the foreign key attribute on the items
+    :returns: items, with the resolved uuids cached on each of them
+    """
+    ids = list(set(getattr(item, fk_name) for item in items) - set([None]))
+    if not ids:
+        return items
+
+    session = session or object_sqla.get_session(use_slave=True)
+    uuids = {}
+    for start in range(0, len(ids), batch_size):
+        rows = session.query(model.id, model.uuid).filter(
+            model.id.in_(ids[start:start + batch_size]))
+        uuids.update(rows)
+
+    for item in items:
+        fk = getattr(item, fk_name)
+        if fk in uuids:
+            item._cache_related_uuid(model, fk, uuids[fk])
+    return items
 
 
 class SolumBase(models.TimestampMixin, models.ModelBase):
@@ -117,13 +275,13 @@ class SolumBase(models.TimestampMixin, models.ModelBase):
         return d
 
     @classmethod
-    def get_session(cls):
-        return object_sqla.get_session()
+    def get_session(cls, use_slave=False):
+        return object_sqla.get_session(use_slave=use_slave)
 
     @classmethod
     def get_by_id(cls, context, item_id):
         try:
-            session = SolumBase.get_session()
+            session = SolumBase.get_session(use_slave=True)
             result = session.query(cls).filter_by(id=item_id)
             return filter_by_project(context, result).one()
         except exc.NoResultFound:
@@ -132,7 +290,7 @@ class SolumBase(models.TimestampMixin, models.ModelBase):
     @classmethod
     def get_by_uuid(cls, context, item_uuid):
         try:
-            session = SolumBase.get_session()
+            session = SolumBase.get_session(use_slave=True)
             result = session.query(cls).filter_by(uuid=item_uuid)
             return filter_by_project(context, result).one()
         except exc.NoResultFound:
@@ -145,6 +303,23 @@ class SolumBase(models.TimestampMixin, models.ModelBase):
         else:
             raise exception.ObjectNotUnique(name=cls.__tablename__)
 
+    def _cache_related_uuid(self, model, item_id, item_uuid):
+        cache = self.__dict__.setdefault('_related_uuids', {})
+        cache[(model.__tablename__, item_id)] = item_uuid
+
+    def _get_related_uuid(self, model, item_id):
+        """Return the uuid of the model row with item_id, cached per object.
+
+        See load_related_uuids for filling the cache for a list of objects.
+        """
+        if item_id is None:
+            return None
+        cache = self.__dict__.setdefault('_related_uuids', {})
+        key = (model.__tablename__, item_id)
+        if key not in cache:
+            cache[key] = model.get_by_id(None, item_id).uuid
+        return cache[key]
+
     def _non_updatable_fields(self):
         return set(('uuid', 'id'))
 
@@ -156,9 +331,12 @@ class SolumBase(models.TimestampMixin, models.ModelBase):
         return True
 
     def update(self, data):
-        for field in set(six.iterkeys(data)) - self._non_updatable_fields():
+        for field in (set(six.iterkeys(data)) - self._non_updatable_fields() -
+                      set(['version'])):
             if self._lazyhasattr(field):
                 setattr(self, field, data[field])
+        if 'version' in self.__table__.columns:
+            self.version = (self.version or 0) + 1
 
     @classmethod  # Must be top most
     @retry
@@ -179,16 +357,125 @@ class SolumBase(models.TimestampMixin, models.ModelBase):
         except exc.NoResultFound:
             cls._raise_not_found(id_or_uuid)
 
+    @classmethod
+    def _updatable_criterion(cls, values):
+        """SQL counterpart of _is_updatable, None if every row is.
+
+        :param values: the column values the update sets
+        """
+        return None
+
+    @classmethod
+    def _column_values(cls, data):
+        columns = (set(cls.__table__.columns.keys()) -
+                   cls()._non_updatable_fields() - set(['version']))
+        values = {}
+        for k, v in six.iteritems(data):
+            if k in columns:
+                if isinstance(getattr(cls, k, None), LazyJSONDict):
+                    v = dump_dict(v)
+                values[k] = v
+        return values
+
+    @classmethod
+    def _update_rows(cls, context, session, criterion, values,
+                     synchronize_session='evaluate'):
+        # Objects of the session scope loaded before the UPDATE are kept
+        # in step with it; see synchronize_session in Query.update.
+        query = filter_by_project(context,
+                                  session.query(cls).filter(criterion))
+        updatable = cls._updatable_criterion(values)
+        if updatable is not None:
+            query = query.filter(updatable)
+        if 'version' in cls.__table__.columns:
+            values = dict(values, version=cls.version + 1)
+        return query.update(values, synchronize_session=synchronize_session)
+
+    @classmethod  # Must be top most
+    @retry
+    def update_in_place(cls, context, id_or_uuid, data, version=None):
+        """Update a row with a single UPDATE, without loading it.
+
+        Unlike update_and_save, no row lock is held between reading and
+        writing, and nothing is returned but the count. Only column
+        attributes are set.
+
+        :param version: only update the row if its version column still
+                        holds this value, for optimistic concurrency
+        :returns: the number of rows updated, 0 if the row is missing, not
+                  updatable, or was changed since version was read
+        """
+        values = cls._column_values(data)
+        if not values:
+            return 0
+        if uuidutils.is_uuid_like(id_or_uuid):
+            criterion = cls.uuid == id_or_uuid
+        else:
+            criterion = cls.id == id_or_uuid
+        if version is not None:
+            criterion = sa.and_(criterion, cls.version == version)
+        session = SolumBase.get_session()
+        with session.begin():
+            return cls._update_rows(context, session, criterion, values)
+
+    @classmethod
+    def bulk_update(cls, context, updates, session=None):
+        """Apply a batch of (id_or_uuid, data) updates without loading rows.
+
+        Updates of the same row are merged in order, then the rows getting
+        the same data are changed by a single UPDATE. Only column
+        attributes are set. As with update_and_save, rows that are not
+        updatable are left alone; missing rows are skipped.
+
+        :param session: run in this session's transaction instead of a
+                        new one
+        :returns: the number of rows updated
+        """
+        if session is None:
+            session = SolumBase.get_session()
+            with session.begin():
+                return cls._bulk_update(context, updates, session)
+        return cls._bulk_update(context, updates, session)
+
+    @classmethod
+    def _bulk_update(cls, context, updates, session):
+        rows = {}
+        for id_or_uuid, data in updates:
+            rows.setdefault(id_or_uuid, {}).update(cls._column_values(data))
+
+        groups = {}
+        for id_or_uuid, values in six.iteritems(rows):
+            if values:
+                key = (uuidutils.is_uuid_like(id_or_uuid),
+                       json.dumps(values, sort_keys=True))
+                groups.setdefault(key, (values, []))[1].append(id_or_uuid)
+
+        count = 0
+        for (is_uuid, _key), (values, ids) in six.iteritems(groups):
+            column = cls.uuid if is_uuid else cls.id
+            # IN cannot be evaluated in Python; fetch the matching rows.
+            count += cls._update_rows(context, session, column.in_(ids),
+                                      values, synchronize_session='fetch')
+        return count
+
+    def _store_lazy_dicts(self):
+        for klass in type(self).__mro__:
+            for attr in six.itervalues(vars(klass)):
+                if isinstance(attr, LazyJSONDict):
+                    attr.store(self)
+
     @retry
     def save(self, context):
         if objects.transition_schema():
             self.add_forward_schema_changes()
 
+        self._store_lazy_dicts()
         session = SolumBase.get_session()
         with session.begin():
             session.merge(self)
 
     def create(self, context):
+        self._store_lazy_dicts()
         session = SolumBase.get_session()
         try:
             with session.begin():
@@ -245,3 +532,58 @@ class YAMLEncodedDict(types.TypeDecorator):
         if value is not None:
             value = yamlutils.load(value)
         return value
+
+
+def load_dict(value):
+    """Decode a JSON column value, or a YAML one written before JSON."""
+    if value is None:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return yamlutils.load(value)
+
+
+def dump_dict(value):
+    if value is None:
+        return None
+    return jsonutils.dumps(value)
+
+
+class LazyJSONDict(object):
+    """A structure stored as JSON in the raw_attr column, decoded on use.
+
+    Loading a row only fetches the string. It is parsed the first time
+    the attribute is read, so rows that are never rendered cost nothing
+    to decode. Rows still holding YAML are read too, and are written
+    back as JSON when next saved.
+
+    Unlike JSONEncodedDict the value may be changed in place; the change
+    is written when the object is saved or created.
+    """
+
+    def __init__(self, raw_attr):
+        self.raw_attr = raw_attr
+        self._decoded_attr = '_decoded%s' % raw_attr
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        raw = getattr(obj, self.raw_attr)
+        # (raw string, decoded value); a reloaded row is decoded again.
+        decoded = obj.__dict__.get(self._decoded_attr)
+        if decoded is None or decoded[0] is not raw:
+            decoded = (raw, load_dict(raw))
+            obj.__dict__[self._decoded_attr] = decoded
+        return decoded[1]
+
+    def __set__(self, obj, value):
+        raw = dump_dict(value)
+        setattr(obj, self.raw_attr, raw)
+        obj.__dict__[self._decoded_attr] = (raw, value)
+
+    def store(self, obj):
+        """Encode the decoded value again, if it was ever read or set."""
+        decoded = obj.__dict__.get(self._decoded_attr)
+        if decoded is not None:
+            self.__set__(obj, decoded[1])
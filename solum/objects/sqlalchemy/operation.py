@@ -24,8 +24,8 @@ class Operation(sql.Base, abstract.Operation):
     __table_args__ = sql.table_args()
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
-    uuid = sa.Column(sa.String(36), nullable=False)
-    project_id = sa.Column(sa.String(36))
+    uuid = sa.Column(sa.String(36), nullable=False, unique=True, index=True)
+    project_id = sa.Column(sa.String(36), index=True)
     user_id = sa.Column(sa.String(36))
     name = sa.Column(sa.String(100))
     description = sa.Column(sa.String(255))
@@ -38,5 +38,5 @@ class OperationList(abstract.OperationList):
     """Represent a list of operations in sqlalchemy."""
 
     @classmethod
-    def get_all(cls, context):
-        return OperationList(sql.model_query(context, Operation))
+    def get_all(cls, context, **query):
+        return OperationList(sql.model_query(context, Operation, **query))
@@ -28,9 +28,11 @@ class Parameter(sql.Base, abstract.Parameter):
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
     plan_id = sa.Column(sa.Integer, sa.ForeignKey('plan.id'),
-                        nullable=False)
-    user_defined_params = sa.Column(sql.YAMLEncodedDict(65535))
-    sys_defined_params = sa.Column(sql.YAMLEncodedDict(65535))
+                        nullable=False, index=True)
+    _user_defined_params = sa.Column('user_defined_params', sa.Text(65535))
+    user_defined_params = sql.LazyJSONDict('_user_defined_params')
+    _sys_defined_params = sa.Column('sys_defined_params', sa.Text(65535))
+    sys_defined_params = sql.LazyJSONDict('_sys_defined_params')
 
     @classmethod
     def get_by_plan_id(cls, context, p_id):
@@ -45,5 +47,5 @@ class ParameterList(abstract.ParameterList):
     """Represent a list of parameters in sqlalchemy."""
 
     @classmethod
-    def get_all(cls, context):
-        return ParameterList(sql.model_query(context, Parameter))
+    def get_all(cls, context, **query):
+        return ParameterList(sql.model_query(context, Parameter, **query))
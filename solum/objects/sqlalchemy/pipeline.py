@@ -33,8 +33,8 @@ class Pipeline(sql.Base, abstract.Pipeline):
 
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True,
                            autoincrement=True)
-    uuid = sqlalchemy.Column(sqlalchemy.String(36))
-    project_id = sqlalchemy.Column(sqlalchemy.String(36))
+    uuid = sqlalchemy.Column(sqlalchemy.String(36), unique=True, index=True)
+    project_id = sqlalchemy.Column(sqlalchemy.String(36), index=True)
     user_id = sqlalchemy.Column(sqlalchemy.String(36))
     name = sqlalchemy.Column(sqlalchemy.String(100))
     description = sqlalchemy.Column(sqlalchemy.String(255))
@@ -42,18 +42,19 @@ class Pipeline(sql.Base, abstract.Pipeline):
     workbook_name = sqlalchemy.Column(sqlalchemy.String(255))
     plan_id = sqlalchemy.Column(sqlalchemy.Integer,
                                 sqlalchemy.ForeignKey('plan.id'),
-                                nullable=False)
-    trigger_id = sqlalchemy.Column(sqlalchemy.String(36))
+                                nullable=False, index=True)
+    trigger_id = sqlalchemy.Column(sqlalchemy.String(36), index=True)
     trust_id = sqlalchemy.Column(sqlalchemy.String(255))
 
     @property
     def plan_uuid(self):
-        return objects.registry.Plan.get_by_id(None, self.plan_id).uuid
+        return self._get_related_uuid(objects.registry.Plan, self.plan_id)
 
     @plan_uuid.setter
     def plan_uuid(self, value):
         plan = objects.registry.Plan.get_by_uuid(None, value)
         self.plan_id = plan.id
+        self._cache_related_uuid(objects.registry.Plan, plan.id, value)
 
     @property
     def _extra_keys(self):
@@ -97,5 +98,7 @@ class PipelineList(abstract.PipelineList):
     """Represent a list of pipelines in sqlalchemy."""
 
     @classmethod
-    def get_all(cls, context):
-        return PipelineList(sql.model_query(context, Pipeline))
+    def get_all(cls, context, **query):
+        return PipelineList(sql.load_related_uuids(
+            sql.model_query(context, Pipeline, **query).all(),
+            objects.registry.Plan, 'plan_id'))
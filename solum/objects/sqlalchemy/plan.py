@@ -27,12 +27,13 @@ class Plan(sql.Base, abstract.Plan):
 
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True,
                            autoincrement=True)
-    uuid = sqlalchemy.Column(sqlalchemy.String(36))
-    project_id = sqlalchemy.Column(sqlalchemy.String(36))
+    uuid = sqlalchemy.Column(sqlalchemy.String(36), unique=True, index=True)
+    project_id = sqlalchemy.Column(sqlalchemy.String(36), index=True)
     user_id = sqlalchemy.Column(sqlalchemy.String(36))
     name = sqlalchemy.Column(sqlalchemy.String(255))
     description = sqlalchemy.Column(sqlalchemy.String(255))
-    raw_content = sqlalchemy.Column(sql.YAMLEncodedDict(2048))
+    _raw_content = sqlalchemy.Column('raw_content', sqlalchemy.Text(2048))
+    raw_content = sql.LazyJSONDict('_raw_content')
 
     def _non_updatable_fields(self):
         return set(('uuid', 'id', 'project_id'))
@@ -47,5 +48,5 @@ class PlanList(abstract.PlanList):
     """Represent a list of plans in sqlalchemy."""
 
     @classmethod
-    def get_all(cls, context):
-        return PlanList(sql.model_query(context, Plan))
+    def get_all(cls, context, **query):
+        return PlanList(sql.model_query(context, Plan, **query))
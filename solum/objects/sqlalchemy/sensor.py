@@ -25,8 +25,8 @@ class Sensor(sql.Base, abstract.Sensor):
 
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True,
                            autoincrement=True)
-    uuid = sqlalchemy.Column(sqlalchemy.String(36))
-    project_id = sqlalchemy.Column(sqlalchemy.String(36))
+    uuid = sqlalchemy.Column(sqlalchemy.String(36), unique=True, index=True)
+    project_id = sqlalchemy.Column(sqlalchemy.String(36), index=True)
     user_id = sqlalchemy.Column(sqlalchemy.String(36))
     name = sqlalchemy.Column(sqlalchemy.String(255))
     sensor_type = sqlalchemy.Column(sqlalchemy.String(255))
@@ -41,5 +41,5 @@ class SensorList(abstract.SensorList):
     """Represent a list of sensors in sqlalchemy."""
 
     @classmethod
-    def get_all(cls, context):
-        return SensorList(sql.model_query(context, Sensor))
+    def get_all(cls, context, **query):
+        return SensorList(sql.model_query(context, Sensor, **query))
@@ -26,10 +26,10 @@ class Service(sql.Base, abstract.Service):
     __table_args__ = sql.table_args()
 
     id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
-    uuid = sa.Column(sa.String(36), nullable=False)
+    uuid = sa.Column(sa.String(36), nullable=False, unique=True, index=True)
     name = sa.Column(sa.String(100))
     description = sa.Column(sa.String(255))
-    project_id = sa.Column(sa.String(36))
+    project_id = sa.Column(sa.String(36), index=True)
     user_id = sa.Column(sa.String(36))
     service_type = sa.Column(sa.String(100))
     read_only = sa.Column(sa.Boolean, default=False)
@@ -43,5 +43,5 @@ class ServiceList(abstract.ServiceList):
     """Represent a list of services in sqlalchemy."""
 
     @classmethod
-    def get_all(cls, context):
-        return ServiceList(sql.model_query(context, Service))
+    def get_all(cls, context, **query):
+        return ServiceList(sql.model_query(context, Service, **query))
@@ -35,16 +35,24 @@ class Userlog(sql.Base, abstract.Userlog):
     resource_type = sa.Column(sa.String(36))
 
 
+# Matches UserlogList.get_all_by_id: equality on both leading columns, then
+# ordered by created_at.
+sa.Index('ix_userlogs_project_id_resource_uuid_created_at',
+         Userlog.project_id, Userlog.resource_uuid, Userlog.created_at)
+
+
 class UserlogList(abstract.UserlogList):
     """Represent a list of userlogs in sqlalchemy."""
 
     @classmethod
-    def get_all(cls, context):
-        return UserlogList(sql.model_query(context, Userlog))
+    def get_all(cls, context, **query):
+        return UserlogList(sql.model_query(context, Userlog, **query))
 
     @classmethod
-    def get_all_by_id(cls, context, resource_uuid):
-        session = sql.Base.get_session()
+    def get_all_by_id(cls, context, resource_uuid, **query):
+        session = sql.Base.get_session(use_slave=True)
         logs = session.query(Userlog).filter_by(project_id=context.tenant)
         logs = logs.filter_by(resource_uuid=resource_uuid)
-        return logs.order_by(Userlog.created_at).all()
+        logs = sql.filter_query(Userlog, logs, query.pop('filters', None))
+        query.setdefault('default_sort_key', 'created_at')
+        return sql.paginate_query(Userlog, logs, **query).all()
@@ -41,3 +41,4 @@ class TestPlans(base.BaseTestCase):
         plan_links = resp['result'].plan_links
         self.assertEqual(1, len(plan_links))
         self.assertEqual(fake_plan.name, plan_links[0].target_name)
+        hand_get_all.assert_called_once_with(columns=['uuid', 'name'])
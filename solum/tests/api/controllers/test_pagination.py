@@ -0,0 +1,71 @@
+# Copyright 2015 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from solum.api.controllers import pagination
+from solum.common import exception
+from solum.openstack.common.fixture import config
+from solum.tests import base
+from solum.tests import fakes
+
+
+class TestQueryArgs(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestQueryArgs, self).setUp()
+        self.CONF = self.useFixture(config.Config())
+
+    def test_no_args(self):
+        self.assertEqual({}, pagination.query_args(name=None))
+
+    def test_all_args(self):
+        self.assertEqual({'limit': 10, 'marker': 'm', 'sort_key': 'name',
+                          'sort_dir': 'desc', 'filters': {'name': 'x'}},
+                         pagination.query_args('10', 'm', 'name', 'desc',
+                                               name='x', status=None))
+
+    def test_limit_capped(self):
+        self.CONF.config(max_limit=5, group='api')
+        self.assertEqual({'limit': 5}, pagination.query_args(limit=50))
+
+    def test_bad_limit(self):
+        self.assertRaises(exception.BadRequest, pagination.query_args,
+                          limit=0)
+        self.assertRaises(exception.BadRequest, pagination.query_args,
+                          limit='ten')
+
+
+@mock.patch('pecan.request', new_callable=fakes.FakePecanRequest)
+@mock.patch('pecan.response', new_callable=fakes.FakePecanResponse)
+class TestNextLink(base.BaseTestCase):
+
+    def test_full_page(self, resp_mock, request_mock):
+        resp_mock.headers = {}
+        request_mock.params = {'name': 'x', 'limit': '2'}
+        items = [mock.Mock(uuid='a'), mock.Mock(uuid='b')]
+        pagination.set_next_link({'limit': 2}, items)
+        self.assertEqual('<http://test_url:8080/test/v1/services?'
+                         'limit=2&marker=b&name=x>; rel="next"',
+                         resp_mock.headers['Link'])
+
+    def test_last_page(self, resp_mock, request_mock):
+        resp_mock.headers = {}
+        pagination.set_next_link({'limit': 2}, [mock.Mock(uuid='a')])
+        self.assertNotIn('Link', resp_mock.headers)
+
+    def test_unpaginated(self, resp_mock, request_mock):
+        resp_mock.headers = {}
+        pagination.set_next_link({}, [mock.Mock(uuid='a')])
+        self.assertNotIn('Link', resp_mock.headers)
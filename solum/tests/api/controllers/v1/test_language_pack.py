@@ -16,6 +16,7 @@ import json
 
 import mock
 
+from solum.api.controllers.v1.datamodel import language_pack as lpmodel
 from solum.api.controllers.v1 import language_pack
 from solum.common import exception
 from solum import objects
@@ -35,6 +36,7 @@ class TestLanguagePackController(base.BaseTestCase):
         result = language_pack_obj.get()
         self.assertEqual(200, resp_mock.status)
         self.assertIsNotNone(result)
+        self.assertFalse(result['result'].prewarm)
         handler_get.assert_called_once_with('test_id')
 
     def test_lp_get_not_found(self, handler_mock, resp_mock, request_mock):
@@ -108,3 +110,11 @@ class TestLanguagePacksController(base.BaseTestCase):
         faultstring = str(ret_val['faultstring'])
         self.assertEqual("Missing argument: \"data\"", faultstring)
         self.assertEqual(400, resp_mock.status)
+
+
+class TestLanguagePack(base.BaseTestCase):
+    def test_from_image_prewarm(self):
+        image = {'id': 'test_id', 'name': 'faker', 'tags': ['solum::lp'],
+                 'prewarm': False}
+        lp = lpmodel.LanguagePack.from_image(image, 'http://example.com')
+        self.assertEqual(False, lp.prewarm)
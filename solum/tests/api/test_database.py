@@ -0,0 +1,48 @@
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import mock
+
+from solum.api import database
+from solum import objects
+from solum.tests import base
+from solum.tests import fakes
+from solum.tests import utils
+
+
+class TestSessionScopeHook(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestSessionScopeHook, self).setUp()
+        self.useFixture(utils.Database())
+
+    @mock.patch.object(database, 'LOG')
+    def test_request_shares_session(self, mock_log):
+        state = mock.Mock(request=fakes.FakePecanRequest())
+        hook = database.SessionScopeHook()
+        hook.before(state)
+        session = objects.IMPL.get_session()
+        self.assertIs(session, objects.IMPL.get_session())
+        objects.registry.PlanList.get_all(None)
+        objects.registry.AssemblyList.get_all(None)
+        hook.after(state)
+        self.assertIsNot(session, objects.IMPL.get_session())
+        self.assertIn('1 database connection checkouts',
+                      mock_log.debug.call_args[0][0])
+
+    @mock.patch.object(database, 'LOG')
+    def test_after_without_before(self, mock_log):
+        state = mock.Mock(request=fakes.FakePecanRequest())
+        database.SessionScopeHook().after(state)
+        self.assertFalse(mock_log.debug.called)
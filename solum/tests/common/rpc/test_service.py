@@ -13,7 +13,9 @@
 # under the License.
 
 import mock
+from oslo.config import cfg
 
+from solum.common import context
 from solum.common.rpc import service
 from solum.tests import base
 
@@ -26,6 +28,27 @@ class ServiceTest(base.BaseTestCase):
         self.assertIsNotNone(rpc_service._server)
 
 
+class SessionScopedEndpointTest(base.BaseTestCase):
+
+    @mock.patch.object(service.objects.IMPL, 'session_scope', create=True)
+    def test_method_scoped(self, mock_scope):
+        handler = mock.Mock()
+        handler.target = 'target'
+
+        def echo(ctxt, message):
+            self.assertTrue(mock_scope.return_value.__enter__.called)
+            self.assertFalse(mock_scope.return_value.__exit__.called)
+            return message
+        handler.echo.side_effect = echo
+
+        endpoint = service.SessionScopedEndpoint(handler)
+        self.assertEqual('hi', endpoint.echo({}, message='hi'))
+        self.assertTrue(mock_scope.return_value.__exit__.called)
+        self.assertEqual('target', endpoint.target)
+        self.assertRaises(AttributeError, getattr,
+                          service.SessionScopedEndpoint(object()), 'echo')
+
+
 class APITest(base.BaseTestCase):
 
     def test_create(self):
@@ -39,3 +62,72 @@ class APITest(base.BaseTestCase):
         rpc_api._cast = mock.MagicMock()
         rpc_api.echo('foo')
         rpc_api._cast.assert_called_once_with('echo', message='foo')
+
+
+class RequestContextSerializerTest(base.BaseTestCase):
+
+    def setUp(self):
+        super(RequestContextSerializerTest, self).setUp()
+        self.serializer = service.RequestContextSerializer()
+        self.token_info = {'token': {'catalog': ['fake'] * 100}}
+        self.ctx = context.RequestContext(auth_token='abcd1234',
+                                          tenant='fake_project',
+                                          auth_token_info=self.token_info)
+
+    def test_compact(self):
+        data = self.serializer.serialize_context(self.ctx)
+        self.assertNotIn('auth_token_info', data)
+        self.assertNotIn('trust_id', data)
+        self.assertEqual('abcd1234', data['auth_token'])
+        self.assertEqual('fake_project', data['tenant'])
+
+    def test_compact_disabled(self):
+        cfg.CONF.set_override('compact_rpc_context', False)
+        data = self.serializer.serialize_context(self.ctx)
+        self.assertEqual(self.token_info, data['auth_token_info'])
+
+    def test_rehydrated(self):
+        context.remember_token_info('abcd1234', self.token_info, 60)
+        data = self.serializer.serialize_context(self.ctx)
+        ctxt = self.serializer.deserialize_context(data)
+        self.assertEqual(self.token_info, ctxt.auth_token_info)
+        self.assertEqual('fake_project', ctxt.tenant)
+        self.assertFalse(ctxt.is_admin)
+
+    def test_unknown_token(self):
+        data = self.serializer.serialize_context(self.ctx)
+        ctxt = self.serializer.deserialize_context(data)
+        self.assertIsNone(ctxt.auth_token_info)
+        self.assertEqual('abcd1234', ctxt.auth_token)
+
+
+class SharedClientTest(base.BaseTestCase):
+
+    def setUp(self):
+        super(SharedClientTest, self).setUp()
+        self.addCleanup(service._clients.clear)
+
+    def test_client_per_topic(self):
+        api1 = service.API(context={}, topic='topic1')
+        api2 = service.API(context={'other': 'ctx'}, topic='topic1')
+        api3 = service.API(context={}, topic='topic2')
+        self.assertIs(api1._client, api2._client)
+        self.assertIsNot(api1._client, api3._client)
+        self.assertIs(api1._client.transport, api3._client.transport)
+
+    def test_transport_given(self):
+        transport = service.get_transport()
+        api1 = service.API(transport=transport, topic='topic1')
+        api2 = service.API(topic='topic1')
+        self.assertIsNot(api1._client, api2._client)
+
+    @mock.patch('os.getpid')
+    def test_new_transport_after_fork(self, mock_getpid):
+        mock_getpid.return_value = 1
+        transport = service.get_transport()
+        client = service.API(topic='topic1')._client
+        self.assertIs(transport, service.get_transport())
+
+        mock_getpid.return_value = 2
+        self.assertIsNot(transport, service.get_transport())
+        self.assertIsNot(client, service.API(topic='topic1')._client)
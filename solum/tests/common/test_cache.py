@@ -0,0 +1,51 @@
+# Copyright 2015 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from solum.common import cache
+from solum.tests import base
+
+
+class TTLCacheTest(base.BaseTestCase):
+
+    @mock.patch('time.time')
+    def test_expiry(self, mock_time):
+        mock_time.return_value = 100
+        c = cache.TTLCache()
+        c.set('a', 1, 10)
+        self.assertEqual(1, c.get('a'))
+        mock_time.return_value = 110
+        self.assertIsNone(c.get('a'))
+        self.assertEqual(0, len(c))
+        self.assertEqual((1, 1), (c.hits, c.misses))
+
+    def test_max_size_drops_least_recently_used(self):
+        c = cache.TTLCache(max_size=2)
+        c.set('a', 1, 60)
+        c.set('b', 2, 60)
+        c.get('a')
+        c.set('c', 3, 60)
+        self.assertIsNone(c.get('b'))
+        self.assertEqual(1, c.get('a'))
+        self.assertEqual(3, c.get('c'))
+
+    def test_pop_and_clear_all(self):
+        c = cache.TTLCache()
+        c.set('a', 1, 60)
+        c.set('b', 2, 60)
+        self.assertEqual(1, c.pop('a'))
+        self.assertIsNone(c.pop('a'))
+        cache.clear_all()
+        self.assertEqual(0, len(c))
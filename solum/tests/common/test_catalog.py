@@ -15,6 +15,7 @@
 import os.path
 
 import mock
+import yaml
 
 from solum.common import catalog
 from solum.common import exception
@@ -55,3 +56,41 @@ class TestCatalog(base.BaseTestCase):
             m_open.side_effect = IOError('test')
             self.assertRaises(exception.ObjectNotFound,
                               catalog.get, 'test', 'test_data')
+
+    @mock.patch('os.path.getmtime')
+    def test_get_cached_until_modified(self, mock_mtime):
+        mock_mtime.return_value = 100.0
+        with mock.patch('solum.common.catalog.open',
+                        mock.mock_open(read_data='test content'),
+                        create=True) as m_open:
+            self.assertEqual('test content',
+                             catalog.get('test', 'cached_data'))
+            self.assertEqual('test content',
+                             catalog.get('test', 'cached_data'))
+            self.assertEqual(1, m_open.call_count)
+            mock_mtime.return_value = 101.0
+            catalog.get('test', 'cached_data')
+            self.assertEqual(2, m_open.call_count)
+
+    def test_load_yaml(self):
+        text = 'description: test\nresources: {}\n'
+        with mock.patch('yaml.load', wraps=yaml.load) as m_load:
+            self.assertEqual({'description': 'test', 'resources': {}},
+                             catalog.load_yaml(text))
+            self.assertIs(catalog.load_yaml(text), catalog.load_yaml(text))
+            self.assertEqual(1, m_load.call_count)
+
+    def test_render_user_data(self):
+        template = catalog.get('templates', 'coreos')
+        script = '#!/bin/bash -x\necho "it\'s here" \\ done\n'
+        rendered = catalog.render_user_data(template, script)
+        expected = yaml.safe_load(template)
+        props = expected['resources']['compute_instance']['properties']
+        props['user_data']['str_replace']['template'] = script
+        self.assertEqual(expected, yaml.safe_load(rendered))
+        # The next render only substitutes the script.
+        with mock.patch('yaml.load') as m_load:
+            rendered = catalog.render_user_data(template, 'echo other')
+            self.assertFalse(m_load.called)
+        props['user_data']['str_replace']['template'] = 'echo other'
+        self.assertEqual(expected, yaml.safe_load(rendered))
@@ -41,6 +41,49 @@ class ClientsTest(base.BaseTestCase):
                                                  endpoint_type='fake_endpoint',
                                                  region_name='FakeRegion')
 
+    @mock.patch.object(clients.OpenStackClients, 'keystone')
+    def test_url_for_cached(self, mock_keystone):
+        mock_cat = mock_keystone.return_value.client.service_catalog
+        mock_cat.url_for.return_value = 'url_from_keystone'
+        ctx = mock.MagicMock(tenant='fake_project')
+        for i in range(2):
+            url = clients.OpenStackClients(ctx).url_for(
+                service_type='image', endpoint_type='publicURL',
+                region_name='FakeRegion')
+            self.assertEqual('url_from_keystone', url)
+        clients.OpenStackClients(ctx).url_for(
+            service_type='object-store', endpoint_type='publicURL',
+            region_name='FakeRegion')
+        self.assertEqual(2, mock_cat.url_for.call_count)
+
+    @mock.patch.object(clients.OpenStackClients, 'keystone')
+    def test_url_for_not_cached(self, mock_keystone):
+        cfg.CONF.set_override('catalog_cache_ttl', 0)
+        ctx = mock.MagicMock(tenant='fake_project')
+        for i in range(2):
+            clients.OpenStackClients(ctx).url_for(service_type='image')
+        mock_cat = mock_keystone.return_value.client.service_catalog
+        self.assertEqual(2, mock_cat.url_for.call_count)
+
+    def test_cached_clients(self):
+        ctx = mock.MagicMock(trust_id=None, auth_token='token1')
+        osc = clients.cached_clients(ctx)
+        self.assertIs(osc, clients.cached_clients(ctx))
+        other = mock.MagicMock(trust_id=None, auth_token='token2')
+        self.assertIsNot(osc, clients.cached_clients(other))
+
+    def test_cached_clients_token_expiring(self):
+        ctx = mock.MagicMock(trust_id=None, auth_token='token1')
+        osc = clients.cached_clients(ctx)
+        osc._keystone = mock.MagicMock()
+        osc._keystone.auth_ref.will_expire_soon.return_value = True
+        self.assertIsNot(osc, clients.cached_clients(ctx))
+
+    def test_cached_clients_no_token(self):
+        ctx = mock.MagicMock(trust_id=None, auth_token=None)
+        self.assertIsNot(clients.cached_clients(ctx),
+                         clients.cached_clients(ctx))
+
     @mock.patch.object(barbicanclient, 'Client')
     @mock.patch.object(session, 'Session')
     def test_clients_barbican(self, mock_sess, mock_call):
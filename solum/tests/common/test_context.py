@@ -41,3 +41,9 @@ class TestContext(base.BaseTestCase):
         self.assertEqual(ctx_dict['roles'], ['admin', 'member'])
         self.assertEqual(ctx_dict['auth_url'], 'fake_auth_url')
         self.assertEqual(ctx_dict['trust_id'], 'fake_trust_id')
+
+    def test_token_info(self):
+        self.assertIsNone(context.recall_token_info('_token_'))
+        context.remember_token_info('_token_', {'token': {}}, 60)
+        self.assertEqual({'token': {}}, context.recall_token_info('_token_'))
+        self.assertIsNone(context.recall_token_info('_other_token_'))
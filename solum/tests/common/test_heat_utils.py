@@ -0,0 +1,74 @@
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import mock
+from oslo.config import cfg
+
+from solum.common import heat_utils
+from solum.tests import base
+from solum.tests import utils
+
+
+class TestNetworkParameters(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestNetworkParameters, self).setUp()
+        self.osc = mock.MagicMock()
+        self.osc.context = utils.dummy_context()
+        self.neutron = self.osc.neutron.return_value
+
+        def list_networks(**kwargs):
+            if kwargs['router:external']:
+                return {'networks': [{'id': 'public'}]}
+            return {'networks': [{'id': 'private', 'subnets': ['subnet']}]}
+        self.neutron.list_networks.side_effect = list_networks
+
+    def test_get_network_parameters(self):
+        params = heat_utils.get_network_parameters(self.osc)
+        self.assertEqual({'public_net': 'public',
+                          'private_net': 'private',
+                          'private_subnet': 'subnet'}, params)
+        self.neutron.list_networks.assert_has_calls([
+            mock.call(**{'router:external': True, 'fields': ['id']}),
+            mock.call(**{'router:external': False,
+                         'fields': ['id', 'subnets']})])
+
+    def test_cached_per_project(self):
+        heat_utils.get_network_parameters(self.osc)
+        heat_utils.get_network_parameters(self.osc)
+        self.assertEqual(2, self.neutron.list_networks.call_count)
+        self.assertEqual({'size': 1, 'hits': 1, 'misses': 1},
+                         heat_utils.network_cache_stats())
+
+        self.osc.context = utils.dummy_context(tenant_id='other_project')
+        heat_utils.get_network_parameters(self.osc)
+        self.assertEqual(4, self.neutron.list_networks.call_count)
+
+    def test_invalidate(self):
+        heat_utils.get_network_parameters(self.osc)
+        heat_utils.invalidate_network_parameters(self.osc.context.tenant)
+        heat_utils.get_network_parameters(self.osc)
+        self.assertEqual(4, self.neutron.list_networks.call_count)
+
+    def test_cache_disabled(self):
+        cfg.CONF.set_override('network_cache_ttl', 0)
+        heat_utils.get_network_parameters(self.osc)
+        heat_utils.get_network_parameters(self.osc)
+        self.assertEqual(4, self.neutron.list_networks.call_count)
+
+    def test_cached_copy(self):
+        heat_utils.get_network_parameters(self.osc)['public_net'] = 'x'
+        self.assertEqual('public',
+                         heat_utils.get_network_parameters(
+                             self.osc)['public_net'])
@@ -20,6 +20,7 @@ cfg.CONF.import_group('keystone_authtoken',
 
 import keystoneclient.exceptions as kc_exception  # noqa
 
+from solum.common import context
 from solum.common import exception
 from solum.common import solum_keystoneclient
 from solum.tests import base
@@ -60,6 +61,15 @@ class KeystoneClientTest(base.BaseTestCase):
                                         endpoint='http://server.test:5000/v3')
         mock_ks.return_value.authenticate.assert_called_once_with()
 
+    def test_init_v3_token_remembers_token_info(self, mock_ks):
+        self.ctx.trust_id = None
+        mock_ks.return_value.auth_ref = {'catalog': ['fake']}
+        solum_keystoneclient.KeystoneClientV3(self.ctx).client
+
+        token_info = {'token': {'catalog': ['fake']}}
+        self.assertEqual(token_info, self.ctx.auth_token_info)
+        self.assertEqual(token_info, context.recall_token_info('abcd1234'))
+
     def test_init_v3_bad_nocreds(self, mock_ks):
         """Test creating the client, no credentials."""
         self.ctx.auth_token = None
@@ -0,0 +1,85 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import signal
+
+import mock
+
+from solum.common import wsgi
+from solum.tests import base
+
+
+class TestServer(base.BaseTestCase):
+
+    @mock.patch('eventlet.listen')
+    def test_start_binds_with_backlog(self, mock_listen):
+        server = wsgi.Server(mock.sentinel.app, '127.0.0.1', 9777,
+                             backlog=128)
+        server.start()
+        args, kwargs = mock_listen.call_args
+        self.assertEqual(('127.0.0.1', 9777), args[0][:2])
+        self.assertEqual(128, kwargs['backlog'])
+        self.assertEqual(mock_listen.return_value, server._sock)
+
+    @mock.patch('eventlet.wsgi.server')
+    @mock.patch('eventlet.GreenPool')
+    def test_single_worker_serves_in_process(self, mock_pool, mock_server):
+        server = wsgi.Server(mock.sentinel.app, '127.0.0.1', 9777,
+                             workers=1, pool_size=42)
+        server._sock = mock.sentinel.sock
+        with mock.patch('os.fork') as mock_fork:
+            server.serve_forever()
+            self.assertFalse(mock_fork.called)
+        mock_pool.assert_called_once_with(42)
+        mock_server.assert_called_once_with(
+            mock.sentinel.sock, mock.sentinel.app,
+            custom_pool=mock_pool.return_value, log=mock.ANY)
+
+    def test_zero_workers_uses_cpu_count(self):
+        with mock.patch('multiprocessing.cpu_count', return_value=8):
+            server = wsgi.Server(mock.sentinel.app, '127.0.0.1', 9777,
+                                 workers=0)
+        self.assertEqual(8, server.workers)
+
+    @mock.patch('os.fork', side_effect=[101, 102, 103, 104])
+    @mock.patch('os.kill')
+    def test_hup_replaces_workers(self, mock_kill, mock_fork):
+        server = wsgi.Server(mock.sentinel.app, '127.0.0.1', 9777,
+                             workers=2)
+        server._run_child()
+        server._run_child()
+        server._hup()
+        self.assertEqual(set([103, 104]), server._children)
+        self.assertEqual(set([101, 102]), server._stale_children)
+        mock_kill.assert_has_calls([mock.call(101, signal.SIGHUP),
+                                    mock.call(102, signal.SIGHUP)],
+                                   any_order=True)
+
+    @mock.patch('os.fork', side_effect=[101, 102])
+    @mock.patch('os.wait')
+    def test_dead_worker_is_respawned(self, mock_wait, mock_fork):
+        server = wsgi.Server(mock.sentinel.app, '127.0.0.1', 9777,
+                             workers=1)
+        server._run_child()
+
+        def _wait():
+            if mock_wait.call_count == 1:
+                return 101, 0
+            server.running = False
+            server._children.clear()
+            return 102, 0
+
+        mock_wait.side_effect = _wait
+        server._wait_on_children()
+        self.assertEqual(2, mock_fork.call_count)
@@ -13,6 +13,7 @@
 # under the License.
 
 import mock
+from sqlalchemy import exc as sqla_exc
 
 from solum.conductor.handlers import default
 from solum.tests import base
@@ -25,3 +26,64 @@ class HandlerTest(base.BaseTestCase):
         handler.echo = mock.MagicMock()
         handler.echo({}, 'foo')
         handler.echo.assert_called_once_with({}, 'foo')
+
+    @mock.patch('solum.worker.api.API')
+    @mock.patch('solum.objects.registry')
+    def test_apply_updates(self, mock_registry, mock_worker):
+        handler = default.Handler()
+        ctxt = mock.MagicMock()
+        handler.apply_updates(ctxt, [
+            {'method': 'update_assembly',
+             'args': {'assembly_id': 1, 'data': {'status': 'BUILT'}}},
+            {'method': 'update_image',
+             'args': {'image_id': 2, 'status': 'READY',
+                      'external_ref': None}},
+            {'method': 'build_job_update',
+             'args': {'build_id': 3, 'state': 'READY', 'description': 'ok',
+                      'created_image_id': 'img', 'assembly_id': None}}])
+
+        session = mock_registry.Assembly.get_session.return_value
+        mock_registry.Assembly.bulk_update.assert_called_once_with(
+            ctxt, [(1, {'status': 'BUILT'})], session=session)
+        mock_registry.Image.bulk_update.assert_called_once_with(
+            ctxt, [(2, {'status': 'READY'}),
+                   (3, {'status': 'READY', 'description': 'ok',
+                        'external_ref': 'img'})], session=session)
+        self.assertFalse(mock_registry.Assembly.update_in_place.called)
+        lp = mock_registry.Image.get_by_id.return_value
+        mock_worker.return_value.prewarm_lp.assert_called_once_with(
+            lp.uuid, lp.external_ref)
+
+    @mock.patch('solum.objects.registry')
+    def test_apply_updates_falls_back(self, mock_registry):
+        handler = default.Handler()
+        ctxt = mock.MagicMock()
+        mock_registry.Assembly.bulk_update.side_effect = (
+            sqla_exc.OperationalError('UPDATE', {}, 'locked'))
+        handler.apply_updates(ctxt, [
+            {'method': 'update_assembly',
+             'args': {'assembly_id': 1, 'data': {'status': 'BUILT'}}}])
+
+        mock_registry.Assembly.update_in_place.assert_called_once_with(
+            ctxt, 1, {'status': 'BUILT'})
+
+    @mock.patch('solum.worker.api.API')
+    @mock.patch('solum.objects.registry')
+    def test_update_image_prewarms(self, mock_registry, mock_worker):
+        handler = default.Handler()
+        ctxt = mock.MagicMock()
+        handler.update_image(ctxt, 2, 'BUILDING')
+        self.assertFalse(mock_worker.called)
+
+        handler.update_image(ctxt, 2, 'READY', 'new_ref')
+        lp = mock_registry.Image.get_by_id.return_value
+        mock_worker.assert_called_once_with(context=ctxt)
+        mock_worker.return_value.prewarm_lp.assert_called_once_with(
+            lp.uuid, 'new_ref')
+
+    @mock.patch('solum.worker.api.API')
+    @mock.patch('solum.objects.registry')
+    def test_update_image_prewarm_opt_out(self, mock_registry, mock_worker):
+        mock_registry.Image.get_by_id.return_value.prewarm = False
+        default.Handler().update_image(mock.MagicMock(), 2, 'READY', 'ref')
+        self.assertFalse(mock_worker.called)
@@ -0,0 +1,134 @@
+# Copyright 2015 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo.config import cfg
+
+from solum.common.rpc import service
+from solum.conductor import api
+from solum.deployer import api as deploy_api
+from solum.tests import base
+from solum.tests import utils
+from solum.worker import api as worker_api
+
+
+@mock.patch('eventlet.spawn_after')
+@mock.patch.object(api.API, '_cast')
+class BatchTest(base.BaseTestCase):
+    def setUp(self):
+        super(BatchTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        cfg.CONF.import_opt('update_batch_window', 'solum.conductor.config',
+                            group='conductor')
+        cfg.CONF.set_override('update_batch_window', 0.5, group='conductor')
+        self.addCleanup(api._batcher._batches.clear)
+        self.addCleanup(service._held.clear)
+
+    def test_coalesced(self, mock_cast, mock_spawn):
+        conductor = api.API(context=self.ctx)
+        conductor.update_assembly(1, {'status': 'BUILDING'})
+        conductor.update_image(2, 'BUILDING', 'ref')
+        api.API(context=self.ctx).update_assembly(1, {'status': 'BUILT'})
+        conductor.update_assembly(1, {'application_uri': 'http://x'})
+        conductor.update_image(2, 'READY')
+        self.assertFalse(mock_cast.called)
+
+        # The batch window is over.
+        self.assertEqual(1, mock_spawn.call_count)
+        window, flush, key = mock_spawn.call_args[0]
+        flush(key)
+
+        mock_cast.assert_called_once_with('apply_updates', updates=[
+            {'method': 'update_assembly',
+             'args': {'assembly_id': 1,
+                      'data': {'status': 'BUILT',
+                               'application_uri': 'http://x'}}},
+            {'method': 'update_image',
+             'args': {'image_id': 2, 'status': 'READY',
+                      'external_ref': 'ref'}}])
+
+    def test_batch_per_context(self, mock_cast, mock_spawn):
+        api.API(context=self.ctx).update_assembly(1, {'status': 'BUILT'})
+        api.API(context=utils.dummy_context()).update_assembly(
+            2, {'status': 'BUILT'})
+        self.assertEqual(2, mock_spawn.call_count)
+
+    def test_batch_size(self, mock_cast, mock_spawn):
+        cfg.CONF.set_override('update_batch_size', 2, group='conductor')
+        conductor = api.API(context=self.ctx)
+        conductor.update_assembly(1, {'status': 'BUILT'})
+        conductor.update_assembly(2, {'status': 'BUILT'})
+        self.assertEqual(1, mock_cast.call_count)
+        self.assertEqual(2, len(mock_cast.call_args[1]['updates']))
+
+    def test_no_batching(self, mock_cast, mock_spawn):
+        cfg.CONF.set_override('update_batch_window', 0, group='conductor')
+        api.API(context=self.ctx).update_assembly(1, {'status': 'BUILT'})
+        mock_cast.assert_called_once_with('update_assembly', assembly_id=1,
+                                          data={'status': 'BUILT'})
+        self.assertFalse(mock_spawn.called)
+
+
+@mock.patch('eventlet.spawn_after')
+@mock.patch('solum.common.rpc.service._get_client')
+class BatchOrderTest(base.BaseTestCase):
+    def setUp(self):
+        super(BatchOrderTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        cfg.CONF.import_opt('update_batch_window', 'solum.conductor.config',
+                            group='conductor')
+        cfg.CONF.set_override('update_batch_window', 0.5, group='conductor')
+        self.addCleanup(api._batcher._batches.clear)
+        self.addCleanup(service._held.clear)
+
+    def test_batch_sent_before_next_cast(self, mock_client, mock_spawn):
+        cast = mock_client.return_value.cast
+        api.API(context=self.ctx).update_assembly(1, {'status': 'DELETING'})
+        self.assertFalse(cast.called)
+
+        deploy_api.API(context=self.ctx).destroy_assembly(assem_id=1)
+
+        self.assertEqual(['apply_updates', 'destroy_assembly'],
+                         [c[0][1] for c in cast.call_args_list])
+        # The window ending later sends nothing more.
+        window, flush, key = mock_spawn.call_args[0]
+        flush(key)
+        self.assertEqual(2, cast.call_count)
+
+    def test_other_context_not_flushed(self, mock_client, mock_spawn):
+        cast = mock_client.return_value.cast
+        api.API(context=self.ctx).update_assembly(1, {'status': 'DELETING'})
+
+        deploy_api.API(context=utils.dummy_context()).destroy_assembly(
+            assem_id=2)
+
+        self.assertEqual(['destroy_assembly'],
+                         [c[0][1] for c in cast.call_args_list])
+
+    def test_batch_sent_before_routed_cast(self, mock_client, mock_spawn):
+        sent = []
+        client = mock_client.return_value
+        client.cast.side_effect = lambda ctx, method, **kw: sent.append(method)
+        client.prepare.return_value.cast.side_effect = (
+            lambda ctx, method, **kw: sent.append(method))
+        api.API(context=self.ctx).update_assembly(1, {'status': 'BUILDING'})
+
+        with mock.patch.object(worker_api.API, '_pick_server',
+                               return_value='w1'):
+            worker_api.API(context=self.ctx).build_lp(
+                1, {'source_url': 'https://example.com/app.git'}, 'lp',
+                'heroku', 'docker', None)
+
+        client.prepare.assert_called_once_with(server='w1')
+        self.assertEqual(['apply_updates', 'build_lp'], sent)
@@ -13,13 +13,20 @@
 # under the License.
 
 import json
+import uuid
 
+import eventlet
 import mock
 from oslo.config import cfg
 import yaml
 
+from solum.conductor.handlers import default as conductor_handler
 from solum.deployer.handlers import heat as heat_handler
+from solum.deployer import watcher
+from solum import objects
 from solum.objects import assembly
+from solum.objects.sqlalchemy import assembly as sqla_assembly
+from solum.objects.sqlalchemy import plan as sqla_plan
 from solum.tests import base
 from solum.tests import fakes
 from solum.tests import utils
@@ -32,6 +39,11 @@ class HandlerTest(base.BaseTestCase):
     def setUp(self):
         super(HandlerTest, self).setUp()
         self.ctx = utils.dummy_context()
+        # The tests drive the status watcher with poll().
+        patcher = mock.patch.object(watcher.StatusWatcher, '_start')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cfg.CONF.set_override('wait_interval', 0, group='deployer')
 
     def test_create(self):
         handler = heat_handler.Handler()
@@ -108,8 +120,10 @@ class HandlerTest(base.BaseTestCase):
                       'image': "coreos"}
 
         stacks.create.assert_called_once_with(stack_name='faker-test_uuid',
-                                              template=template,
+                                              template=mock.ANY,
                                               parameters=parameters)
+        sent = stacks.create.call_args[1]['template']
+        self.assertEqual(yaml.safe_load(template), yaml.safe_load(sent))
         assign_and_create_mock = mock_registry.Component.assign_and_create
         comp_name = 'Heat_Stack_for_%s' % fake_assembly.name
         assign_and_create_mock.assert_called_once_with(self.ctx,
@@ -189,8 +203,8 @@ class HandlerTest(base.BaseTestCase):
     def test_update_assembly_status(self, mock_http, mock_clients, mock_ua):
         handler = heat_handler.Handler()
         fake_assembly = fakes.FakeAssembly()
-        stack = mock.MagicMock()
-        stack.status = 'COMPLETE'
+        stack = mock.MagicMock(id='fake_id', status='COMPLETE')
+        mock_clients.heat().stacks.list.return_value = [stack]
         mock_clients.heat().stacks.get.return_value = stack
 
         resp = {'status': '200'}
@@ -198,11 +212,12 @@ class HandlerTest(base.BaseTestCase):
         conn.request.return_value = [resp, '']
         mock_http.return_value = conn
 
-        cfg.CONF.deployer.du_attempts = 1
+        cfg.CONF.set_override('du_attempts', 1, group='deployer')
 
         handler._parse_server_url = mock.MagicMock(return_value=('xyz'))
         handler._check_stack_status(self.ctx, fake_assembly.id, mock_clients,
                                     'fake_id', [80])
+        handler._watcher.poll()
 
         c1 = mock.call(fake_assembly.id,
                        {'status': STATES.WAITING_FOR_DOCKER_DU,
@@ -215,17 +230,18 @@ class HandlerTest(base.BaseTestCase):
         calls = [c1, c2]
 
         mock_ua.assert_has_calls(calls, any_order=False)
+        self.assertEqual(0, len(handler._watcher))
 
     @mock.patch('solum.conductor.api.API.update_assembly')
     @mock.patch('solum.common.clients.OpenStackClients')
     def test_update_assembly_status_failed(self, mock_clients, mock_ua):
         handler = heat_handler.Handler()
         fake_assembly = fakes.FakeAssembly()
-        stack = mock.MagicMock()
-        stack.status = 'FAILED'
-        mock_clients.heat().stacks.get.return_value = stack
+        stack = mock.MagicMock(id='fake_id', status='FAILED')
+        mock_clients.heat().stacks.list.return_value = [stack]
         handler._check_stack_status(self.ctx, fake_assembly.id, mock_clients,
                                     'fake_id', [80])
+        handler._watcher.poll()
         mock_ua.assert_called_once_with(fake_assembly.id,
                                         {'status':
                                          STATES.ERROR_STACK_CREATE_FAILED})
@@ -236,14 +252,15 @@ class HandlerTest(base.BaseTestCase):
         handler = heat_handler.Handler()
         fake_assembly = fakes.FakeAssembly()
 
-        mock_clients.heat().stacks.get.side_effect = Exception()
+        mock_clients.heat().stacks.list.side_effect = Exception()
 
-        cfg.CONF.set_override('wait_interval', 1, group='deployer')
         cfg.CONF.set_override('growth_factor', 1, group='deployer')
         cfg.CONF.set_override('max_attempts', 1, group='deployer')
 
         handler._check_stack_status(self.ctx, fake_assembly.id, mock_clients,
                                     'fake_id', [80])
+        self.assertFalse(mock_ua.called)
+        handler._watcher.poll()
         mock_ua.assert_called_once_with(fake_assembly.id,
                                         {'status':
                                          STATES.ERROR_STACK_CREATE_FAILED})
@@ -280,18 +297,19 @@ class HandlerTest(base.BaseTestCase):
 
         handler._find_id_if_stack_exists = mock.MagicMock(return_value='42')
         handler._get_stack_name = mock.MagicMock(return_value=fake_assem.name)
-        handler._get_stack_status = (mock.MagicMock(
-                                     return_value="DELETE_COMPLETE"))
+        stacks = mock_client.return_value.heat.return_value.stacks
+        stacks.list.return_value = [mock.MagicMock(
+            id='42', stack_status='DELETE_COMPLETE')]
 
-        cfg.CONF.deployer.max_attempts = 1
-        cfg.CONF.deployer.wait_interval = 0
-        cfg.CONF.deployer.growth_factor = 1.2
+        cfg.CONF.set_override('max_attempts', 1, group='deployer')
 
         handler.destroy_assembly(self.ctx, fake_assem.id)
-
-        stacks = mock_client.return_value.heat.return_value.stacks
         stacks.delete.assert_called_once_with('42')
-        fake_assem.destroy.assert_called_once()
+        self.assertFalse(fake_assem.destroy.called)
+
+        handler._watcher.poll()
+        stacks.list.assert_called_once_with(filters={'id': ['42']})
+        fake_assem.destroy.assert_called_once_with(self.ctx)
 
     @mock.patch('solum.conductor.api.API.update_assembly')
     @mock.patch('solum.objects.registry')
@@ -304,22 +322,121 @@ class HandlerTest(base.BaseTestCase):
         handler._find_id_if_stack_exists = mock.MagicMock(return_value='42')
 
         handler._get_stack_name = mock.MagicMock(return_value=fake_assem.name)
-        handler._get_stack_status = (mock.MagicMock(
-                                     return_value="DELETE_INCOMPLETE"))
+        stacks = mock_client.return_value.heat.return_value.stacks
+        stacks.list.return_value = [mock.MagicMock(
+            id='42', stack_status='DELETE_IN_PROGRESS')]
 
-        cfg.CONF.deployer.max_attempts = 1
-        cfg.CONF.deployer.wait_interval = 0
-        cfg.CONF.deployer.growth_factor = 1.2
+        cfg.CONF.set_override('max_attempts', 1, group='deployer')
 
         handler.destroy_assembly(self.ctx, fake_assem.id)
+        handler._watcher.poll()
 
-        stacks = mock_client.return_value.heat.return_value.stacks
         stacks.delete.assert_called_once_with('42')
 
         mock_cond.assert_called_once_with(
             fake_assem.id, {'status': STATES.ERROR_STACK_DELETE_FAILED})
         assert not fake_assem.destroy.called
 
+    @mock.patch('solum.conductor.api.API.update_assembly')
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_destroy_app_waits_for_assemblies(self, mock_client,
+                                              mock_registry, mock_cond):
+        fake_plan = fakes.FakePlan()
+        mock_registry.Plan.get_by_id.return_value = fake_plan
+        fake_assem = fakes.FakeAssembly()
+        fake_assem.plan_id = fake_plan.id
+        mock_registry.AssemblyList.get_all.return_value = [fake_assem]
+
+        handler = heat_handler.Handler()
+        handler._find_id_if_stack_exists = mock.MagicMock(return_value='42')
+        stacks = mock_client.return_value.heat.return_value.stacks
+        stacks.list.return_value = []
+
+        poller = eventlet.spawn(handler._watcher.poll)
+        with mock.patch.object(objects.IMPL, 'release_scope') as release:
+            handler.destroy_app(self.ctx, fake_plan.id)
+        poller.wait()
+
+        # No connection is held while waiting on the stacks.
+        release.assert_called_once_with()
+        mock_registry.AssemblyList.get_all.assert_called_once_with(
+            self.ctx, filters={'plan_id': fake_plan.id})
+        mock_cond.assert_called_once_with(
+            fake_assem.id, {'status': STATES.DELETING})
+        fake_assem.destroy.assert_called_once_with(self.ctx)
+        fake_plan.destroy.assert_called_once_with(self.ctx)
+
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_destroy_app_stack_delete_failed(self, mock_client):
+        self.useFixture(utils.Database())
+        cfg.CONF.set_override('max_attempts', 1, group='deployer')
+        plans = [{'uuid': str(uuid.uuid4()), 'name': 'plan1',
+                  'project_id': self.ctx.tenant}]
+        utils.create_models_from_data(sqla_plan.Plan, plans, self.ctx)
+        assems = [{'uuid': str(uuid.uuid4()), 'name': 'assembly1',
+                   'project_id': self.ctx.tenant, 'status': STATES.READY,
+                   'plan_id': plans[0]['id']}]
+        utils.create_models_from_data(sqla_assembly.Assembly, assems,
+                                      self.ctx)
+
+        handler = heat_handler.Handler()
+        handler._find_id_if_stack_exists = mock.MagicMock(return_value='42')
+        stacks = mock_client.return_value.heat.return_value.stacks
+        stacks.list.return_value = [mock.MagicMock(
+            id='42', stack_status='DELETE_FAILED')]
+        conductor = conductor_handler.Handler()
+
+        def update_assembly(assembly_id, data):
+            conductor.update_assembly(self.ctx, assembly_id, data)
+        with mock.patch('solum.conductor.api.API.update_assembly',
+                        side_effect=update_assembly):
+            destroying = eventlet.spawn(handler.destroy_app, self.ctx,
+                                        plans[0]['id'])
+            # Let destroy_app delete the stack and wait on the watcher.
+            while not len(handler._watcher):
+                eventlet.sleep(0)
+            handler._watcher.poll()
+            destroying.wait()
+
+        # The failure is reported although the assembly was DELETING.
+        ta = sqla_assembly.Assembly.get_by_id(self.ctx, assems[0]['id'])
+        self.assertEqual(STATES.ERROR_STACK_DELETE_FAILED, ta.status)
+        self.assertIsNotNone(sqla_plan.Plan.get_by_id(self.ctx,
+                                                      plans[0]['id']))
+
+    @mock.patch('solum.conductor.api.API.update_assembly')
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_destroy_app_deletes_stacks_together(self, mock_client,
+                                                 mock_registry, mock_cond):
+        fake_plan = fakes.FakePlan()
+        mock_registry.Plan.get_by_id.return_value = fake_plan
+        assems = [fakes.FakeAssembly() for i in range(3)]
+        for i, assem in enumerate(assems):
+            assem.id = i
+        mock_registry.AssemblyList.get_all.return_value = assems
+
+        handler = heat_handler.Handler()
+        handler._find_id_if_stack_exists = mock.MagicMock(
+            side_effect=lambda assem: 'stack%d' % assem.id)
+        stacks = mock_client.return_value.heat.return_value.stacks
+        stacks.list.return_value = []
+
+        poller = eventlet.spawn(handler._watcher.poll)
+        handler.destroy_app(self.ctx, fake_plan.id)
+        poller.wait()
+
+        # Every stack is deleted before any is waited on, and a single
+        # listing finds them all gone.
+        self.assertEqual([mock.call('stack0'), mock.call('stack1'),
+                          mock.call('stack2')],
+                         stacks.delete.call_args_list)
+        self.assertEqual(1, stacks.list.call_count)
+        for assem in assems:
+            assem.destroy.assert_called_once_with(self.ctx)
+        fake_plan.destroy.assert_called_once_with(self.ctx)
+
     @mock.patch('solum.objects.registry')
     @mock.patch('solum.common.clients.OpenStackClients')
     def test_destroy_absent(self, mock_client, mock_registry):
@@ -0,0 +1,200 @@
+# Copyright 2015 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo.config import cfg
+
+from solum.deployer.handlers import heat  # noqa
+from solum.deployer import watcher
+from solum.objects import assembly
+from solum.tests import base
+from solum.tests import utils
+
+
+STATES = assembly.States
+
+
+@mock.patch.object(watcher.StatusWatcher, '_start')
+class StatusWatcherTest(base.BaseTestCase):
+    def setUp(self):
+        super(StatusWatcherTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.update = mock.MagicMock()
+        self.watcher = watcher.StatusWatcher(self.update,
+                                             lambda stack: '10.0.0.1')
+        cfg.CONF.set_override('wait_interval', 0, group='deployer')
+
+    def test_one_stack_list_per_tenant(self, mock_start):
+        osc = mock.MagicMock()
+        stacks = osc.heat.return_value.stacks
+        stacks.list.return_value = [
+            mock.MagicMock(id='s%d' % i, status='IN_PROGRESS')
+            for i in range(3)]
+        for i in range(3):
+            self.watcher.watch_create(self.ctx, i, osc, 's%d' % i, [80])
+
+        self.watcher.poll()
+
+        self.assertEqual(1, stacks.list.call_count)
+        ids = stacks.list.call_args[1]['filters']['id']
+        self.assertEqual(['s0', 's1', 's2'], sorted(ids))
+        self.assertFalse(self.update.called)
+        self.assertEqual(3, len(self.watcher))
+
+    def test_batch_size(self, mock_start):
+        cfg.CONF.set_override('stack_list_batch_size', 2, group='deployer')
+        osc = mock.MagicMock()
+        stacks = osc.heat.return_value.stacks
+        stacks.list.return_value = []
+        for i in range(3):
+            self.watcher.watch_create(self.ctx, i, osc, 's%d' % i, [80])
+
+        self.watcher.poll()
+
+        self.assertEqual(2, stacks.list.call_count)
+
+    def test_not_due(self, mock_start):
+        cfg.CONF.set_override('wait_interval', 60, group='deployer')
+        osc = mock.MagicMock()
+        self.watcher.watch_create(self.ctx, 1, osc, 's1', [80])
+
+        self.watcher.poll()
+
+        self.assertFalse(osc.heat.return_value.stacks.list.called)
+
+    def test_watch_replaced_during_poll(self, mock_start):
+        osc = mock.MagicMock()
+        stacks = osc.heat.return_value.stacks
+        done = mock.MagicMock()
+
+        def list_stacks(filters):
+            # The app is deleted while Heat is listing its stack.
+            self.watcher.watch_delete(self.ctx, 1, osc, 's1', done)
+            return []
+        stacks.list.side_effect = list_stacks
+        self.watcher.watch_create(self.ctx, 1, osc, 's1', [80])
+
+        self.watcher.poll()
+
+        # The delete watch was not due in that round.
+        self.assertFalse(done.called)
+        self.assertEqual(1, len(self.watcher))
+
+        stacks.list.side_effect = None
+        stacks.list.return_value = []
+        self.watcher.poll()
+
+        done.assert_called_once_with(True)
+        self.assertEqual(0, len(self.watcher))
+
+    def _watch_du(self, ports):
+        osc = mock.MagicMock()
+        stack = mock.MagicMock(id='s1', status='COMPLETE')
+        osc.heat.return_value.stacks.list.return_value = [stack]
+        osc.heat.return_value.stacks.get.return_value = stack
+        self.watcher.watch_create(self.ctx, 1, osc, 's1', ports)
+
+    @mock.patch('solum.common.repo_utils.is_reachable')
+    def test_du_ports_probed_together(self, mock_reachable, mock_start):
+        mock_reachable.return_value = True
+        self._watch_du([80, 8080])
+
+        self.watcher.poll()
+
+        self.assertEqual(
+            [mock.call(self.ctx, 1, {'status': STATES.WAITING_FOR_DOCKER_DU,
+                                     'application_uri': '10.0.0.1'}),
+             mock.call(self.ctx, 1, {'status': STATES.READY,
+                                     'application_uri': '10.0.0.1'})],
+            self.update.call_args_list)
+        self.assertEqual(['http://10.0.0.1:80', 'http://10.0.0.1:8080'],
+                         sorted(c[0][0] for c in
+                                mock_reachable.call_args_list))
+        self.assertEqual(0, len(self.watcher))
+
+    @mock.patch('solum.common.repo_utils.is_reachable')
+    def test_du_probe_backoff(self, mock_reachable, mock_start):
+        cfg.CONF.set_override('du_probe_interval', 60, group='deployer')
+        mock_reachable.side_effect = lambda url, conn: url.endswith(':80')
+        self._watch_du([80, 8080])
+
+        self.watcher.poll()
+        self.watcher.poll()
+
+        # 8080 failed once and is not due again for at least 30 seconds.
+        self.assertEqual(2, mock_reachable.call_count)
+        self.assertEqual(1, len(self.watcher))
+        failures, next_probe = self.watcher._dus['s1'].pending_ports[8080]
+        self.assertEqual(1, failures)
+
+    @mock.patch('solum.common.repo_utils.is_reachable')
+    def test_du_attempts_exhausted(self, mock_reachable, mock_start):
+        cfg.CONF.set_override('du_attempts', 1, group='deployer')
+        mock_reachable.return_value = False
+        self._watch_du([80])
+
+        self.watcher.poll()
+
+        self.update.assert_called_with(
+            self.ctx, 1, {'status': STATES.ERROR_DU_CREATION})
+        self.assertEqual(0, len(self.watcher))
+
+    @mock.patch('solum.common.repo_utils.is_reachable')
+    def test_du_wait_timeout(self, mock_reachable, mock_start):
+        cfg.CONF.set_override('du_wait_timeout', 0, group='deployer')
+        mock_reachable.return_value = False
+        self._watch_du([80])
+
+        self.watcher.poll()
+
+        self.update.assert_called_with(
+            self.ctx, 1, {'status': STATES.ERROR_DU_CREATION})
+        self.assertEqual(0, len(self.watcher))
+
+    @mock.patch('httplib2.Http')
+    @mock.patch('solum.common.repo_utils.is_reachable')
+    def test_du_connections_reused(self, mock_reachable, mock_http,
+                                   mock_start):
+        cfg.CONF.set_override('du_probe_interval', 0, group='deployer')
+        mock_reachable.side_effect = [False, True]
+        self._watch_du([80])
+
+        self.watcher.poll()
+        self.watcher.poll()
+
+        self.assertEqual(1, mock_http.call_count)
+        self.assertEqual(
+            [mock.call('http://10.0.0.1:80', mock_http.return_value)] * 2,
+            mock_reachable.call_args_list)
+        self.assertEqual(0, len(self.watcher))
+
+    @mock.patch('httplib2.Http')
+    @mock.patch('solum.common.repo_utils.is_reachable')
+    def test_du_connections_pruned(self, mock_reachable, mock_http,
+                                   mock_start):
+        mock_reachable.return_value = True
+        done, waited = mock.MagicMock(), mock.MagicMock()
+        mock_http.return_value.connections = {'http:10.0.0.1:80': done,
+                                              'http:10.0.0.2:80': waited}
+        self.watcher._dus['s2'] = mock.MagicMock(host_ip='10.0.0.2',
+                                                 pending_ports={80: (0, 0)})
+        self._watch_du([80])
+
+        self.watcher.poll()
+
+        # The DU of s1 is ready; s2 is still waited on.
+        done.close.assert_called_once_with()
+        self.assertFalse(waited.close.called)
+        self.assertEqual({'http:10.0.0.2:80': waited},
+                         mock_http.return_value.connections)
@@ -297,6 +297,7 @@ class FakeImage(mock.Mock):
         self.artifact_type = None
         self.status = 'PENDING'
         self.external_ref = 'docker_registry/image'
+        self.prewarm = False
 
     def as_dict(self):
         return dict(user_id=self.user_id,
@@ -309,7 +310,8 @@ class FakeImage(mock.Mock):
                     name=self.name,
                     source_uri=self.source_uri,
                     source_format=self.source_format,
-                    description=self.description)
+                    description=self.description,
+                    prewarm=self.prewarm)
 
 
 class FakeComponent(mock.Mock):
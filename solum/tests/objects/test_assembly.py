@@ -18,8 +18,11 @@ import mock
 from sqlalchemy.orm import exc as sqla_ex
 
 from solum.common import exception
+from solum import objects
 from solum.objects import registry
 from solum.objects.sqlalchemy import assembly
+from solum.objects.sqlalchemy import plan
+from solum.openstack.common import uuidutils
 from solum.tests import base
 from solum.tests import utils
 
@@ -30,14 +33,17 @@ class TestAssembly(base.BaseTestCase):
         self.db = self.useFixture(utils.Database())
         self.ctx = utils.dummy_context()
 
+        self.plans = [{'uuid': str(uuid.uuid4()), 'name': 'plan1',
+                       'project_id': self.ctx.tenant}]
+        utils.create_models_from_data(plan.Plan, self.plans, self.ctx)
         self.data = [{'project_id': self.ctx.tenant,
-                      'uuid': 'ce43e347f0b0422825245b3e5f140a81cef6e65b',
+                      'uuid': uuidutils.generate_uuid(),
                       'user_id': 'fred',
                       'name': 'assembly1',
                       'description': 'test assembly',
                       'trigger_id': 'trigger-uuid-1234',
                       'tags': 'assembly tags',
-                      'plan_id': 'plan_id_1',
+                      'plan_id': self.plans[0]['id'],
                       'status': 'BUILDING',
                       'application_uri': 'http://192.168.78.21:5000'}]
         utils.create_models_from_data(assembly.Assembly, self.data, self.ctx)
@@ -50,6 +56,48 @@ class TestAssembly(base.BaseTestCase):
         lst = assembly.AssemblyList()
         self.assertEqual(1, len(lst.get_all(self.ctx)))
 
+    def test_get_all_serialization_query_count(self):
+        plans = [{'uuid': str(uuid.uuid4()), 'name': 'plan%d' % i,
+                  'project_id': self.ctx.tenant} for i in range(3)]
+        utils.create_models_from_data(plan.Plan, plans, self.ctx)
+        data = [{'uuid': str(uuid.uuid4()), 'name': 'app%d' % i,
+                 'project_id': self.ctx.tenant,
+                 'plan_id': plans[i % 3]['id']} for i in range(20)]
+        utils.create_models_from_data(assembly.Assembly, data, self.ctx)
+
+        with utils.QueryCounter() as counter:
+            serialized = [a.as_dict()
+                          for a in assembly.AssemblyList.get_all(self.ctx)]
+        # one query for the assemblies, one for all of their plan uuids.
+        self.assertEqual(2, counter.count)
+        by_name = dict((a['name'], a['plan_uuid']) for a in serialized)
+        for i in range(20):
+            self.assertEqual(plans[i % 3]['uuid'],
+                             by_name['app%d' % i])
+
+    def test_get_all_columns(self):
+        with utils.QueryCounter() as counter:
+            lst = assembly.AssemblyList.get_all(self.ctx,
+                                                columns=['uuid', 'name'])
+            self.assertEqual([self.data[0]['uuid']], [a.uuid for a in lst])
+        # The plan uuids are not looked up.
+        self.assertEqual(1, counter.count)
+        self.assertNotIn('status', lst[0].__dict__)
+
+    def test_get_all_by_plan_uuid(self):
+        plans = [{'uuid': str(uuid.uuid4()), 'name': 'plan%d' % i,
+                  'project_id': self.ctx.tenant} for i in range(2)]
+        utils.create_models_from_data(plan.Plan, plans, self.ctx)
+        data = [{'uuid': str(uuid.uuid4()), 'name': 'assembly%d' % i,
+                 'project_id': self.ctx.tenant,
+                 'plan_id': plans[i % 2]['id']} for i in range(4)]
+        utils.create_models_from_data(assembly.Assembly, data, self.ctx)
+
+        lst = assembly.AssemblyList.get_all(
+            self.ctx, filters={'plan_uuid': plans[1]['uuid']})
+        self.assertEqual(['assembly1', 'assembly3'],
+                         sorted(a.name for a in lst))
+
     def test_check_data(self):
         ta = assembly.Assembly().get_by_id(self.ctx, self.data[0]['id'])
         for key, value in self.data[0].items():
@@ -90,6 +138,88 @@ class TestAssembly(base.BaseTestCase):
         updated = assembly.Assembly().get_by_id(self.ctx, self.data[0]['id'])
         self.assertEqual('DELETING', getattr(updated, 'status'))
 
+    def test_update_in_place(self):
+        assem_id = self.data[0]['id']
+        count = assembly.Assembly.update_in_place(
+            self.ctx, assem_id, {'status': 'BUILT', 'version': 7,
+                                 'plan_uuid': 'ignored'})
+        self.assertEqual(1, count)
+        ta = assembly.Assembly.get_by_id(self.ctx, assem_id)
+        self.assertEqual(('BUILT', 1), (ta.status, ta.version))
+
+        # A writer that read version 0 lost the race.
+        count = assembly.Assembly.update_in_place(
+            self.ctx, self.data[0]['uuid'], {'status': 'READY'}, version=0)
+        self.assertEqual(0, count)
+        count = assembly.Assembly.update_in_place(
+            self.ctx, self.data[0]['uuid'], {'status': 'READY'}, version=1)
+        self.assertEqual(1, count)
+        ta = assembly.Assembly.get_by_id(self.ctx, assem_id)
+        self.assertEqual(('READY', 2), (ta.status, ta.version))
+
+    def test_update_in_place_in_scope(self):
+        assem_id = self.data[0]['id']
+        with objects.IMPL.session_scope():
+            ta = assembly.Assembly.get_by_id(self.ctx, assem_id)
+            assembly.Assembly.update_in_place(self.ctx, assem_id,
+                                              {'status': 'BUILT'})
+            assembly.Assembly.bulk_update(
+                self.ctx, [(assem_id, {'application_uri': 'http://x'})])
+            # The scope's session hands out the same, updated object.
+            self.assertIs(ta, assembly.Assembly.get_by_id(self.ctx,
+                                                          assem_id))
+            self.assertEqual(('BUILT', 'http://x', 2),
+                             (ta.status, ta.application_uri, ta.version))
+
+    def test_update_in_place_not_updatable(self):
+        assem_id = self.data[0]['id']
+        assembly.Assembly.update_in_place(self.ctx, assem_id,
+                                          {'status': 'DELETING'})
+        count = assembly.Assembly.update_in_place(self.ctx, assem_id,
+                                                  {'status': 'READY'})
+        self.assertEqual(0, count)
+        count = assembly.Assembly.update_in_place(self.ctx, 12345,
+                                                  {'status': 'READY'})
+        self.assertEqual(0, count)
+        ta = assembly.Assembly.get_by_id(self.ctx, assem_id)
+        self.assertEqual('DELETING', ta.status)
+
+    def test_update_and_save_bumps_version(self):
+        assembly.Assembly.update_and_save(self.ctx, self.data[0]['id'],
+                                          {'status': 'BUILT'})
+        ta = assembly.Assembly.get_by_id(self.ctx, self.data[0]['id'])
+        self.assertEqual(1, ta.version)
+
+    def test_bulk_update(self):
+        data = [{'uuid': str(uuid.uuid4()), 'name': 'assembly%d' % i,
+                 'project_id': self.ctx.tenant, 'plan_id': 1,
+                 'status': 'BUILDING'} for i in range(3)]
+        data[2]['status'] = 'DELETING'
+        utils.create_models_from_data(assembly.Assembly, data, self.ctx)
+
+        count = assembly.Assembly.bulk_update(
+            self.ctx, [(data[0]['id'], {'status': 'BUILT'}),
+                       (data[1]['uuid'], {'status': 'BUILT'}),
+                       (data[0]['id'], {'status': 'READY',
+                                        'application_uri': 'http://x'}),
+                       (data[2]['id'], {'status': 'READY'})])
+
+        # assembly2 is being deleted and keeps its status.
+        self.assertEqual(2, count)
+        statuses = [(a.status, a.application_uri) for a in
+                    [assembly.Assembly.get_by_id(self.ctx, d['id'])
+                     for d in data]]
+        self.assertEqual([('READY', 'http://x'), ('BUILT', None),
+                          ('DELETING', None)], statuses)
+
+    def test_bulk_update_other_project(self):
+        other = utils.dummy_context(tenant_id='other_project')
+        count = assembly.Assembly.bulk_update(
+            other, [(self.data[0]['id'], {'status': 'READY'})])
+        self.assertEqual(0, count)
+        ta = assembly.Assembly.get_by_id(self.ctx, self.data[0]['id'])
+        self.assertEqual('BUILDING', ta.status)
+
     @mock.patch('solum.objects.sqlalchemy.models.SolumBase.get_session')
     @mock.patch('solum.objects.sqlalchemy.models.LOG')
     def test_update_and_save_raise_exp(self, mock_log, mock_sess):
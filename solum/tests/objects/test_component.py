@@ -69,6 +69,16 @@ class TestComponent(base.BaseTestCase):
         lst = component.ComponentList()
         self.assertEqual(2, len(lst.get_all(self.ctx)))
 
+    def test_get_all_serialization_query_count(self):
+        with utils.QueryCounter() as counter:
+            serialized = [c.as_dict()
+                          for c in component.ComponentList.get_all(self.ctx)]
+        self.assertEqual(2, counter.count)
+        by_name = dict((c['name'], c['assembly_uuid']) for c in serialized)
+        self.assertIsNone(by_name['component_no_assembly'])
+        self.assertEqual(self.data_assembly[0]['uuid'],
+                         by_name['component_assembly'])
+
     def test_check_data(self):
         ta = component.Component().get_by_id(self.ctx, self.data[0]['id'])
         for key, value in self.data[0].items():
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import uuid
+
 import mock
 from sqlalchemy.orm import exc
 
@@ -43,6 +45,11 @@ class TestImage(base.BaseTestCase):
         lst = image.ImageList()
         self.assertEqual(1, len(lst.get_all(self.ctx)))
 
+    def test_get_all_columns(self):
+        lst = image.ImageList.get_all(self.ctx, columns=['uuid', 'name'])
+        self.assertEqual(['image1'], [i.name for i in lst])
+        self.assertNotIn('tags', lst[0].__dict__)
+
     def test_check_data(self):
         test_srvc = image.Image().get_by_id(self.ctx, self.data[0]['id'])
         for key, value in self.data[0].items():
@@ -65,6 +72,30 @@ class TestImage(base.BaseTestCase):
         mock_img.assert_called_once_with(self.ctx,
                                          self.data[0]['uuid'])
 
+    def _build(self, key, ref, tenant=None):
+        data = [{'project_id': tenant or self.ctx.tenant,
+                 'uuid': str(uuid.uuid4()),
+                 'name': 'app',
+                 'status': 'READY',
+                 'build_key': key,
+                 'external_ref': ref}]
+        utils.create_models_from_data(image.Image, data, self.ctx)
+        return data[0]
+
+    def test_get_by_build_key(self):
+        self._build('k1', 'registry/app')
+        last = self._build('k1', 'registry/app')
+        self._build('k1', 'registry/other', tenant='other-project')
+        found = image.Image.get_by_build_key(self.ctx, 'k1')
+        self.assertEqual(last['id'], found.id)
+        self.assertIsNone(image.Image.get_by_build_key(self.ctx, 'k2'))
+
+    def test_get_by_build_key_overwritten(self):
+        # A later build of other inputs pushed the same image name.
+        self._build('k1', 'registry/app')
+        self._build('k2', 'registry/app')
+        self.assertIsNone(image.Image.get_by_build_key(self.ctx, 'k1'))
+
 
 class TestStates(base.BaseTestCase):
     def test_as_dict(self):
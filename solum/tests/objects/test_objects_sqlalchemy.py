@@ -20,13 +20,19 @@ Tests for the sqlalchemy solum 'objects' implementation
 """
 
 import datetime
+import os
+import tempfile
 import uuid
 
+import eventlet
+from oslo.config import cfg
+import sqlalchemy as sa
 import testtools
 from testtools import matchers
 
 from solum.common import exception
 from solum import objects
+from solum.objects.sqlalchemy import models
 from solum.tests import base as tests
 from solum.tests import utils
 
@@ -115,3 +121,168 @@ class TestObjectsSqlalchemy(tests.BaseTestCase):
         component.save(self.ctx)
 
         self.assertThat(next_time, matchers.GreaterThan(component.created_at))
+
+    def test_session_scope(self):
+        self.assertIsNot(objects.IMPL.get_session(),
+                         objects.IMPL.get_session())
+        objects.IMPL.begin_scope()
+        try:
+            scoped = objects.IMPL.get_session()
+            self.assertIs(scoped, objects.IMPL.get_session())
+            with objects.IMPL.session_scope():
+                self.assertIs(scoped, objects.IMPL.get_session())
+        finally:
+            objects.IMPL.end_scope()
+        self.assertIsNot(scoped, objects.IMPL.get_session())
+
+    def test_session_scope_checkouts(self):
+        def unit_of_work():
+            component = objects.registry.Component()
+            component.uuid = str(uuid.uuid4())
+            component.project_id = self.ctx.tenant
+            component.plan_id = 1
+            component.create(self.ctx)
+            objects.registry.Component.update_and_save(
+                self.ctx, component.uuid, {'name': 'abc'})
+            component = objects.registry.Component.get_by_uuid(
+                self.ctx, component.uuid)
+            self.assertEqual('abc', component.name)
+            objects.registry.ComponentList.get_all(self.ctx)
+
+        with utils.QueryCounter() as counter:
+            unit_of_work()
+        objects.IMPL.begin_scope()
+        with utils.QueryCounter() as scoped_counter:
+            unit_of_work()
+        self.assertEqual(1, objects.IMPL.end_scope())
+        self.assertEqual(counter.count, scoped_counter.count)
+
+    def test_session_scope_per_green_thread(self):
+        def unit_of_work():
+            objects.IMPL.begin_scope()
+            scoped = objects.IMPL.get_session()
+            # Let the other green thread begin its own scope.
+            eventlet.sleep(0)
+            self.assertIs(scoped, objects.IMPL.get_session())
+            return scoped, objects.IMPL.end_scope()
+
+        first = eventlet.spawn(unit_of_work)
+        second = eventlet.spawn(unit_of_work)
+        (first_session, first_checkouts) = first.wait()
+        (second_session, second_checkouts) = second.wait()
+        self.assertIsNot(first_session, second_session)
+        self.assertEqual((1, 1), (first_checkouts, second_checkouts))
+
+    def test_release_scope(self):
+        objects.IMPL.begin_scope()
+        scoped = objects.IMPL.get_session()
+        objects.IMPL.release_scope()
+        # The scope goes on with a new session and connection.
+        self.assertIsNot(scoped, objects.IMPL.get_session())
+        self.assertEqual(2, objects.IMPL.end_scope())
+
+    def test_end_scope_without_scope(self):
+        self.assertIsNone(objects.IMPL.end_scope())
+
+    def _use_replica(self):
+        fd, replica = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        self.addCleanup(os.remove, replica)
+        cfg.CONF.set_override('slave_connection', 'sqlite:///%s' % replica,
+                              group='database')
+        self.addCleanup(cfg.CONF.clear_override, 'slave_connection',
+                        group='database')
+        objects.IMPL.cleanup()
+        models.Base.metadata.create_all(
+            objects.IMPL.get_facade().get_engine(use_slave=True))
+
+    def _create_plan(self):
+        plan = objects.registry.Plan()
+        plan.uuid = str(uuid.uuid4())
+        plan.project_id = self.ctx.tenant
+        plan.create(self.ctx)
+        return plan
+
+    def test_replica_reads(self):
+        self._use_replica()
+        plan = self._create_plan()
+        with objects.IMPL.replica_reads():
+            # The replica has not seen the plan yet.
+            self.assertEqual([],
+                             objects.registry.PlanList.get_all(self.ctx))
+            self.assertRaises(exception.ResourceNotFound,
+                              objects.registry.Plan.get_by_uuid,
+                              self.ctx, plan.uuid)
+        self.assertEqual(
+            [plan.uuid],
+            [p.uuid for p in objects.registry.PlanList.get_all(self.ctx)])
+
+    def test_replica_reads_after_write(self):
+        self._use_replica()
+        with objects.IMPL.session_scope():
+            with objects.IMPL.replica_reads():
+                self.assertEqual(
+                    [], objects.registry.PlanList.get_all(self.ctx))
+                plan = self._create_plan()
+                self.assertEqual(
+                    [plan.uuid],
+                    [p.uuid for p in
+                     objects.registry.PlanList.get_all(self.ctx)])
+
+    def test_replica_reads_concurrent_writer(self):
+        self._use_replica()
+        self._create_plan()
+
+        def list_plans():
+            return [p.uuid for p in objects.registry.PlanList.get_all(
+                self.ctx)]
+
+        def reader():
+            with objects.IMPL.replica_reads():
+                # Let the writer write.
+                eventlet.sleep(0)
+                return list_plans()
+
+        def writer():
+            with objects.IMPL.replica_reads():
+                plan = self._create_plan()
+                eventlet.sleep(0)
+                return plan.uuid, list_plans()
+
+        reading = eventlet.spawn(reader)
+        writing = eventlet.spawn(writer)
+        # The write of another green thread does not move the reader off
+        # the replica, and the writer reads its own write.
+        self.assertEqual([], reading.wait())
+        written, seen = writing.wait()
+        self.assertIn(written, seen)
+
+    def test_replica_reads_without_replica(self):
+        plan = self._create_plan()
+        with objects.IMPL.replica_reads():
+            self.assertEqual(
+                [plan.uuid],
+                [p.uuid for p in objects.registry.PlanList.get_all(self.ctx)])
+
+    def test_lookup_indexes_created(self):
+        inspector = sa.inspect(objects.IMPL.get_engine())
+
+        def index_columns(table):
+            return dict((idx['name'], (idx['column_names'], idx['unique']))
+                        for idx in inspector.get_indexes(table))
+
+        self.assertEqual((['uuid'], True),
+                         index_columns('assembly')['ix_assembly_uuid'])
+        self.assertEqual((['trigger_id'], False),
+                         index_columns('pipeline')['ix_pipeline_trigger_id'])
+        self.assertEqual(
+            (['assembly_id', 'component_type'], False),
+            index_columns('component')[
+                'ix_component_assembly_id_component_type'])
+        self.assertEqual(
+            (['artifact_type', 'name'], False),
+            index_columns('image')['ix_image_artifact_type_name'])
+        self.assertEqual(
+            (['project_id', 'resource_uuid', 'created_at'], False),
+            index_columns('userlogs')[
+                'ix_userlogs_project_id_resource_uuid_created_at'])
@@ -12,8 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+
+import mock
+
+from solum.common import exception
+from solum import objects
 from solum.objects import registry
+from solum.objects.sqlalchemy import models
 from solum.objects.sqlalchemy import plan
+from solum.openstack.common import uuidutils
 from solum.tests import base
 from solum.tests import utils
 
@@ -26,7 +34,7 @@ class TestPlan(base.BaseTestCase):
         raw_content = {'artifacts': [
             {'content':
              {'href': 'http://github.com/some/project'}}]}
-        self.data = [{'uuid': 'test-uuid-123',
+        self.data = [{'uuid': uuidutils.generate_uuid(),
                       'project_id': self.ctx.tenant,
                       'user_id': 'fred',
                       'description': 'some description',
@@ -41,6 +49,61 @@ class TestPlan(base.BaseTestCase):
         lst = plan.PlanList()
         self.assertEqual(1, len(lst.get_all(self.ctx)))
 
+    def test_get_all_paginated(self):
+        data = [{'uuid': 'page-uuid-%d' % i, 'name': 'plan%d' % (i % 3),
+                 'project_id': self.ctx.tenant} for i in range(7)]
+        utils.create_models_from_data(plan.Plan, data, self.ctx)
+        seen = []
+        marker = None
+        while True:
+            page = plan.PlanList.get_all(self.ctx, limit=2, marker=marker,
+                                         sort_key='name', sort_dir='desc')
+            seen.extend(page)
+            if len(page) < 2:
+                break
+            marker = page[-1].uuid
+        self.assertEqual(8, len(seen))
+        self.assertEqual(len(seen), len(set(p.uuid for p in seen)))
+        # The fixture plan has no name and sorts last.
+        self.assertEqual(['plan2'] * 2 + ['plan1'] * 2 + ['plan0'] * 3 +
+                         [None], [p.name for p in seen])
+
+    def test_get_all_filtered(self):
+        data = [{'uuid': 'filter-uuid-%d' % i, 'name': 'plan%d' % i,
+                 'project_id': self.ctx.tenant} for i in range(3)]
+        utils.create_models_from_data(plan.Plan, data, self.ctx)
+        lst = plan.PlanList.get_all(self.ctx, filters={'name': 'plan1'})
+        self.assertEqual(['filter-uuid-1'], [p.uuid for p in lst])
+
+    def test_get_all_bad_query(self):
+        self.assertRaises(exception.BadRequest, plan.PlanList.get_all,
+                          self.ctx, sort_key='no_such_column')
+        self.assertRaises(exception.BadRequest, plan.PlanList.get_all,
+                          self.ctx, sort_dir='sideways')
+        self.assertRaises(exception.BadRequest, plan.PlanList.get_all,
+                          self.ctx, filters={'no_such_column': 1})
+        self.assertRaises(exception.BadRequest, plan.PlanList.get_all,
+                          self.ctx, limit=2, marker='no-such-uuid')
+
+    def test_get_all_columns(self):
+        with utils.QueryCounter() as counter:
+            lst = plan.PlanList.get_all(self.ctx, columns=['uuid', 'name'])
+            self.assertEqual([self.data[0]['uuid']], [p.uuid for p in lst])
+        self.assertEqual(1, counter.count)
+        self.assertNotIn('_raw_content', lst[0].__dict__)
+
+    def test_get_all_columns_in_scope(self):
+        with objects.IMPL.session_scope():
+            lst = plan.PlanList.get_all(self.ctx, columns=['uuid', 'name'])
+            # The other columns load on first access while the scope
+            # lasts.
+            self.assertEqual(self.data[0]['raw_content'],
+                             lst[0].raw_content)
+
+    def test_get_all_unknown_column(self):
+        self.assertRaises(exception.BadRequest, plan.PlanList.get_all,
+                          self.ctx, columns=['uuid', 'no_such_column'])
+
     def test_check_data_by_id(self):
         pl = plan.Plan().get_by_id(self.ctx, self.data[0]['id'])
         for key, value in self.data[0].items():
@@ -50,3 +113,40 @@ class TestPlan(base.BaseTestCase):
         pl = plan.Plan().get_by_uuid(self.ctx, self.data[0]['uuid'])
         for key, value in self.data[0].items():
             self.assertEqual(value, getattr(pl, key))
+
+    def test_raw_content_stored_as_json(self):
+        pl = plan.Plan.get_by_uuid(self.ctx, self.data[0]['uuid'])
+        self.assertEqual(self.data[0]['raw_content'],
+                         json.loads(pl._raw_content))
+
+    def test_raw_content_legacy_yaml(self):
+        session = plan.Plan.get_session()
+        with session.begin():
+            session.query(plan.Plan).update(
+                {'raw_content': 'artifacts:\n- name: legacy\n'})
+        pl = plan.Plan.get_by_uuid(self.ctx, self.data[0]['uuid'])
+        self.assertEqual({'artifacts': [{'name': 'legacy'}]},
+                         pl.raw_content)
+
+    def test_get_all_decodes_lazily(self):
+        with mock.patch.object(models, 'load_dict',
+                               wraps=models.load_dict) as load:
+            lst = plan.PlanList.get_all(self.ctx)
+            self.assertEqual([self.data[0]['uuid']], [p.uuid for p in lst])
+            self.assertFalse(load.called)
+            lst[0].raw_content
+            lst[0].raw_content
+            self.assertEqual(1, load.call_count)
+
+    def test_save_raw_content_changed_in_place(self):
+        pl = plan.Plan.get_by_uuid(self.ctx, self.data[0]['uuid'])
+        pl.raw_content['name'] = 'changed'
+        pl.save(self.ctx)
+        pl = plan.Plan.get_by_uuid(self.ctx, self.data[0]['uuid'])
+        self.assertEqual('changed', pl.raw_content['name'])
+
+    def test_update_in_place_raw_content(self):
+        plan.Plan.update_in_place(self.ctx, self.data[0]['uuid'],
+                                  {'raw_content': {'name': 'new'}})
+        pl = plan.Plan.get_by_uuid(self.ctx, self.data[0]['uuid'])
+        self.assertEqual({'name': 'new'}, pl.raw_content)
@@ -17,6 +17,7 @@ import tempfile
 import fixtures
 from oslo.config import cfg
 from oslo.db import options
+import sqlalchemy as sa
 
 from solum.common import context
 from solum import objects
@@ -58,6 +59,29 @@ class Database(fixtures.Fixture):
                              sqlite_db=self.db_file)
 
 
+class QueryCounter(object):
+    """Count the SQL statements run against the test database.
+
+    The ping oslo.db runs on each connection it checks out is not counted.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def _count(self, conn, cursor, statement, *args, **kwargs):
+        if statement.strip().upper() != 'SELECT 1':
+            self.count += 1
+
+    def __enter__(self):
+        sa.event.listen(objects.IMPL.get_engine(), 'before_cursor_execute',
+                        self._count)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        sa.event.remove(objects.IMPL.get_engine(), 'before_cursor_execute',
+                        self._count)
+
+
 def get_dummy_session():
     return objects.IMPL.get_session()
 
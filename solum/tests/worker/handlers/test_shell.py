@@ -14,7 +14,7 @@
 
 import base64
 import json
-import os.path
+import os
 import uuid
 
 import mock
@@ -74,6 +74,23 @@ def mock_http_response():
     return {'status': '401'}, ''
 
 
+def mock_output(mock_popen, *runs):
+    """Have each run of the mocked Popen print output and exit.
+
+    :param runs: (output, returncode) for each call to Popen
+    """
+    procs = []
+    for output, returncode in runs:
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, output)
+        os.close(write_fd)
+        proc = mock.MagicMock()
+        proc.stdout = os.fdopen(read_fd, 'rb')
+        proc.wait.return_value = returncode
+        procs.append(proc)
+    mock_popen.side_effect = procs
+
+
 class HandlerTest(base.BaseTestCase):
     scenarios = [
         ('auto_lp_id',
@@ -88,6 +105,9 @@ class HandlerTest(base.BaseTestCase):
     def setUp(self):
         super(HandlerTest, self).setUp()
         self.ctx = utils.dummy_context()
+        # Keep the worker caches off the disk.
+        cfg.CONF.set_override('git_mirror_dir', '', group='worker')
+        cfg.CONF.set_override('lp_cache_dir', '', group='worker')
 
     @mock.patch('solum.worker.handlers.shell.Handler._get_environment')
     @mock.patch('solum.objects.registry')
@@ -103,8 +123,8 @@ class HandlerTest(base.BaseTestCase):
         mock_registry.Assembly.get_by_id.return_value = fake_assembly
         fake_image = fakes.FakeImage()
         mock_registry.Image.get_lp_by_name_or_uuid.return_value = fake_image
-        mock_popen.return_value.communicate.return_value = [
-            'foo\ncreated_image_id=%s' % fake_glance_id, None]
+        mock_output(mock_popen,
+                    ('foo\ncreated_image_id=%s' % fake_glance_id, 0))
         test_env = mock_environment()
         mock_get_env.return_value = test_env
         git_info = mock_git_info()
@@ -121,11 +141,12 @@ class HandlerTest(base.BaseTestCase):
                                             self.expected_img_id,
                                             self.img_name],
                                            env=test_env,
-                                           stdout=-1)
+                                           stdout=-1,
+                                           preexec_fn=os.setsid)
         expected = [mock.call(5, 'BUILDING', 'Starting the image build',
-                              None, 44),
+                              None, 44, build_key=None),
                     mock.call(5, 'READY', 'built successfully',
-                              fake_glance_id, 44)]
+                              fake_glance_id, 44, build_key=None)]
 
         self.assertEqual(expected, mock_b_update.call_args_list)
 
@@ -135,6 +156,40 @@ class HandlerTest(base.BaseTestCase):
 
         assert not mock_deploy.called
 
+    @mock.patch('solum.worker.handlers.shell.Handler._get_environment')
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.conductor.api.API.update_assembly')
+    @mock.patch('solum.conductor.api.API.build_job_update')
+    @mock.patch('subprocess.Popen')
+    def test_build_reuses_identical_build(self, mock_popen, mock_b_update,
+                                          mock_uas, mock_registry,
+                                          mock_get_env):
+        handler = shell_handler.Handler()
+        handler._git_mirrors = mock.Mock()
+        mock_registry.Assembly.get_by_id.return_value = fakes.FakeAssembly()
+        fake_image = fakes.FakeImage()
+        mock_registry.Image.get_lp_by_name_or_uuid.return_value = fake_image
+        mock_registry.Image.get_by_build_key.return_value = fake_image
+        test_env = mock_environment()
+        test_env.update(GIT_MIRROR='/mirrors/foo', GIT_MIRROR_HEAD='abc123')
+        mock_get_env.return_value = test_env
+        handler.build(self.ctx, build_id=5, git_info=mock_git_info(),
+                      name='new_app', base_image_id=self.base_image_id,
+                      source_format='heroku', image_format='docker',
+                      assembly_id=44, run_cmd=None)
+
+        self.assertFalse(mock_popen.called)
+        handler._git_mirrors.release.assert_called_once_with('/mirrors/foo')
+        expected = [mock.call(5, 'BUILDING', 'Starting the image build',
+                              None, 44, build_key=None),
+                    mock.call(5, 'READY', 'reused an identical build',
+                              'docker_registry/image', 44,
+                              build_key=mock.ANY)]
+        self.assertEqual(expected, mock_b_update.call_args_list)
+        self.assertEqual([mock.call(44, {'status': 'BUILDING'}),
+                          mock.call(44, {'status': 'BUILT'})],
+                         mock_uas.call_args_list)
+
     @mock.patch('solum.worker.handlers.shell.Handler._get_environment')
     @mock.patch('solum.objects.registry')
     @mock.patch('solum.conductor.api.API.update_assembly')
@@ -154,8 +209,8 @@ class HandlerTest(base.BaseTestCase):
         cfg.CONF.set_override('image_storage', 'swift',
                               group='worker')
 
-        mock_popen.return_value.communicate.return_value = [
-            'foo\ncreated_image_id=%s' % fake_glance_id, None]
+        mock_output(mock_popen,
+                    ('foo\ncreated_image_id=%s' % fake_glance_id, 0))
         test_env = mock_environment()
         mock_get_env.return_value = test_env
         git_info = mock_git_info()
@@ -175,11 +230,12 @@ class HandlerTest(base.BaseTestCase):
                                             fake_image.external_ref,
                                             fake_image.name],
                                            env=test_env,
-                                           stdout=-1)
+                                           stdout=-1,
+                                           preexec_fn=os.setsid)
         expected = [mock.call(5, 'BUILDING', 'Starting the image build',
-                              None, 44),
+                              None, 44, build_key=None),
                     mock.call(5, 'READY', 'built successfully',
-                              image_id, 44)]
+                              image_id, 44, build_key=None)]
 
         self.assertEqual(expected, mock_b_update.call_args_list)
 
@@ -206,8 +262,8 @@ class HandlerTest(base.BaseTestCase):
         fake_image = fakes.FakeImage()
         mock_registry.Image.get_lp_by_name_or_uuid.return_value = fake_image
         handler._update_assembly_status = mock.MagicMock()
-        mock_popen.return_value.communicate.return_value = [
-            'foo\ncreated_image_id=%s' % fake_glance_id, None]
+        mock_output(mock_popen,
+                    ('foo\ncreated_image_id=%s' % fake_glance_id, 0))
         test_env = mock_environment()
         mock_get_env.return_value = test_env
         mock_ast.return_value = [{'source_url': 'git://example.com/foo',
@@ -227,11 +283,12 @@ class HandlerTest(base.BaseTestCase):
                                             'new_app', self.ctx.tenant,
                                             self.expected_img_id,
                                             self.img_name],
-                                           env=test_env, stdout=-1)
+                                           env=test_env, stdout=-1,
+                                           preexec_fn=os.setsid)
         expected = [mock.call(5, 'BUILDING', 'Starting the image build',
-                              None, 44),
+                              None, 44, build_key=None),
                     mock.call(5, 'READY', 'built successfully',
-                              fake_glance_id, 44)]
+                              fake_glance_id, 44, build_key=None)]
 
         self.assertEqual(expected, mock_b_update.call_args_list)
 
@@ -262,8 +319,8 @@ class HandlerTest(base.BaseTestCase):
         fake_image = fakes.FakeImage()
         mock_registry.Image.get_lp_by_name_or_uuid.return_value = fake_image
         handler._update_assembly_status = mock.MagicMock()
-        mock_popen.return_value.communicate.return_value = [
-            'foo\ncreated_image_id=%s' % fake_glance_id, None]
+        mock_output(mock_popen,
+                    ('foo\ncreated_image_id=%s' % fake_glance_id, 0))
         test_env = mock_environment()
         mock_get_env.return_value = test_env
         cfg.CONF.set_override('system_param_store', 'local_file',
@@ -291,11 +348,12 @@ class HandlerTest(base.BaseTestCase):
                                             'new_app', self.ctx.tenant,
                                             self.expected_img_id,
                                             self.img_name],
-                                           env=test_env, stdout=-1)
+                                           env=test_env, stdout=-1,
+                                           preexec_fn=os.setsid)
         expected = [mock.call(5, 'BUILDING', 'Starting the image build',
-                              None, 44),
+                              None, 44, build_key=None),
                     mock.call(5, 'READY', 'built successfully',
-                              fake_glance_id, 44)]
+                              fake_glance_id, 44, build_key=None)]
 
         self.assertEqual(expected, mock_b_update.call_args_list)
 
@@ -319,8 +377,7 @@ class HandlerTest(base.BaseTestCase):
         mock_registry.Assembly.get_by_id.return_value = fake_assembly
         fake_image = fakes.FakeImage()
         mock_registry.Image.get_lp_by_name_or_uuid.return_value = fake_image
-        mock_popen.return_value.communicate.return_value = [
-            'foo\ncreated_image_id=\n', None]
+        mock_output(mock_popen, ('foo\ncreated_image_id=\n', 0))
         test_env = mock_environment()
         mock_get_env.return_value = test_env
         git_info = mock_git_info()
@@ -335,11 +392,13 @@ class HandlerTest(base.BaseTestCase):
                                             'new_app', self.ctx.tenant,
                                             self.expected_img_id,
                                             self.img_name],
-                                           env=test_env, stdout=-1)
+                                           env=test_env, stdout=-1,
+                                           preexec_fn=os.setsid)
 
         expected = [mock.call(5, 'BUILDING', 'Starting the image build',
-                              None, 44),
-                    mock.call(5, 'ERROR', 'image not created', None, 44)]
+                              None, 44, build_key=None),
+                    mock.call(5, 'ERROR', 'image not created', None, 44,
+                              build_key=None)]
 
         self.assertEqual(expected, mock_b_update.call_args_list)
 
@@ -359,7 +418,7 @@ class HandlerTest(base.BaseTestCase):
         mock_registry.Assembly.get_by_id.return_value = fake_assembly
         fake_image = fakes.FakeImage()
         mock_registry.Image.get_lp_by_name_or_uuid.return_value = fake_image
-        mock_popen.call.return_value = ValueError
+        mock_output(mock_popen, ('', 0))
         test_env = mock_environment()
         mock_get_env.return_value = test_env
         git_info = mock_git_info()
@@ -374,11 +433,13 @@ class HandlerTest(base.BaseTestCase):
                                             'new_app', self.ctx.tenant,
                                             self.expected_img_id,
                                             self.img_name],
-                                           env=test_env, stdout=-1)
+                                           env=test_env, stdout=-1,
+                                           preexec_fn=os.setsid)
 
         expected = [mock.call(5, 'BUILDING', 'Starting the image build',
-                              None, 44),
-                    mock.call(5, 'ERROR', 'image not created', None, 44)]
+                              None, 44, build_key=None),
+                    mock.call(5, 'ERROR', 'image not created', None, 44,
+                              build_key=None)]
 
         self.assertEqual(expected, mock_b_update.call_args_list)
 
@@ -399,7 +460,7 @@ class HandlerTest(base.BaseTestCase):
         mock_registry.Image.get_lp_by_name_or_uuid.return_value = fake_image
         test_env = mock_environment()
         mock_get_env.return_value = test_env
-        mock_popen.return_value.wait.return_value = 0
+        mock_output(mock_popen, ('', 0))
         git_info = mock_git_info()
         handler.unittest(self.ctx, build_id=5, name='new_app',
                          base_image_id=self.base_image_id,
@@ -415,7 +476,8 @@ class HandlerTest(base.BaseTestCase):
                                             '', self.ctx.tenant,
                                             self.expected_img_id,
                                             self.img_name],
-                                           env=test_env, stdout=-1)
+                                           env=test_env, stdout=-1,
+                                           preexec_fn=os.setsid)
         expected = [mock.call(self.ctx, 8, 'UNIT_TESTING'),
                     mock.call(self.ctx, 8, 'UNIT_TESTING_PASSED')]
 
@@ -434,7 +496,7 @@ class HandlerTest(base.BaseTestCase):
         mock_registry.Image.get_lp_by_name_or_uuid.return_value = fake_image
         test_env = mock_environment()
         mock_get_env.return_value = test_env
-        mock_popen.return_value.wait.return_value = 1
+        mock_output(mock_popen, ('', 1))
         git_info = mock_git_info()
         handler.unittest(self.ctx, build_id=5, name='new_app',
                          assembly_id=fake_assembly.id,
@@ -451,7 +513,8 @@ class HandlerTest(base.BaseTestCase):
                                             '', self.ctx.tenant,
                                             self.expected_img_id,
                                             self.img_name],
-                                           env=test_env, stdout=-1)
+                                           env=test_env, stdout=-1,
+                                           preexec_fn=os.setsid)
         expected = [mock.call(self.ctx, 8, 'UNIT_TESTING'),
                     mock.call(self.ctx, 8, 'UNIT_TESTING_FAILED')]
 
@@ -472,9 +535,8 @@ class HandlerTest(base.BaseTestCase):
         mock_registry.Assembly.get_by_id.return_value = fake_assembly
         fake_image = fakes.FakeImage()
         mock_registry.Image.get_lp_by_name_or_uuid.return_value = fake_image
-        mock_popen.return_value.wait.return_value = 0
-        mock_popen.return_value.communicate.return_value = [
-            'foo\ncreated_image_id=%s' % fake_glance_id, None]
+        mock_output(mock_popen, ('', 0),
+                    ('foo\ncreated_image_id=%s' % fake_glance_id, 0))
         test_env = mock_environment()
         mock_get_env.return_value = test_env
         git_info = mock_git_info()
@@ -495,17 +557,19 @@ class HandlerTest(base.BaseTestCase):
             mock.call([u_script, 'git://example.com/foo', '',
                        self.ctx.tenant, self.expected_img_id,
                        self.img_name], env=test_env,
-                      stdout=-1),
+                      stdout=-1,
+                      preexec_fn=os.setsid),
             mock.call([b_script, 'git://example.com/foo', 'new_app',
                        self.ctx.tenant, self.expected_img_id,
                        self.img_name], env=test_env,
-                      stdout=-1)]
+                      stdout=-1,
+                      preexec_fn=os.setsid)]
         self.assertEqual(expected, mock_popen.call_args_list)
 
         expected = [mock.call(5, 'BUILDING', 'Starting the image build',
-                              None, 44),
+                              None, 44, build_key=None),
                     mock.call(5, 'READY', 'built successfully',
-                              fake_glance_id, 44)]
+                              fake_glance_id, 44, build_key=None)]
         self.assertEqual(expected, mock_b_update.call_args_list)
 
         expected = [mock.call(self.ctx, 44, 'UNIT_TESTING'),
@@ -530,7 +594,7 @@ class HandlerTest(base.BaseTestCase):
         mock_registry.Assembly.get_by_id.return_value = mock_assembly
         fake_image = fakes.FakeImage()
         mock_registry.Image.get_lp_by_name_or_uuid.return_value = fake_image
-        mock_popen.return_value.wait.return_value = 1
+        mock_output(mock_popen, ('', 1))
         test_env = mock_environment()
         mock_get_env.return_value = test_env
         git_info = mock_git_info()
@@ -549,7 +613,8 @@ class HandlerTest(base.BaseTestCase):
             mock.call([u_script, 'git://example.com/foo', '',
                        self.ctx.tenant, self.expected_img_id,
                        self.img_name], env=test_env,
-                      stdout=-1)]
+                      stdout=-1,
+                      preexec_fn=os.setsid)]
         self.assertEqual(expected, mock_popen.call_args_list)
 
         expected = [mock.call(self.ctx, 44, 'UNIT_TESTING'),
@@ -704,8 +769,8 @@ class TestLanguagePackBuildCommand(base.BaseTestCase):
         fake_image = fakes.FakeImage()
         fake_glance_id = str(uuid.uuid4())
         mock_registry.Image.get_lp_by_name_or_uuid.return_value = fake_image
-        mock_popen.return_value.communicate.return_value = [
-            'foo\nimage_external_ref=%s\n' % fake_glance_id, None]
+        mock_output(mock_popen,
+                    ('foo\nimage_external_ref=%s\n' % fake_glance_id, 0))
         test_env = mock_environment()
         mock_get_env.return_value = test_env
         git_info = mock_git_info()
@@ -719,7 +784,8 @@ class TestLanguagePackBuildCommand(base.BaseTestCase):
         mock_popen.assert_called_once_with([script, 'git://example.com/foo',
                                             'lp_name', self.ctx.tenant],
                                            env=test_env,
-                                           stdout=-1)
+                                           stdout=-1,
+                                           preexec_fn=os.setsid)
 
         expected = [mock.call(5, 'BUILDING', None),
                     mock.call(5, 'READY', fake_glance_id)]
@@ -0,0 +1,122 @@
+# Copyright 2015 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import eventlet
+import mock
+from oslo.config import cfg
+from oslo import messaging
+
+from solum.tests import base
+from solum.tests import utils
+from solum.worker import api
+
+REPO = 'https://example.com/app.git'
+GIT_INFO = {'source_url': REPO}
+
+
+class HashRingTest(base.BaseTestCase):
+    def test_stable(self):
+        ring = api.HashRing(['w1', 'w2', 'w3'])
+        repos = ['https://example.com/r%d.git' % i for i in range(100)]
+        before = dict((repo, ring.get(repo)) for repo in repos)
+        self.assertEqual(set(['w1', 'w2', 'w3']), set(before.values()))
+
+        # Only the repositories of the removed worker move.
+        ring = api.HashRing(['w1', 'w3'])
+        for repo in repos:
+            if before[repo] != 'w2':
+                self.assertEqual(before[repo], ring.get(repo))
+
+
+@mock.patch('solum.common.rpc.service._get_client')
+class RoutingTest(base.BaseTestCase):
+    def setUp(self):
+        super(RoutingTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        cfg.CONF.set_override('affinity_servers', ['w1', 'w2'],
+                              group='worker')
+        self.addCleanup(api._stats.update, routed=0, fallbacks=0)
+        self.addCleanup(api._refreshing.clear)
+
+    def _build_lp(self):
+        api.API(context=self.ctx).build_lp(1, GIT_INFO, 'lp', 'heroku',
+                                           'docker', None)
+
+    def test_cold_cache(self, mock_client):
+        prepared = mock_client.return_value.prepare.return_value
+        with mock.patch.object(eventlet, 'spawn_n') as spawn_n:
+            self._build_lp()
+            self._build_lp()
+
+        # The build follows the ring without waiting on the worker,
+        # whose queue is asked for once, in the background.
+        server = api.HashRing(['w1', 'w2']).get(REPO)
+        mock_client.return_value.prepare.assert_called_with(server=server)
+        self.assertFalse(prepared.call.called)
+        self.assertEqual(2, prepared.cast.call_count)
+        spawn_n.assert_called_once_with(mock.ANY, server)
+        self.assertEqual(1.0, api.routing_stats()['routed_ratio'])
+
+    def test_routed(self, mock_client):
+        prepared = mock_client.return_value.prepare.return_value
+        prepared.call.return_value = {'queued': 0}
+        self._build_lp()
+        eventlet.sleep(0)
+        self._build_lp()
+
+        server = api.HashRing(['w1', 'w2']).get(REPO)
+        mock_client.return_value.prepare.assert_any_call(server=server)
+        # The queue of the worker was asked for once.
+        prepared.call.assert_called_once_with(self.ctx, 'build_queue_stats')
+        self.assertEqual(2, prepared.cast.call_count)
+        self.assertFalse(mock_client.return_value.cast.called)
+        self.assertEqual(1.0, api.routing_stats()['routed_ratio'])
+
+    def test_worker_away(self, mock_client):
+        prepared = mock_client.return_value.prepare.return_value
+        prepared.call.side_effect = messaging.MessagingTimeout()
+        self._build_lp()
+        eventlet.sleep(0)
+        self._build_lp()
+        self.assertEqual(1, prepared.cast.call_count)
+        self.assertEqual(1, mock_client.return_value.cast.call_count)
+        self.assertEqual(1, api.routing_stats()['fallbacks'])
+
+    def test_worker_busy(self, mock_client):
+        cfg.CONF.set_override('affinity_max_queued', 1, group='worker')
+        prepared = mock_client.return_value.prepare.return_value
+        prepared.call.return_value = {'queued': 0}
+        self._build_lp()
+        eventlet.sleep(0)
+        self._build_lp()
+        self._build_lp()
+        self.assertEqual(2, prepared.cast.call_count)
+        self.assertEqual(1, mock_client.return_value.cast.call_count)
+
+    def test_no_affinity(self, mock_client):
+        cfg.CONF.set_override('affinity_servers', [], group='worker')
+        self._build_lp()
+        self.assertFalse(mock_client.return_value.prepare.called)
+        self.assertEqual(1, mock_client.return_value.cast.call_count)
+
+
+@mock.patch('solum.common.rpc.service._get_client')
+class PrewarmTest(base.BaseTestCase):
+    def test_fanout(self, mock_client):
+        ctx = utils.dummy_context()
+        api.API(context=ctx).prewarm_lp('lp_uuid', 'ref')
+        mock_client.return_value.prepare.assert_called_once_with(fanout=True)
+        cast = mock_client.return_value.prepare.return_value.cast
+        cast.assert_called_once_with(ctx, 'prewarm_lp', lp_uuid='lp_uuid',
+                                     external_ref='ref')
@@ -0,0 +1,103 @@
+# Copyright 2015 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import tempfile
+import time
+
+import mock
+from oslo.config import cfg
+
+from solum.tests import base
+from solum.tests import fakes
+from solum.tests import utils
+from solum.worker import build_cache
+
+
+class BuildKeyTest(base.BaseTestCase):
+    def setUp(self):
+        super(BuildKeyTest, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.params = os.path.join(self.tmpdir, 'user_params')
+        self._write_params('export A=1\n')
+        self.env = {'GIT_MIRROR_HEAD': 'abc123', 'USER_PARAMS': self.params}
+
+    def _write_params(self, content):
+        with open(self.params, 'w') as f:
+            f.write(content)
+
+    def _key(self, run_cmd='./start'):
+        return build_cache.build_key(self.env, 'lp-ref', run_cmd, 'heroku',
+                                     'docker')
+
+    def test_same_inputs_same_key(self):
+        self.assertEqual(self._key(), self._key())
+
+    def test_inputs_change_key(self):
+        key = self._key()
+        self.assertNotEqual(key, self._key(run_cmd='./other'))
+        self._write_params('export A=2\n')
+        self.assertNotEqual(key, self._key())
+        self.env['GIT_MIRROR_HEAD'] = 'def456'
+        self.assertNotEqual(key, self._key())
+        cfg.CONF.set_override('image_storage', 'glance', group='worker')
+        self.addCleanup(cfg.CONF.clear_override, 'image_storage',
+                        group='worker')
+        self.assertNotEqual(key, self._key())
+
+    def test_no_key_without_commit(self):
+        del self.env['GIT_MIRROR_HEAD']
+        self.assertIsNone(self._key())
+
+    def test_no_key_when_disabled(self):
+        cfg.CONF.set_override('reuse_built_images', False, group='worker')
+        self.addCleanup(cfg.CONF.clear_override, 'reuse_built_images',
+                        group='worker')
+        self.assertIsNone(self._key())
+
+
+@mock.patch('solum.objects.registry')
+class LookupTest(base.BaseTestCase):
+    def setUp(self):
+        super(LookupTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        build_cache.reset_stats()
+
+    def test_hit_and_miss(self, mock_registry):
+        mock_registry.Image.get_by_build_key.return_value = fakes.FakeImage()
+        self.assertEqual('docker_registry/image',
+                         build_cache.lookup(self.ctx, 'k1'))
+        mock_registry.Image.get_by_build_key.assert_called_once_with(
+            self.ctx, 'k1')
+
+        mock_registry.Image.get_by_build_key.return_value = None
+        self.assertIsNone(build_cache.lookup(self.ctx, 'k2'))
+        self.assertEqual({'hits': 1, 'misses': 1, 'hit_rate': 0.5},
+                         build_cache.stats())
+
+    def test_swift_temp_url_expiry(self, mock_registry):
+        cfg.CONF.set_override('image_storage', 'swift', group='worker')
+        self.addCleanup(cfg.CONF.clear_override, 'image_storage',
+                        group='worker')
+        img = fakes.FakeImage()
+        mock_registry.Image.get_by_build_key.return_value = img
+        url = ('https://swift/v1/AUTH_p/solum_du/app?temp_url_sig=s&'
+               'temp_url_expires=%dAPP_NAME=app')
+
+        img.external_ref = url % (time.time() + 604800)
+        self.assertEqual(img.external_ref, build_cache.lookup(self.ctx, 'k'))
+        img.external_ref = url % (time.time() + 60)
+        self.assertIsNone(build_cache.lookup(self.ctx, 'k'))
@@ -0,0 +1,158 @@
+# Copyright 2015 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo.config import cfg
+
+from solum.tests import base
+from solum.tests import utils
+from solum.worker import executor
+
+
+class BuildExecutorTest(base.BaseTestCase):
+    def setUp(self):
+        super(BuildExecutorTest, self).setUp()
+        self.started = []
+        patcher = mock.patch.object(executor.BuildExecutor, '_spawn',
+                                    side_effect=self.started.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _ctx(self, tenant):
+        ctx = utils.dummy_context()
+        ctx.tenant = tenant
+        return ctx
+
+    def _started(self):
+        return [job.args[1] for job in self.started]
+
+    def test_max_builds(self):
+        ex = executor.BuildExecutor(max_builds=2)
+        for i in range(3):
+            ex.submit(self._ctx('t%d' % i), executor.BUILD, mock.Mock(), i)
+
+        self.assertEqual([0, 1], self._started())
+        self.assertEqual(1, ex.stats()['queued'])
+        self.assertEqual(2, ex.stats()['running'])
+
+        ex._run(self.started[0])
+        self.assertEqual([0, 1, 2], self._started())
+        self.assertEqual(0, ex.stats()['queued'])
+
+    def test_unittest_first(self):
+        ex = executor.BuildExecutor(max_builds=1)
+        ex.submit(self._ctx('a'), executor.BUILD, mock.Mock(), 'running')
+        ex.submit(self._ctx('a'), executor.BUILD, mock.Mock(), 'build')
+        ex.submit(self._ctx('b'), executor.UNITTEST, mock.Mock(), 'test')
+
+        ex._run(self.started[0])
+
+        self.assertEqual(['running', 'test'], self._started())
+
+    def test_fair_share(self):
+        ex = executor.BuildExecutor(max_builds=2)
+        for i in range(3):
+            ex.submit(self._ctx('busy'), executor.BUILD, mock.Mock(),
+                      'busy%d' % i)
+        ex.submit(self._ctx('other'), executor.BUILD, mock.Mock(), 'other')
+
+        ex._run(self.started[0])
+
+        # busy already has a build running, other has none.
+        self.assertEqual(['busy0', 'busy1', 'other'], self._started())
+
+    def test_max_builds_per_tenant(self):
+        ex = executor.BuildExecutor(max_builds=3, max_builds_per_tenant=1)
+        for i in range(2):
+            ex.submit(self._ctx('a'), executor.BUILD, mock.Mock(), i)
+
+        self.assertEqual([0], self._started())
+        self.assertEqual(1, ex.stats()['queued'])
+
+    def test_failed_build_frees_slot(self):
+        ex = executor.BuildExecutor(max_builds=1)
+        ex.submit(self._ctx('a'), executor.BUILD,
+                  mock.Mock(side_effect=ValueError), 'fails')
+        ex.submit(self._ctx('a'), executor.BUILD, mock.Mock(), 'next')
+
+        ex._run(self.started[0])
+
+        self.assertEqual(['fails', 'next'], self._started())
+
+    @mock.patch('time.time')
+    def test_build_time(self, mock_time):
+        mock_time.return_value = 100.0
+        ex = executor.BuildExecutor(max_builds=1)
+        ex.submit(self._ctx('a'), executor.BUILD, mock.Mock(), 'first')
+        ex.submit(self._ctx('a'), executor.BUILD, mock.Mock(), 'second')
+        mock_time.return_value = 110.0
+        ex._run(self.started[0])
+        mock_time.return_value = 130.0
+        ex._run(self.started[1])
+        self.assertEqual(20.0, ex.stats()['avg_build_time'])
+
+
+class QueuedHandlerTest(base.BaseTestCase):
+    def test_priorities(self):
+        handler = mock.MagicMock()
+        ex = mock.MagicMock()
+        queued = executor.QueuedHandler(handler, ex)
+        ctx = utils.dummy_context()
+
+        queued.launch_workflow(ctx, workflow=['unittest'])
+        queued.launch_workflow(ctx, workflow=['unittest', 'build'])
+        queued.build_lp(ctx, image_id=1)
+
+        self.assertEqual(
+            [mock.call(ctx, executor.UNITTEST, handler.launch_workflow,
+                       workflow=['unittest']),
+             mock.call(ctx, executor.BUILD, handler.launch_workflow,
+                       workflow=['unittest', 'build']),
+             mock.call(ctx, executor.BUILD, handler.build_lp, image_id=1)],
+            ex.submit.call_args_list)
+
+    def test_build_queue_stats(self):
+        handler = mock.MagicMock()
+        ex = mock.MagicMock()
+        ex.stats.return_value = {'queued': 0}
+        stats = executor.QueuedHandler(handler, ex).build_queue_stats('ctx')
+        self.assertEqual({'queued': 0,
+                          'caches': handler.cache_stats.return_value}, stats)
+
+    @mock.patch('eventlet.spawn_n')
+    def test_prewarm_not_queued(self, mock_spawn):
+        handler = mock.MagicMock()
+        ex = mock.MagicMock()
+        qh = executor.QueuedHandler(handler, ex)
+        qh.prewarm_lp('ctx', lp_uuid='u', external_ref='ref')
+        self.assertFalse(ex.submit.called)
+
+        func, ctx, kwargs = mock_spawn.call_args[0]
+        func(ctx, kwargs)
+        handler.prewarm_lp.assert_called_once_with('ctx', lp_uuid='u',
+                                                   external_ref='ref')
+
+    @mock.patch('eventlet.spawn_n')
+    def test_prewarm_disabled(self, mock_spawn):
+        cfg.CONF.set_override('lp_prewarm_concurrency', 0, group='worker')
+        qh = executor.QueuedHandler(mock.MagicMock(), mock.MagicMock())
+        qh.prewarm_lp('ctx', lp_uuid='u', external_ref='ref')
+        self.assertFalse(mock_spawn.called)
+
+    def test_echo_not_queued(self):
+        handler = mock.MagicMock()
+        ex = mock.MagicMock()
+        executor.QueuedHandler(handler, ex).echo('ctx', 'hi')
+        handler.echo.assert_called_once_with('ctx', 'hi')
+        self.assertFalse(ex.submit.called)
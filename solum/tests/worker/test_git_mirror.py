@@ -0,0 +1,110 @@
+# Copyright 2015 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import mock
+from oslo.config import cfg
+
+from solum.tests import base
+from solum.worker import git_mirror
+
+
+class MirrorCacheTest(base.BaseTestCase):
+    def setUp(self):
+        super(MirrorCacheTest, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.mirrors = git_mirror.MirrorCache(
+            os.path.join(self.tmpdir, 'mirrors'), max_size_mb=100)
+        # The tests mirror local repositories.
+        patcher = mock.patch.object(
+            git_mirror, 'MIRRORED_SCHEMES',
+            git_mirror.MIRRORED_SCHEMES + ('file',))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _repo(self, name):
+        path = os.path.join(self.tmpdir, name)
+        subprocess.check_call(['git', 'init', '-q', path])
+        url = 'file://' + path
+        self._commit(url)
+        return url
+
+    def _commit(self, url):
+        repo = url[len('file://'):]
+        subprocess.check_call(['git', '-C', repo, '-c', 'user.name=solum',
+                               '-c', 'user.email=solum@example.com',
+                               'commit', '-q', '--allow-empty', '-m', 'c'])
+        return subprocess.check_output(['git', '-C', repo, 'rev-parse',
+                                        'HEAD']).decode().strip()
+
+    def test_checkout_clones_then_fetches(self):
+        repo = self._repo('app')
+        path, head = self.mirrors.checkout(repo)
+        self.assertTrue(os.path.isdir(path))
+        self.assertEqual(1, self.mirrors.misses)
+        self.mirrors.release(path)
+
+        new_head = self._commit(repo)
+        self.assertNotEqual(head, new_head)
+        self.assertEqual((path, new_head), self.mirrors.checkout(repo))
+        self.assertEqual(1, self.mirrors.hits)
+        self.assertEqual(0.5, self.mirrors.stats()['hit_rate'])
+
+    def test_checkout_unreachable_repo(self):
+        self.assertIsNone(self.mirrors.checkout(
+            'file://' + os.path.join(self.tmpdir, 'missing')))
+        self.assertEqual(1, self.mirrors.failures)
+        self.assertEqual({}, dict(self.mirrors._in_use))
+
+    def test_checkout_disabled(self):
+        mirrors = git_mirror.MirrorCache('')
+        self.assertIsNone(mirrors.checkout(self._repo('app')))
+
+    def test_evicts_least_recently_used_unleased(self):
+        self.mirrors.max_size = 0
+        first, _ = self.mirrors.checkout(self._repo('one'))
+        self.mirrors.release(first)
+        second, _ = self.mirrors.checkout(self._repo('two'))
+        self.assertFalse(os.path.exists(first))
+        # Over budget, but leased to a running build.
+        self.assertTrue(os.path.exists(second))
+        self.assertEqual(1, self.mirrors.evictions)
+
+    def test_git_timeout_kills_children(self):
+        cfg.CONF.set_override('git_mirror_timeout', 0.5, group='worker')
+        start = time.time()
+        # The alias runs in a shell that git waits for.
+        self.assertRaises(subprocess.CalledProcessError, self.mirrors._git,
+                          '-c', 'alias.hang=!sleep 5', 'hang')
+        self.assertLess(time.time() - start, 3)
+
+
+class MirrorSchemeTest(base.BaseTestCase):
+    def test_local_repos_not_mirrored(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        repo = os.path.join(tmpdir, 'app')
+        subprocess.check_call(['git', 'init', '-q', repo])
+        mirrors = git_mirror.MirrorCache(os.path.join(tmpdir, 'mirrors'))
+
+        for url in (repo, 'file://' + repo, 'other/' + repo):
+            self.assertIsNone(mirrors.checkout(url))
+        self.assertFalse(os.path.exists(mirrors.base_dir))
+        self.assertEqual(0, mirrors.failures)
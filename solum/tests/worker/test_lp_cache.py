@@ -0,0 +1,115 @@
+# Copyright 2015 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+import mock
+from oslo.config import cfg
+
+from solum.tests import base
+from solum.tests import fakes
+from solum.tests import utils
+from solum.worker import lp_cache
+
+IMAGE = b'languagepack image' * 100
+
+
+def _response(body=IMAGE, etag=None):
+    response = io.BytesIO(body)
+    response.info = mock.Mock(return_value={
+        'etag': etag or hashlib.md5(body).hexdigest()})
+    return response
+
+
+class LPCacheTest(base.BaseTestCase):
+    def setUp(self):
+        super(LPCacheTest, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        cfg.CONF.set_override('image_storage', 'swift', group='worker')
+        self.ctx = utils.dummy_context()
+        self.cache = lp_cache.LPCache(self.tmpdir, max_size_mb=100)
+        self.lp = fakes.FakeImage()
+        self.lp.external_ref = 'https://swift/v1/AUTH_p/lp/python?sig=1'
+
+    @mock.patch('six.moves.urllib.request.urlopen')
+    def test_download_once(self, mock_urlopen):
+        mock_urlopen.side_effect = lambda url: _response()
+        path, saved = self.cache.checkout(self.ctx, self.lp)
+        self.assertEqual(0, saved)
+        with open(path, 'rb') as f:
+            self.assertEqual(IMAGE, f.read())
+        self.cache.release(path)
+
+        self.assertEqual((path, len(IMAGE)),
+                         self.cache.checkout(self.ctx, self.lp))
+        self.assertEqual(1, mock_urlopen.call_count)
+        stats = self.cache.stats()
+        self.assertEqual(len(IMAGE), stats['bytes_saved'])
+        self.assertEqual(0.5, stats['hit_rate'])
+
+    @mock.patch('six.moves.urllib.request.urlopen')
+    def test_new_image_of_languagepack(self, mock_urlopen):
+        mock_urlopen.side_effect = lambda url: _response()
+        first, _ = self.cache.checkout(self.ctx, self.lp)
+        self.lp.external_ref += '&rebuilt'
+        second, saved = self.cache.checkout(self.ctx, self.lp)
+        self.assertNotEqual(first, second)
+        self.assertEqual(0, saved)
+
+    @mock.patch('six.moves.urllib.request.urlopen')
+    def test_checksum_mismatch(self, mock_urlopen):
+        mock_urlopen.return_value = _response(etag='0' * 32)
+        self.assertIsNone(self.cache.checkout(self.ctx, self.lp))
+        self.assertEqual(1, self.cache.failures)
+        self.assertEqual([], os.listdir(self.tmpdir))
+
+    @mock.patch('six.moves.urllib.request.urlopen')
+    def test_truncated_image_downloaded_again(self, mock_urlopen):
+        mock_urlopen.side_effect = lambda url: _response()
+        path, _ = self.cache.checkout(self.ctx, self.lp)
+        with open(path, 'r+b') as f:
+            f.truncate(10)
+        self.assertEqual((path, 0), self.cache.checkout(self.ctx, self.lp))
+        self.assertEqual(2, mock_urlopen.call_count)
+
+    @mock.patch('time.sleep')
+    @mock.patch('six.moves.urllib.request.urlopen')
+    def test_max_rate(self, mock_urlopen, mock_sleep):
+        mock_urlopen.return_value = _response()
+        lp = lp_cache.LPRef(self.lp.uuid, self.lp.external_ref)
+        self.cache.checkout(self.ctx, lp, max_rate_kb=1)
+        # The image takes about 1.8 seconds to download at 1 KB/s.
+        self.assertTrue(mock_sleep.called)
+        self.assertTrue(1.5 < mock_sleep.call_args[0][0] <= 1.8)
+
+    @mock.patch('solum.common.clients.cached_clients')
+    def test_glance(self, mock_clients):
+        glance = mock_clients.return_value.glance.return_value
+        glance.images.get.return_value.checksum = (
+            hashlib.md5(IMAGE).hexdigest())
+        glance.images.data.return_value = [IMAGE[:100], IMAGE[100:]]
+        cfg.CONF.set_override('image_storage', 'glance', group='worker')
+        path, saved = self.cache.checkout(self.ctx, self.lp)
+        glance.images.data.assert_called_once_with(self.lp.external_ref)
+        self.assertEqual(len(IMAGE), os.path.getsize(path))
+
+    def test_docker_registry_not_cached(self):
+        cfg.CONF.set_override('image_storage', 'docker_registry',
+                              group='worker')
+        self.assertIsNone(self.cache.checkout(self.ctx, self.lp))
@@ -0,0 +1,86 @@
+# Copyright 2015 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import tempfile
+
+from solum.tests import base
+from solum.worker import process
+
+
+class RunStageTest(base.BaseTestCase):
+    def setUp(self):
+        super(RunStageTest, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.logpath = os.path.join(self.tmpdir, 'build.log')
+        self.env = {'PROJECT_ID': 'p1', 'BUILD_ID': 'b1',
+                    'PATH': os.environ.get('PATH', '')}
+
+    def _run(self, script, **kwargs):
+        return process.run_stage(['sh', '-c', script], self.env,
+                                 self.logpath, 'build', **kwargs)
+
+    def test_markers_and_tail(self):
+        result = self._run('for i in $(seq 1 30); do echo line$i; done; '
+                           'echo created_image_id=abc; echo done',
+                           markers=['created_image_id', 'missing'])
+        self.assertEqual(0, result.returncode)
+        self.assertFalse(result.timed_out)
+        self.assertEqual({'created_image_id': 'created_image_id=abc'},
+                         result.markers)
+        self.assertEqual(process.TAIL_LINES, len(result.tail))
+        self.assertEqual('done', result.tail[-1])
+
+    def test_returncode(self):
+        result = self._run('echo oops; exit 3')
+        self.assertEqual(3, result.returncode)
+        self.assertEqual(['oops'], result.tail)
+
+    def test_last_line_without_newline(self):
+        result = self._run('printf image_external_ref=xyz',
+                           markers=['image_external_ref'])
+        self.assertEqual('image_external_ref=xyz',
+                         result.markers['image_external_ref'])
+
+    def test_long_line_split(self):
+        length = process.MAX_LINE_LENGTH * 2 + 10
+        result = self._run('head -c %d /dev/zero | tr "\\0" x' % length)
+        self.assertEqual([process.MAX_LINE_LENGTH, process.MAX_LINE_LENGTH,
+                          10], [len(line) for line in result.tail])
+
+    def test_timeout(self):
+        result = self._run('echo started; sleep 30', timeout=1)
+        self.assertTrue(result.timed_out)
+        self.assertNotEqual(0, result.returncode)
+        self.assertEqual(['started'], result.tail)
+
+    def test_first_marker(self):
+        result = self._run('echo created_image_id=a; echo created_image_id=b',
+                           markers=['created_image_id'])
+        self.assertEqual('created_image_id=a',
+                         result.markers['created_image_id'])
+
+    def test_output_file(self):
+        self._run('echo one; echo two')
+        # The task log is left to the scripts.
+        self.assertFalse(os.path.exists(self.logpath))
+        with open(self.logpath + process.OUTPUT_SUFFIX) as f:
+            self.assertEqual('one\ntwo\n', f.read())
+
+    def test_unwritable_task_log(self):
+        self.logpath = os.path.join(self.tmpdir, 'missing', 'build.log')
+        result = self._run('echo one')
+        self.assertEqual(['one'], result.tail)
@@ -40,7 +40,7 @@ class SwiftUpload(solum.uploaders.common.UploaderBase):
             try:
                 LOG.debug("Uploading log to Swift. %s, %s" %
                           (container, filename))
-                swift = clients.OpenStackClients(self.context).swift()
+                swift = clients.cached_clients(self.context).swift()
                 swift.put_container(container)
                 swift.put_object(container, filename, logfile)
             except swiftexceptions.ClientException:
@@ -12,31 +12,179 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
-"""API for interfacing with Solum Worker."""
+"""API for interfacing with Solum Worker.
+
+All workers listen on the shared worker topic, so a build used to land
+on any of them. With affinity_servers set, the builds of a repository
+are cast to the worker its URL hashes to instead, which likely still
+holds its git mirror, languagepack and earlier results. The servers are
+placed on a consistent hash ring: adding or removing a worker only moves
+the repositories of its neighbours. A build goes to the shared topic
+when its worker does not answer or has too many builds queued.
+
+The queue of a worker is asked for in the background, never while a
+build is being cast; until it is known, builds follow the ring alone.
+"""
+
+import bisect
+import hashlib
+
+import eventlet
 
 from oslo.config import cfg
+from oslo import messaging
 
+from solum.common import cache
 from solum.common.rpc import service
+from solum.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+cfg.CONF.import_opt('topic', 'solum.worker.config', group='worker')
+cfg.CONF.import_opt('affinity_servers', 'solum.worker.config',
+                    group='worker')
+cfg.CONF.import_opt('affinity_max_queued', 'solum.worker.config',
+                    group='worker')
+cfg.CONF.import_opt('affinity_probe_timeout', 'solum.worker.config',
+                    group='worker')
+cfg.CONF.import_opt('affinity_probe_ttl', 'solum.worker.config',
+                    group='worker')
+
+# Points of each server on the ring; more of them spread the load more
+# evenly.
+RING_REPLICAS = 64
+
+# server -> [builds queued on it], or None if it did not answer
+_loads = cache.TTLCache()
+# servers whose queue is being asked for
+_refreshing = set()
+_rings = {}
+_stats = {'routed': 0, 'fallbacks': 0}
+
+
+def _hash(key):
+    return int(hashlib.md5(key.encode('utf-8')).hexdigest()[:8], 16)
+
+
+class HashRing(object):
+    """Map keys to servers by consistent hashing."""
+
+    def __init__(self, servers):
+        self._points = sorted((_hash('%s-%d' % (server, i)), server)
+                              for server in servers
+                              for i in range(RING_REPLICAS))
+        self._hashes = [point for point, server in self._points]
+
+    def get(self, key):
+        i = bisect.bisect(self._hashes, _hash(key)) % len(self._points)
+        return self._points[i][1]
+
+
+def _ring(servers):
+    key = tuple(servers)
+    if key not in _rings:
+        _rings.clear()
+        _rings[key] = HashRing(servers)
+    return _rings[key]
+
+
+def routing_stats():
+    """Return how many builds went to their worker or the shared topic."""
+    total = _stats['routed'] + _stats['fallbacks']
+    return dict(_stats, routed_ratio=(float(_stats['routed']) / total
+                                      if total else 0.0))
 
 
 class API(service.API):
     def __init__(self, transport=None, context=None):
-        cfg.CONF.import_opt('topic', 'solum.worker.config',
-                            group='worker')
         super(API, self).__init__(transport, context,
                                   topic=cfg.CONF.worker.topic)
 
     def build_app(self, verb, build_id, git_info, ports, name, base_image_id,
                   source_format, image_format, assembly_id, workflow,
                   test_cmd=None, run_cmd=None):
-        self._cast(verb, build_id=build_id, git_info=git_info, ports=ports,
-                   name=name, base_image_id=base_image_id,
-                   source_format=source_format, image_format=image_format,
-                   assembly_id=assembly_id, workflow=workflow,
-                   test_cmd=test_cmd, run_cmd=run_cmd)
+        self._cast_by_repo(git_info.get('source_url'), verb,
+                           build_id=build_id, git_info=git_info,
+                           ports=ports, name=name,
+                           base_image_id=base_image_id,
+                           source_format=source_format,
+                           image_format=image_format,
+                           assembly_id=assembly_id, workflow=workflow,
+                           test_cmd=test_cmd, run_cmd=run_cmd)
 
     def build_lp(self, image_id, git_info, name, source_format, image_format,
                  artifact_type):
-        self._cast('build_lp', image_id=image_id, git_info=git_info, name=name,
-                   source_format=source_format, image_format=image_format,
-                   artifact_type=artifact_type)
+        self._cast_by_repo(git_info.get('source_url'), 'build_lp',
+                           image_id=image_id, git_info=git_info, name=name,
+                           source_format=source_format,
+                           image_format=image_format,
+                           artifact_type=artifact_type)
+
+    def prewarm_lp(self, lp_uuid, external_ref):
+        """Have every worker fetch a languagepack image into its cache."""
+        self._prepare(fanout=True).cast(self._context, 'prewarm_lp',
+                                        lp_uuid=lp_uuid,
+                                        external_ref=external_ref)
+
+    def build_queue_stats(self, server=None):
+        """Return the queue and cache stats of a worker.
+
+        :param server: the host option of the worker to ask; any worker
+                       listening on the shared topic answers if None
+        """
+        if server is None:
+            return self._call('build_queue_stats')
+        client = self._prepare(server=server,
+                               timeout=cfg.CONF.worker.affinity_probe_timeout)
+        return client.call(self._context, 'build_queue_stats')
+
+    def _cast_by_repo(self, source_url, method, **kwargs):
+        server = self._pick_server(source_url)
+        if server is None:
+            self._cast(method, **kwargs)
+        else:
+            self._prepare(server=server).cast(self._context, method,
+                                              **kwargs)
+
+    def _pick_server(self, source_url):
+        servers = cfg.CONF.worker.affinity_servers
+        if not servers or not source_url:
+            return None
+        server = _ring(servers).get(source_url)
+        load = self._load(server)
+        if load is False:
+            _stats['routed'] += 1
+            return server
+        if load is None or load[0] >= cfg.CONF.worker.affinity_max_queued:
+            _stats['fallbacks'] += 1
+            LOG.debug("Worker %s busy or away, build of %s goes to the "
+                      "shared topic, %s" % (server, source_url,
+                                            routing_stats()))
+            return None
+        # Count it until the worker is asked again.
+        load[0] += 1
+        _stats['routed'] += 1
+        return server
+
+    def _load(self, server):
+        """Return the cached load of a server, or False if not known yet.
+
+        A missing or expired load is refreshed in the background.
+        """
+        load = _loads.get(server, False)
+        if load is False and server not in _refreshing:
+            _refreshing.add(server)
+            eventlet.spawn_n(self._refresh_load, server)
+        return load
+
+    def _refresh_load(self, server):
+        try:
+            try:
+                load = [self.build_queue_stats(server)['queued']]
+            except messaging.MessagingException as e:
+                LOG.warn("Worker %s did not answer: %s" % (server, e))
+                load = None
+            _loads.set(server, load, cfg.CONF.worker.affinity_probe_ttl)
+        finally:
+            _refreshing.discard(server)
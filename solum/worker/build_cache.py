@@ -0,0 +1,103 @@
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Reuse the image of an earlier build of the same inputs.
+
+A build is keyed by a digest of everything that goes into its image: the
+commit, the languagepack, the run command, the parameters and where the
+image is stored. A successful build records its key on its image row;
+the next build with the same key in the project gets the image of that
+one without running the build script.
+"""
+
+import hashlib
+import json
+import re
+import time
+
+from oslo.config import cfg
+
+from solum import objects
+from solum.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+BUILD_CACHE_OPTS = [
+    cfg.BoolOpt('reuse_built_images',
+                default=True,
+                help='Give a build the image of an earlier build of the '
+                     'same commit, languagepack, run command and '
+                     'parameters instead of building it again.'),
+]
+
+cfg.CONF.register_opts(BUILD_CACHE_OPTS, group='worker')
+cfg.CONF.import_opt('image_storage', 'solum.worker.config', group='worker')
+cfg.CONF.import_opt('temp_url_ttl', 'solum.worker.config', group='worker')
+
+_stats = {'hits': 0, 'misses': 0}
+
+
+def build_key(user_env, lp_ref, run_cmd, source_format, image_format):
+    """Return the key of a build, or None if it cannot be reused.
+
+    Only builds from a git mirror are keyed: the mirror tells which
+    commit the build script is going to check out.
+    """
+    if not cfg.CONF.worker.reuse_built_images:
+        return None
+    commit = user_env.get('GIT_MIRROR_HEAD')
+    if not commit:
+        return None
+    params = []
+    for var in ('USER_PARAMS', 'SOLUM_PARAMS'):
+        if var in user_env:
+            with open(user_env[var]) as f:
+                params.append(hashlib.sha256(f.read()).hexdigest())
+    inputs = [commit, lp_ref, run_cmd, params, source_format, image_format,
+              cfg.CONF.worker.image_storage]
+    return hashlib.sha256(json.dumps(inputs)).hexdigest()
+
+
+def lookup(ctxt, key):
+    """Return the created_image_id of an earlier build with key, or None."""
+    image = objects.registry.Image.get_by_build_key(ctxt, key)
+    if image is not None and not _still_valid(image.external_ref):
+        image = None
+    _stats['hits' if image is not None else 'misses'] += 1
+    LOG.debug("Build cache %s for key %s, %s" %
+              ('hit' if image is not None else 'miss', key, stats()))
+    return None if image is None else image.external_ref
+
+
+def _still_valid(created_image_id):
+    # A swift DU is only reachable through its temp URL; leave a deploy
+    # of the reused image half of the usual validity.
+    if cfg.CONF.worker.image_storage != 'swift':
+        return True
+    expires = re.search(r'temp_url_expires=(\d+)', created_image_id or '')
+    if expires is None:
+        return False
+    margin = int(cfg.CONF.worker.temp_url_ttl) / 2
+    return int(expires.group(1)) - time.time() > margin
+
+
+def stats():
+    lookups = _stats['hits'] + _stats['misses']
+    return dict(_stats, hit_rate=(float(_stats['hits']) / lookups
+                                  if lookups else 0.0))
+
+
+def reset_stats():
+    _stats['hits'] = _stats['misses'] = 0
@@ -73,6 +73,37 @@ SERVICE_OPTS = [
     cfg.StrOpt('temp_url_ttl',
                default="604800",
                help='TTL in seconds.'),
+    cfg.IntOpt('unittest_timeout',
+               default=3600,
+               help='Seconds after which a unit test run is killed. '
+                    '0 disables the timeout.'),
+    cfg.IntOpt('build_timeout',
+               default=3600,
+               help='Seconds after which an application build is killed. '
+                    '0 disables the timeout.'),
+    cfg.IntOpt('lp_build_timeout',
+               default=3600,
+               help='Seconds after which a languagepack build is killed. '
+                    '0 disables the timeout.'),
+    cfg.ListOpt('affinity_servers',
+                default=[],
+                help='The host option of each worker builds may be routed '
+                     'to. A build goes to the worker the hash of its '
+                     'repository maps to, which likely holds its git '
+                     'mirror and languagepack. Builds go to the shared '
+                     'topic when empty.'),
+    cfg.IntOpt('affinity_max_queued',
+               default=4,
+               help='Builds queued on a worker past which new builds go to '
+                    'the shared topic instead.'),
+    cfg.FloatOpt('affinity_probe_timeout',
+                 default=2.0,
+                 help='Seconds to wait for the queue stats of a worker '
+                      'before taking it for dead.'),
+    cfg.IntOpt('affinity_probe_ttl',
+               default=10,
+               help='Seconds the queue stats of a worker are reused for '
+                    'routing.'),
 ]
 
 opt_group = cfg.OptGroup(
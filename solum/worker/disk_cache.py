@@ -0,0 +1,120 @@
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Size-bounded caches of files on the local disk of a worker.
+
+Each entry of a DiskCache is a file or directory directly under its base
+directory. Entries are leased to the builds using them and the least
+recently used entries that are not leased are removed once the cache
+takes more than its budget.
+"""
+
+import collections
+import os
+import shutil
+
+from solum.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+# Suffix of the entries still being written.
+TMP_SUFFIX = '.tmp'
+
+
+def disk_usage(path):
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    size = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+class DiskCache(object):
+    """Leases, LRU eviction and hit counts of a directory of entries."""
+
+    # Suffixes of files that belong to an entry rather than being one.
+    side_suffixes = ()
+
+    def __init__(self, base_dir, max_size_mb):
+        self.base_dir = base_dir
+        self.max_size = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.evictions = 0
+        self._in_use = collections.defaultdict(int)
+        # entry path -> bytes on disk, as of its last update
+        self._sizes = {}
+
+    def release(self, path):
+        """Give back an entry leased to a build."""
+        self._in_use[path] -= 1
+        if self._in_use[path] <= 0:
+            del self._in_use[path]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'failures': self.failures,
+                'evictions': self.evictions,
+                'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+                'size': sum(self._sizes.values())}
+
+    def _lease(self, path):
+        self._in_use[path] += 1
+
+    def _touch(self, path):
+        # The modification time orders entries for eviction.
+        os.utime(path, None)
+        self._sizes[path] = disk_usage(path)
+
+    def _remove(self, path):
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+        for suffix in self.side_suffixes:
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        self._sizes.pop(path, None)
+
+    def _evict(self):
+        total = 0
+        entries = []
+        for name in os.listdir(self.base_dir):
+            if name.endswith((TMP_SUFFIX,) + self.side_suffixes):
+                continue
+            path = os.path.join(self.base_dir, name)
+            if path not in self._sizes:
+                # Left by an earlier run of the worker.
+                self._sizes[path] = disk_usage(path)
+            total += self._sizes[path]
+            entries.append((os.path.getmtime(path), path))
+
+        for mtime, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            if path in self._in_use:
+                continue
+            LOG.debug("Evicting %s from the cache" % path)
+            total -= self._sizes[path]
+            self._remove(path)
+            self.evictions += 1
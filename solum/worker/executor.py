@@ -0,0 +1,216 @@
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Queue and run the builds of a worker.
+
+The RPC server hands build requests to a BuildExecutor and returns at
+once. The executor runs at most max_concurrent_builds of them at a time,
+each in its own green thread. Unit test runs go before full builds, and
+among the builds of one priority a slot goes to the tenant with the
+fewest running builds, so one tenant pushing many apps does not starve
+the others.
+
+Languagepack prewarms do not take build slots; at most
+lp_prewarm_concurrency of them download at a time.
+"""
+
+import collections
+import itertools
+import time
+
+import eventlet
+from eventlet import semaphore
+from oslo.config import cfg
+
+from solum.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+EXECUTOR_OPTS = [
+    cfg.IntOpt('max_concurrent_builds',
+               default=4,
+               help='Maximum number of builds, unit test runs and '
+                    'languagepack builds run at the same time by a worker.'),
+    cfg.IntOpt('max_builds_per_tenant',
+               default=0,
+               help='Maximum number of builds of one tenant run at the same '
+                    'time by a worker. 0 means no limit besides '
+                    'max_concurrent_builds.'),
+    cfg.IntOpt('lp_prewarm_concurrency',
+               default=1,
+               help='Maximum number of languagepacks a worker prewarms its '
+                    'cache with at the same time. 0 disables prewarming.'),
+]
+
+cfg.CONF.register_opts(EXECUTOR_OPTS, group='worker')
+
+# Priorities, lowest first.
+UNITTEST = 0
+BUILD = 1
+
+# Number of finished builds averaged in the stats.
+TIMED_BUILDS = 100
+
+
+class _Job(object):
+    def __init__(self, seq, tenant, priority, func, args, kwargs):
+        self.seq = seq
+        self.tenant = tenant
+        self.priority = priority
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.queued_at = time.time()
+
+
+class BuildExecutor(object):
+    """Run submitted builds with bounded, fair concurrency."""
+
+    def __init__(self, max_builds=None, max_builds_per_tenant=None):
+        if max_builds is None:
+            max_builds = cfg.CONF.worker.max_concurrent_builds
+        if max_builds_per_tenant is None:
+            max_builds_per_tenant = cfg.CONF.worker.max_builds_per_tenant
+        self.max_builds = max(max_builds, 1)
+        self.max_builds_per_tenant = max_builds_per_tenant
+        self._seq = itertools.count()
+        # priority -> tenant -> jobs in arrival order
+        self._queues = collections.defaultdict(dict)
+        self._running = collections.defaultdict(int)
+        self._last_wait = 0.0
+        # seconds from arrival to the end of the last finished builds
+        self._build_times = collections.deque(maxlen=TIMED_BUILDS)
+
+    def submit(self, ctxt, priority, func, *args, **kwargs):
+        """Queue func(ctxt, *args, **kwargs) and start it when a slot frees.
+
+        Returns at once; the outcome of a build is reported by the build
+        itself.
+        """
+        job = _Job(next(self._seq), ctxt.tenant, priority, func,
+                   (ctxt,) + args, kwargs)
+        tenants = self._queues[priority]
+        tenants.setdefault(job.tenant, collections.deque()).append(job)
+        self._dispatch()
+
+    def stats(self):
+        """Return the queue depth and wait times of this worker."""
+        queued = [job for tenants in self._queues.values()
+                  for jobs in tenants.values() for job in jobs]
+        now = time.time()
+        times = self._build_times
+        return {'queued': len(queued),
+                'running': sum(self._running.values()),
+                'oldest_wait': max([now - job.queued_at for job in queued]
+                                   or [0.0]),
+                'last_wait': self._last_wait,
+                'avg_build_time': (sum(times) / len(times) if times
+                                   else 0.0)}
+
+    def _dispatch(self):
+        while sum(self._running.values()) < self.max_builds:
+            job = self._next_job()
+            if job is None:
+                return
+            self._running[job.tenant] += 1
+            self._last_wait = time.time() - job.queued_at
+            LOG.debug("Starting build of tenant %s after %.1fs in queue, "
+                      "%s" % (job.tenant, self._last_wait, self.stats()))
+            self._spawn(job)
+
+    def _next_job(self):
+        for priority in sorted(self._queues):
+            tenants = self._queues[priority]
+            eligible = [t for t in tenants
+                        if not self.max_builds_per_tenant or
+                        self._running[t] < self.max_builds_per_tenant]
+            if not eligible:
+                continue
+            tenant = min(eligible, key=lambda t: (self._running[t],
+                                                  tenants[t][0].seq))
+            job = tenants[tenant].popleft()
+            if not tenants[tenant]:
+                del tenants[tenant]
+            return job
+        return None
+
+    def _spawn(self, job):
+        eventlet.spawn_n(self._run, job)
+
+    def _run(self, job):
+        try:
+            job.func(*job.args, **job.kwargs)
+        except Exception as e:
+            LOG.exception(e)
+        finally:
+            build_time = time.time() - job.queued_at
+            self._build_times.append(build_time)
+            LOG.debug("Build of tenant %s done %.1fs after it arrived" %
+                      (job.tenant, build_time))
+            self._running[job.tenant] -= 1
+            if not self._running[job.tenant]:
+                del self._running[job.tenant]
+            self._dispatch()
+
+
+class QueuedHandler(object):
+    """RPC endpoint running the builds of a worker handler on an executor.
+
+    :param handler: the worker handler doing the actual work
+    """
+
+    def __init__(self, handler, executor=None):
+        self._handler = handler
+        self._executor = executor or BuildExecutor()
+        self._prewarm_slots = semaphore.Semaphore(
+            max(cfg.CONF.worker.lp_prewarm_concurrency, 1))
+
+    def echo(self, ctxt, message):
+        self._handler.echo(ctxt, message)
+
+    def launch_workflow(self, ctxt, **kwargs):
+        workflow = kwargs.get('workflow') or []
+        priority = BUILD if 'build' in workflow else UNITTEST
+        self._executor.submit(ctxt, priority, self._handler.launch_workflow,
+                              **kwargs)
+
+    def build(self, ctxt, **kwargs):
+        self._executor.submit(ctxt, BUILD, self._handler.build, **kwargs)
+
+    def unittest(self, ctxt, **kwargs):
+        self._executor.submit(ctxt, UNITTEST, self._handler.unittest,
+                              **kwargs)
+
+    def build_lp(self, ctxt, **kwargs):
+        self._executor.submit(ctxt, BUILD, self._handler.build_lp, **kwargs)
+
+    def prewarm_lp(self, ctxt, **kwargs):
+        if (not cfg.CONF.worker.lp_prewarm_concurrency or
+                not hasattr(self._handler, 'prewarm_lp')):
+            return
+        eventlet.spawn_n(self._prewarm, ctxt, kwargs)
+
+    def _prewarm(self, ctxt, kwargs):
+        with self._prewarm_slots:
+            try:
+                self._handler.prewarm_lp(ctxt, **kwargs)
+            except Exception as e:
+                LOG.exception(e)
+
+    def build_queue_stats(self, ctxt):
+        stats = self._executor.stats()
+        if hasattr(self._handler, 'cache_stats'):
+            stats['caches'] = self._handler.cache_stats()
+        return stats
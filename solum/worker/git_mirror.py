@@ -0,0 +1,140 @@
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Bare mirrors of the git repositories a worker builds.
+
+The build scripts used to ask the remote for its head with git ls-remote
+and then clone the whole repository again for every new commit. The
+worker now keeps one bare mirror per repository URL and brings it up to
+date with an incremental fetch before each build; the scripts clone from
+the mirror on the local disk. Mirrors are evicted least recently used
+first once they take more than git_mirror_max_size_mb.
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+
+from oslo.config import cfg
+from six.moves.urllib import parse
+
+from solum.openstack.common import lockutils
+from solum.openstack.common import log as logging
+from solum.worker import disk_cache
+from solum.worker import process
+
+
+LOG = logging.getLogger(__name__)
+
+GIT_MIRROR_OPTS = [
+    cfg.StrOpt('git_mirror_dir',
+               default='/var/lib/solum/git-mirrors',
+               help='Directory of the bare git mirrors shared by the builds '
+                    'of a worker. Builds clone from the remote repository '
+                    'when empty.'),
+    cfg.IntOpt('git_mirror_max_size_mb',
+               default=10240,
+               help='Disk space the git mirrors may take before the least '
+                    'recently used ones are removed.'),
+    cfg.IntOpt('git_mirror_timeout',
+               default=600,
+               help='Seconds after which the clone or fetch of a git '
+                    'mirror is killed.'),
+]
+
+cfg.CONF.register_opts(GIT_MIRROR_OPTS, group='worker')
+
+# Local paths and file:// URLs are never mirrored: they would let a build
+# read the worker's disk, other tenants' mirrors included.
+MIRRORED_SCHEMES = ('http', 'https', 'git', 'ssh')
+
+
+class MirrorCache(disk_cache.DiskCache):
+    """Keep the bare mirrors of a worker up to date and within budget.
+
+    A mirror is leased to a build by checkout() and given back by
+    release(); leased mirrors are never evicted. Checkouts of the same
+    repository are serialized, those of different repositories are not.
+    """
+
+    def __init__(self, base_dir=None, max_size_mb=None):
+        if base_dir is None:
+            base_dir = cfg.CONF.worker.git_mirror_dir
+        if max_size_mb is None:
+            max_size_mb = cfg.CONF.worker.git_mirror_max_size_mb
+        super(MirrorCache, self).__init__(base_dir, max_size_mb)
+
+    def path(self, url):
+        return os.path.join(self.base_dir,
+                            hashlib.sha1(url.encode('utf-8')).hexdigest())
+
+    def checkout(self, url):
+        """Bring the mirror of url up to date and lease it.
+
+        :returns: the mirror path and its head commit, or None if the
+                  build has to clone url itself
+        """
+        if (not self.base_dir or
+                parse.urlparse(url).scheme not in MIRRORED_SCHEMES):
+            return None
+        path = self.path(url)
+        self._lease(path)
+        try:
+            with lockutils.lock('git-mirror-' + path):
+                head = self._update(url, path)
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.failures += 1
+            LOG.warn("Cannot mirror %s, the build clones it: %s" % (url, e))
+            self.release(path)
+            return None
+        self._evict()
+        return path, head
+
+    def _update(self, url, path):
+        if os.path.isdir(path):
+            self._git('--git-dir', path, 'fetch', '--prune', 'origin')
+            self.hits += 1
+        else:
+            # Clone aside so an interrupted clone is never taken for a
+            # mirror.
+            tmp_path = path + disk_cache.TMP_SUFFIX
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not os.path.isdir(self.base_dir):
+                os.makedirs(self.base_dir)
+            self._git('clone', '--mirror', url, tmp_path)
+            os.rename(tmp_path, path)
+            self.misses += 1
+        self._touch(path)
+        return self._git('--git-dir', path, 'rev-parse', 'HEAD').strip()
+
+    def _git(self, *args):
+        env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+        cmd = ('git',) + args
+        # git runs its transports (git-remote-https, ssh) as children that
+        # hold the pipe open, so the timeout kills the whole session.
+        proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT,
+                                preexec_fn=os.setsid)
+        timer = threading.Timer(cfg.CONF.worker.git_mirror_timeout,
+                                process._kill, [proc])
+        timer.start()
+        try:
+            output = proc.communicate()[0]
+        finally:
+            timer.cancel()
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, output)
+        return output.decode('utf-8', 'replace')
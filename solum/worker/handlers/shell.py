@@ -20,7 +20,6 @@ import os
 import random
 import shelve
 import string
-import subprocess
 
 from oslo.config import cfg
 
@@ -28,7 +27,6 @@ import solum
 from solum.common import clients
 from solum.common import exception
 from solum.common import repo_utils
-from solum.common import solum_keystoneclient
 from solum.conductor import api as conductor_api
 from solum.deployer import api as deployer_api
 from solum import objects
@@ -39,6 +37,10 @@ from solum.openstack.common import uuidutils
 import solum.uploaders.common as uploader_common
 import solum.uploaders.local as local_uploader
 import solum.uploaders.swift as swift_uploader
+from solum.worker import build_cache
+from solum.worker import git_mirror
+from solum.worker import lp_cache
+from solum.worker import process
 
 
 LOG = logging.getLogger(__name__)
@@ -55,6 +57,11 @@ cfg.CONF.import_opt('image_storage', 'solum.worker.config', group='worker')
 cfg.CONF.import_opt('temp_url_secret', 'solum.worker.config', group='worker')
 cfg.CONF.import_opt('temp_url_protocol', 'solum.worker.config', group='worker')
 cfg.CONF.import_opt('temp_url_ttl', 'solum.worker.config', group='worker')
+cfg.CONF.import_opt('unittest_timeout', 'solum.worker.config',
+                    group='worker')
+cfg.CONF.import_opt('build_timeout', 'solum.worker.config', group='worker')
+cfg.CONF.import_opt('lp_build_timeout', 'solum.worker.config',
+                    group='worker')
 
 
 def upload_task_log(ctxt, original_path, resource, build_id, stage):
@@ -69,7 +76,8 @@ def upload_task_log(ctxt, original_path, resource, build_id, stage):
 
 
 def job_update_notification(ctxt, build_id, state=None, description=None,
-                            created_image_id=None, assembly_id=None):
+                            created_image_id=None, assembly_id=None,
+                            build_key=None):
     """send a status update to the conductor."""
     LOG.debug('build id:%s %s (%s) %s %s' % (build_id, state, description,
                                              created_image_id, assembly_id),
@@ -77,7 +85,8 @@ def job_update_notification(ctxt, build_id, state=None, description=None,
     conductor_api.API(context=ctxt).build_job_update(build_id, state,
                                                      description,
                                                      created_image_id,
-                                                     assembly_id)
+                                                     assembly_id,
+                                                     build_key=build_key)
 
 
 def get_assembly_by_id(ctxt, assembly_id):
@@ -113,12 +122,21 @@ def update_lp_status(ctxt, image_id, status, external_ref=None):
 
 
 class Handler(object):
+    def __init__(self):
+        self._git_mirrors = git_mirror.MirrorCache()
+        self._lp_cache = lp_cache.LPCache()
+
     def echo(self, ctxt, message):
         LOG.debug("%s" % message)
 
+    def cache_stats(self):
+        return {'git_mirrors': self._git_mirrors.stats(),
+                'languagepacks': self._lp_cache.stats(),
+                'builds': build_cache.stats()}
+
     @exception.wrap_keystone_exception
     def _get_environment(self, ctxt, source_uri, assembly_id=None,
-                         test_cmd=None, run_cmd=None):
+                         test_cmd=None, run_cmd=None, use_mirror=False):
         # create a minimal environment
         user_env = {}
 
@@ -150,11 +168,11 @@ class Handler(object):
             user_env['OS_AUTH_TOKEN'] = ctxt.auth_token
             user_env['OS_AUTH_URL'] = ctxt.auth_url or ''
             user_env['OS_REGION_NAME'] = client_region_name
-            kc = solum_keystoneclient.KeystoneClientV3(ctxt)
-            user_env['OS_IMAGE_URL'] = kc.client.service_catalog.url_for(
+            osc = clients.cached_clients(ctxt)
+            user_env['OS_IMAGE_URL'] = osc.url_for(
                 service_type='image',
                 endpoint_type='publicURL')
-            user_env['OS_STORAGE_URL'] = kc.client.service_catalog.url_for(
+            user_env['OS_STORAGE_URL'] = osc.url_for(
                 service_type='object-store',
                 endpoint_type='publicURL',
                 region_name=client_region_name)
@@ -175,8 +193,30 @@ class Handler(object):
         params_env = self._get_parameter_env(ctxt, source_uri, assembly_id,
                                              user_env['BUILD_ID'])
         user_env.update(params_env)
+
+        # The worker has no deploy keys of its own to fetch private repos.
+        if use_mirror and not user_env.get('REPO_DEPLOY_KEYS'):
+            mirror = self._git_mirrors.checkout(source_uri)
+            if mirror is not None:
+                user_env['GIT_MIRROR'], user_env['GIT_MIRROR_HEAD'] = mirror
+            LOG.debug("Git mirrors: %s" % self._git_mirrors.stats())
         return user_env
 
+    def _get_cached_lp(self, ctxt, lp, user_env):
+        if lp is None:
+            return
+        cached = self._lp_cache.checkout(ctxt, lp)
+        if cached is not None:
+            user_env['LP_CACHE_FILE'], saved = cached
+            LOG.debug("Languagepack cache saved %d bytes for build %s, %s" %
+                      (saved, user_env['BUILD_ID'], self._lp_cache.stats()))
+
+    def _release_caches(self, user_env):
+        if 'GIT_MIRROR' in user_env:
+            self._git_mirrors.release(user_env['GIT_MIRROR'])
+        if 'LP_CACHE_FILE' in user_env:
+            self._lp_cache.release(user_env['LP_CACHE_FILE'])
+
     @property
     def proj_dir(self):
         if cfg.CONF.worker.proj_dir:
@@ -309,12 +349,13 @@ class Handler(object):
 
         source_uri = git_info['source_url']
 
+        lp = None
         lp_name = ''
         if base_image_id != 'auto':
-            image = objects.registry.Image.get_lp_by_name_or_uuid(
+            lp = objects.registry.Image.get_lp_by_name_or_uuid(
                 ctxt, base_image_id)
-            base_image_id = image.external_ref
-            lp_name = image.name
+            base_image_id = lp.external_ref
+            lp_name = lp.name
 
         build_cmd = self._get_build_command(ctxt, 'build', source_uri,
                                             name, base_image_id,
@@ -326,7 +367,8 @@ class Handler(object):
         try:
             user_env = self._get_environment(ctxt, source_uri,
                                              assembly_id=assembly_id,
-                                             run_cmd=run_cmd)
+                                             run_cmd=run_cmd,
+                                             use_mirror=True)
         except exception.SolumException as env_ex:
             LOG.exception(env_ex)
             job_update_notification(ctxt, build_id, IMAGE_STATES.ERROR,
@@ -346,17 +388,34 @@ class Handler(object):
                                     'build',
                                     user_env['BUILD_ID'])
         LOG.debug("Build logs stored at %s" % logpath)
-        out = None
         assem = None
         if assembly_id is not None:
             assem = get_assembly_by_id(ctxt, assembly_id)
             if assem.status == ASSEMBLY_STATES.DELETING:
+                self._release_caches(user_env)
                 return
 
+        build_key = build_cache.build_key(user_env, base_image_id, run_cmd,
+                                          source_format, image_format)
+        if build_key is not None:
+            created_image_id = build_cache.lookup(ctxt, build_key)
+            if created_image_id is not None:
+                self._release_caches(user_env)
+                job_update_notification(ctxt, build_id, IMAGE_STATES.READY,
+                                        description='reused an identical '
+                                                    'build',
+                                        created_image_id=created_image_id,
+                                        assembly_id=assembly_id,
+                                        build_key=build_key)
+                update_assembly_status(ctxt, assembly_id,
+                                       ASSEMBLY_STATES.BUILT)
+                return created_image_id
+
+        self._get_cached_lp(ctxt, lp, user_env)
         try:
-            out = subprocess.Popen(build_cmd,
-                                   env=user_env,
-                                   stdout=subprocess.PIPE).communicate()[0]
+            result = process.run_stage(build_cmd, user_env, logpath, 'build',
+                                       markers=['created_image_id'],
+                                       timeout=cfg.CONF.worker.build_timeout)
         except (OSError, ValueError) as subex:
             LOG.exception(subex)
             job_update_notification(ctxt, build_id, IMAGE_STATES.ERROR,
@@ -364,6 +423,8 @@ class Handler(object):
                                     assembly_id=assembly_id)
             update_assembly_status(ctxt, assembly_id, ASSEMBLY_STATES.ERROR)
             return
+        finally:
+            self._release_caches(user_env)
 
         if assem is not None:
             assem.type = 'app'
@@ -377,29 +438,33 @@ class Handler(object):
         # If image_storage is 'swift', this will be swift tempUrl for the DU
         created_image_id = None
 
-        for line in out.split('\n'):
-            if 'created_image_id' in line:
-                solum.TLS.trace.support_info(build_out_line=line)
-                # (devkulkarni): When the image_storage is swift, the form
-                # of the tempUrl is like so:
-                # https://<>/<app-name>?temp_url_sig=val&temp_url_expires=val
-                # Because of the presence of the query string, we cannot use
-                # splitting on '=' like we do for others. Hence the special
-                # logic below.
-                if cfg.CONF.worker.image_storage == 'swift':
-                    img_id = line.replace("created_image_id=", '')
-                    # (devkulkarni): We need the APP_NAME in deployer
-                    # Appending it to the created_image_id for now (below).
-                    # TODO(devkulkarni): Store the APP_NAME in assembly
-                    # in deployer
-                    img_id += "APP_NAME=" + name
-                    created_image_id = img_id
-                else:
-                    created_image_id = line.split('=')[-1].strip()
-                LOG.debug("created_image_id:%s" % created_image_id)
+        line = result.markers.get('created_image_id')
+        if line is not None and not result.timed_out:
+            solum.TLS.trace.support_info(build_out_line=line)
+            # (devkulkarni): When the image_storage is swift, the form
+            # of the tempUrl is like so:
+            # https://<>/<app-name>?temp_url_sig=val&temp_url_expires=val
+            # Because of the presence of the query string, we cannot use
+            # splitting on '=' like we do for others. Hence the special
+            # logic below.
+            if cfg.CONF.worker.image_storage == 'swift':
+                img_id = line.replace("created_image_id=", '')
+                # (devkulkarni): We need the APP_NAME in deployer
+                # Appending it to the created_image_id for now (below).
+                # TODO(devkulkarni): Store the APP_NAME in assembly
+                # in deployer
+                img_id += "APP_NAME=" + name
+                created_image_id = img_id
+            else:
+                created_image_id = line.split('=')[-1].strip()
+            LOG.debug("created_image_id:%s" % created_image_id)
         if not created_image_id:
+            description = 'image not created'
+            if result.timed_out:
+                description = ('build timed out after %s seconds' %
+                               cfg.CONF.worker.build_timeout)
             job_update_notification(ctxt, build_id, IMAGE_STATES.ERROR,
-                                    description='image not created',
+                                    description=description,
                                     assembly_id=assembly_id)
             update_assembly_status(ctxt, assembly_id, ASSEMBLY_STATES.ERROR)
             return
@@ -407,7 +472,8 @@ class Handler(object):
             job_update_notification(ctxt, build_id, IMAGE_STATES.READY,
                                     description='built successfully',
                                     created_image_id=created_image_id,
-                                    assembly_id=assembly_id)
+                                    assembly_id=assembly_id,
+                                    build_key=build_key)
             update_assembly_status(ctxt, assembly_id, ASSEMBLY_STATES.BUILT)
             return created_image_id
 
@@ -424,12 +490,13 @@ class Handler(object):
         LOG.debug("Running unittests.")
         update_assembly_status(ctxt, assembly_id, ASSEMBLY_STATES.UNIT_TESTING)
 
+        lp = None
         lp_name = ''
         if base_image_id != 'auto':
-            image = objects.registry.Image.get_lp_by_name_or_uuid(
+            lp = objects.registry.Image.get_lp_by_name_or_uuid(
                 ctxt, base_image_id)
-            base_image_id = image.external_ref
-            lp_name = image.name
+            base_image_id = lp.external_ref
+            lp_name = lp.name
 
         git_url = git_info['source_url']
         command = self._get_build_command(ctxt, 'unittest', git_url, name,
@@ -442,7 +509,8 @@ class Handler(object):
 
         user_env = self._get_environment(ctxt, git_url,
                                          assembly_id=assembly_id,
-                                         test_cmd=test_cmd)
+                                         test_cmd=test_cmd,
+                                         use_mirror=True)
         log_env = user_env.copy()
         if 'OS_AUTH_TOKEN' in log_env:
             del log_env['OS_AUTH_TOKEN']
@@ -458,15 +526,20 @@ class Handler(object):
         if assembly_id is not None:
             assem = get_assembly_by_id(ctxt, assembly_id)
             if assem.status == ASSEMBLY_STATES.DELETING:
+                self._release_caches(user_env)
                 return returncode
 
+        self._get_cached_lp(ctxt, lp, user_env)
         try:
-            runtest = subprocess.Popen(command, env=user_env,
-                                       stdout=subprocess.PIPE)
-            returncode = runtest.wait()
+            result = process.run_stage(
+                command, user_env, logpath, 'unittest',
+                timeout=cfg.CONF.worker.unittest_timeout)
+            returncode = result.returncode
         except OSError as subex:
             LOG.exception("Exception running unit tests:")
             LOG.exception(subex)
+        finally:
+            self._release_caches(user_env)
 
         if assem is not None:
             assem.type = 'app'
@@ -548,30 +621,28 @@ class Handler(object):
                                     user_env['BUILD_ID'])
         LOG.debug("Languagepack logs stored at %s" % logpath)
 
-        out = None
         status = IMAGE_STATES.ERROR
         image_external_ref = None
 
         try:
-            out = subprocess.Popen(build_cmd,
-                                   env=user_env,
-                                   stdout=subprocess.PIPE).communicate()[0]
+            result = process.run_stage(
+                build_cmd, user_env, logpath, 'languagepack',
+                markers=['image_external_ref'],
+                timeout=cfg.CONF.worker.lp_build_timeout)
 
             # we expect one line in the output that looks like:
             # image_external_ref=<external storage ref>
-
-            for line in out.split('\n'):
-                if 'image_external_ref' in line:
-                    solum.TLS.trace.support_info(build_lp_out_line=line)
-                    # When the image_storage is swift,
-                    # we cannot use splitting on '=' like we do for others.
-                    # Hence the special logic below.
-                    if cfg.CONF.worker.image_storage == 'swift':
-                        img_id = line.replace("image_external_ref=", '')
-                        image_external_ref = img_id
-                    else:
-                        image_external_ref = line.split('=')[-1].strip()
-                    break
+            line = result.markers.get('image_external_ref')
+            if line is not None and not result.timed_out:
+                solum.TLS.trace.support_info(build_lp_out_line=line)
+                # When the image_storage is swift,
+                # we cannot use splitting on '=' like we do for others.
+                # Hence the special logic below.
+                if cfg.CONF.worker.image_storage == 'swift':
+                    img_id = line.replace("image_external_ref=", '')
+                    image_external_ref = img_id
+                else:
+                    image_external_ref = line.split('=')[-1].strip()
             if image_external_ref is not None:
                 status = IMAGE_STATES.READY
             else:
@@ -587,3 +658,12 @@ class Handler(object):
         upload_task_log(ctxt, logpath, img,
                         user_env['BUILD_ID'], 'languagepack')
         update_lp_status(ctxt, image_id, status, image_external_ref)
+
+    def prewarm_lp(self, ctxt, lp_uuid, external_ref):
+        lp = lp_cache.LPRef(lp_uuid, external_ref)
+        cached = self._lp_cache.checkout(
+            ctxt, lp, max_rate_kb=cfg.CONF.worker.lp_prewarm_max_rate_kb)
+        if cached is not None:
+            self._lp_cache.release(cached[0])
+            LOG.debug("Languagepack %s prewarmed, %s" %
+                      (lp_uuid, self._lp_cache.stats()))
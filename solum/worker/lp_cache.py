@@ -0,0 +1,179 @@
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Languagepack images kept on the local disk of a worker.
+
+The build scripts used to download the languagepack of every build from
+glance or swift, even when the previous build had just used it. The
+worker now downloads each languagepack image once, checks it against
+the checksum of its store and hands the local file to the scripts.
+Builds of the same languagepack wait for a single download. Images are
+evicted least recently used first once they take more than
+lp_cache_max_size_mb.
+
+Images in a docker registry are not cached here: docker keeps the
+layers it pulled.
+
+When a languagepack is built, the conductor has every worker prewarm
+its cache with it in the background, so the first app build on each
+worker does not pay for the download.
+"""
+
+import collections
+import hashlib
+import os
+import time
+
+from oslo.config import cfg
+from six.moves.urllib import request
+
+from solum.common import clients
+from solum.openstack.common import lockutils
+from solum.openstack.common import log as logging
+from solum.worker import disk_cache
+
+
+LOG = logging.getLogger(__name__)
+
+LP_CACHE_OPTS = [
+    cfg.StrOpt('lp_cache_dir',
+               default='/var/lib/solum/lp-cache',
+               help='Directory of the languagepack images shared by the '
+                    'builds of a worker. Builds download their '
+                    'languagepack when empty.'),
+    cfg.IntOpt('lp_cache_max_size_mb',
+               default=20480,
+               help='Disk space the cached languagepack images may take '
+                    'before the least recently used ones are removed.'),
+    cfg.IntOpt('lp_prewarm_max_rate_kb',
+               default=0,
+               help='Kilobytes per second a worker may spend downloading '
+                    'a languagepack it was told to prewarm, so prewarming '
+                    'does not slow down running builds. 0 means no limit.'),
+]
+
+cfg.CONF.register_opts(LP_CACHE_OPTS, group='worker')
+cfg.CONF.import_opt('image_storage', 'solum.worker.config', group='worker')
+
+READ_SIZE = 64 * 1024
+CHECKSUM_SUFFIX = '.md5'
+
+# What a cache entry is keyed by, when the languagepack row is not at hand.
+LPRef = collections.namedtuple('LPRef', ['uuid', 'external_ref'])
+
+
+class LPCache(disk_cache.DiskCache):
+    """Download languagepack images once and lease them to builds."""
+
+    side_suffixes = (CHECKSUM_SUFFIX,)
+
+    def __init__(self, base_dir=None, max_size_mb=None):
+        if base_dir is None:
+            base_dir = cfg.CONF.worker.lp_cache_dir
+        if max_size_mb is None:
+            max_size_mb = cfg.CONF.worker.lp_cache_max_size_mb
+        super(LPCache, self).__init__(base_dir, max_size_mb)
+        self.bytes_saved = 0
+
+    def path(self, lp):
+        # A rebuilt languagepack keeps its uuid but gets a new image.
+        key = '%s %s' % (lp.uuid, lp.external_ref)
+        return os.path.join(self.base_dir,
+                            hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def checkout(self, ctxt, lp, max_rate_kb=0):
+        """Get the image of languagepack lp on disk and lease it.
+
+        :param max_rate_kb: kilobytes per second the download may take,
+                            0 for no limit
+        :returns: the image path and the bytes this spared downloading,
+                  or None if the build has to download the image itself
+        """
+        storage = cfg.CONF.worker.image_storage
+        if not self.base_dir or storage not in ('glance', 'swift'):
+            return None
+        path = self.path(lp)
+        self._lease(path)
+        try:
+            with lockutils.lock('lp-cache-' + path):
+                if self._verify(path):
+                    self.hits += 1
+                    saved = self._sizes[path]
+                else:
+                    self.misses += 1
+                    self._download(ctxt, storage, lp.external_ref, path,
+                                   max_rate_kb)
+                    saved = 0
+                self._touch(path)
+        except Exception as e:
+            self.failures += 1
+            LOG.warn("Cannot cache languagepack %s, the build downloads "
+                     "it: %s" % (lp.uuid, e))
+            self.release(path)
+            return None
+        self.bytes_saved += saved
+        self._evict()
+        return path, saved
+
+    def stats(self):
+        return dict(super(LPCache, self).stats(),
+                    bytes_saved=self.bytes_saved)
+
+    def _verify(self, path):
+        """Whether path holds an image matching its recorded checksum."""
+        try:
+            with open(path + CHECKSUM_SUFFIX) as f:
+                checksum, size = f.read().split()
+        except (IOError, ValueError):
+            return False
+        if not os.path.exists(path) or os.path.getsize(path) != int(size):
+            return False
+        self._sizes.setdefault(path, int(size))
+        return True
+
+    def _download(self, ctxt, storage, external_ref, path, max_rate_kb=0):
+        if storage == 'glance':
+            glance = clients.cached_clients(ctxt).glance()
+            expected = glance.images.get(external_ref).checksum
+            chunks = glance.images.data(external_ref)
+        else:
+            response = request.urlopen(external_ref)
+            # A swift ETag is the md5 of the object.
+            expected = (response.info().get('etag') or '').strip('"')
+            chunks = iter(lambda: response.read(READ_SIZE), b'')
+
+        if not os.path.isdir(self.base_dir):
+            os.makedirs(self.base_dir)
+        tmp_path = path + disk_cache.TMP_SUFFIX
+        md5 = hashlib.md5()
+        size = 0
+        started = time.time()
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                md5.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+                if max_rate_kb:
+                    ahead = (float(size) / (max_rate_kb * 1024) -
+                             (time.time() - started))
+                    if ahead > 0:
+                        time.sleep(ahead)
+        if expected and md5.hexdigest() != expected:
+            os.remove(tmp_path)
+            raise ValueError("checksum %s does not match %s" %
+                             (md5.hexdigest(), expected))
+        self._remove(path)
+        os.rename(tmp_path, path)
+        with open(path + CHECKSUM_SUFFIX, 'w') as f:
+            f.write('%s %d\n' % (md5.hexdigest(), size))
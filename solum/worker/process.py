@@ -0,0 +1,141 @@
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Run a build stage and stream its output.
+
+The output of a build script is read line by line as it is produced and
+copied to a file next to the task log; it is never held in memory as a
+whole. The task log itself is left to the scripts, which write to it
+through TLOG. Only the lines carrying the markers the caller asked for
+(for example created_image_id) and a short tail for error reports are
+kept.
+"""
+
+import codecs
+import collections
+import errno
+import os
+import select
+import signal
+import subprocess
+import time
+
+from solum.openstack.common import log as logging
+
+
+LOG = logging.getLogger(__name__)
+
+# Longer lines are split; this bounds the memory used per stage.
+MAX_LINE_LENGTH = 64 * 1024
+TAIL_LINES = 20
+READ_SIZE = 64 * 1024
+# Appended to the task log path to name the file of the raw output.
+OUTPUT_SUFFIX = '.out'
+
+StageResult = collections.namedtuple('StageResult',
+                                     ['returncode', 'timed_out', 'markers',
+                                      'tail'])
+
+
+class _Output(object):
+    """Append the raw output lines of a stage to a file."""
+
+    def __init__(self, path):
+        try:
+            self._file = codecs.open(path, 'a', 'utf-8')
+        except IOError as e:
+            LOG.warn("Cannot write stage output %s: %s" % (path, e))
+            self._file = None
+
+    def write(self, line):
+        if self._file is not None:
+            self._file.write(line + u'\n')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def run_stage(cmd, env, logpath, task, markers=(), timeout=None):
+    """Run cmd, teeing its output to logpath + OUTPUT_SUFFIX.
+
+    :param logpath: the task log the scripts of cmd write to
+    :param task: stage name used in log messages
+    :param markers: substrings to look for; the first line containing
+                    each one is returned
+    :param timeout: seconds after which the stage and everything it
+                    started are killed; no limit if 0 or None
+    :returns: a StageResult
+    :raises: OSError or ValueError if cmd cannot be started
+    """
+    output = _Output(logpath + OUTPUT_SUFFIX)
+    found = {}
+    tail = collections.deque(maxlen=TAIL_LINES)
+
+    def handle(line):
+        output.write(line)
+        tail.append(line)
+        for marker in markers:
+            if marker in line and marker not in found:
+                found[marker] = line
+
+    # A session of its own lets a timeout kill the whole build.
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE,
+                            preexec_fn=os.setsid)
+    deadline = time.time() + timeout if timeout else None
+    timed_out = False
+    decoder = codecs.getincrementaldecoder('utf-8')('replace')
+    fd = proc.stdout.fileno()
+    partial = u''
+    try:
+        while True:
+            wait = None
+            if deadline is not None:
+                wait = deadline - time.time()
+                if wait <= 0:
+                    timed_out = True
+                    break
+            ready, _, _ = select.select([fd], [], [], wait)
+            if not ready:
+                continue
+            chunk = os.read(fd, READ_SIZE)
+            if not chunk:
+                break
+            lines = (partial + decoder.decode(chunk)).split(u'\n')
+            partial = lines.pop()
+            for line in lines:
+                handle(line.rstrip(u'\r'))
+            while len(partial) > MAX_LINE_LENGTH:
+                handle(partial[:MAX_LINE_LENGTH])
+                partial = partial[MAX_LINE_LENGTH:]
+        partial += decoder.decode(b'', final=True)
+        if partial and not timed_out:
+            handle(partial.rstrip(u'\r'))
+    finally:
+        output.close()
+        proc.stdout.close()
+
+    if timed_out:
+        LOG.error("%s stage timed out after %s seconds, killing it" %
+                  (task, timeout))
+        _kill(proc)
+    return StageResult(proc.wait(), timed_out, found, list(tail))
+
+
+def _kill(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError as e:
+        if e.errno != errno.ESRCH:
+            raise
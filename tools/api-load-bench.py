@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# Copyright 2014 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""
+Measure solum-api throughput, e.g. to compare [api] workers settings.
+
+    tools/api-load-bench.py --url http://127.0.0.1:9777/v1/assemblies \
+        --concurrency 50 --requests 5000 --token $OS_AUTH_TOKEN
+"""
+
+import argparse
+import threading
+import time
+
+import httplib2
+
+
+def _client(url, headers, count, results):
+    conn = httplib2.Http()
+    for _ in range(count):
+        start = time.time()
+        try:
+            resp, _body = conn.request(url, 'GET', headers=headers)
+            ok = resp.status < 500
+        except Exception:
+            ok = False
+        results.append((ok, time.time() - start))
+
+
+def main(args):
+    headers = {}
+    if args.token:
+        headers['X-Auth-Token'] = args.token
+    per_client = max(1, args.requests // args.concurrency)
+    results = []
+    threads = [threading.Thread(target=_client,
+                                args=(args.url, headers, per_client, results))
+               for _ in range(args.concurrency)]
+    start = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - start
+
+    latencies = sorted(lat for ok, lat in results)
+    failed = len([ok for ok, lat in results if not ok])
+    print('requests:    %d (%d failed)' % (len(results), failed))
+    print('elapsed:     %.2fs' % elapsed)
+    print('req/sec:     %.1f' % (len(results) / elapsed))
+    print('p50 latency: %.1fms' % (latencies[len(latencies) // 2] * 1000))
+    print('p99 latency: %.1fms' % (latencies[int(len(latencies) * 0.99)] *
+                                   1000))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', default='http://127.0.0.1:9777/v1')
+    parser.add_argument('--token', default=None)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=2000)
+    main(parser.parse_args())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""
+Time the hot object lookups against a large seeded database, with and
+without the lookup indexes.
+
+    tools/db-lookup-bench.py --rows 500000 \
+        --connection sqlite:////tmp/solum-bench.sqlite
+"""
+
+import argparse
+import datetime
+import time
+import uuid
+
+from oslo.config import cfg
+from oslo.db import options
+
+from solum.common import context
+from solum import objects
+from solum.objects.sqlalchemy import models
+
+
+def _seed(engine, rows):
+    registry = objects.registry
+    now = datetime.datetime.utcnow()
+    plans = [{'id': 1, 'uuid': str(uuid.uuid4()), 'project_id': 'p0'}]
+    engine.execute(registry.Plan.__table__.insert(), plans)
+    batch = 10000
+    for start in range(0, rows, batch):
+        count = min(batch, rows - start)
+        engine.execute(registry.Image.__table__.insert(), [
+            {'uuid': str(uuid.uuid4()), 'name': 'lp%d' % (start + i),
+             'project_id': 'p%d' % ((start + i) % 100),
+             'artifact_type': 'language_pack'} for i in range(count)])
+        engine.execute(registry.Userlog.__table__.insert(), [
+            {'resource_uuid': str(uuid.uuid4()), 'created_at': now,
+             'project_id': 'p%d' % ((start + i) % 100)}
+            for i in range(count)])
+        engine.execute(registry.Assembly.__table__.insert(), [
+            {'uuid': str(uuid.uuid4()), 'trigger_id': str(uuid.uuid4()),
+             'plan_id': 1, 'project_id': 'p%d' % ((start + i) % 100)}
+            for i in range(count)])
+
+
+def _time(label, fn, repeat):
+    start = time.time()
+    for _ in range(repeat):
+        fn()
+    print('%-32s %8.3fms' % (label, (time.time() - start) * 1000 / repeat))
+
+
+def _run_lookups(engine, repeat):
+    registry = objects.registry
+    ctxt = context.RequestContext(tenant='p7')
+    img = engine.execute('SELECT uuid, name FROM image LIMIT 1 '
+                         'OFFSET 7').fetchone()
+    assem = engine.execute('SELECT uuid, trigger_id FROM assembly '
+                           'LIMIT 1 OFFSET 7').fetchone()
+    log = engine.execute('SELECT resource_uuid FROM userlogs '
+                         'LIMIT 1 OFFSET 7').fetchone()
+    _time('Image.get_by_uuid', lambda: registry.Image.get_by_uuid(
+        ctxt, img[0]), repeat)
+    _time('Image.get_by_name', lambda: registry.Image.get_by_name(
+        ctxt, img[1]), repeat)
+    _time('Assembly.get_by_trigger_id',
+          lambda: registry.Assembly.get_by_trigger_id(ctxt, assem[1]),
+          repeat)
+    _time('UserlogList.get_all_by_id',
+          lambda: registry.UserlogList.get_all_by_id(ctxt, log[0]), repeat)
+
+
+def main(args):
+    cfg.CONF([], project='solum')
+    options.set_defaults(cfg.CONF, connection=args.connection)
+    objects.load()
+    engine = objects.IMPL.get_engine()
+    models.Base.metadata.create_all(engine)
+    _seed(engine, args.rows)
+
+    print('--- with lookup indexes')
+    _run_lookups(engine, args.repeat)
+
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.drop(engine)
+    print('--- without lookup indexes')
+    _run_lookups(engine, args.repeat)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connection',
+                        default='sqlite:////tmp/solum-bench.sqlite')
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--repeat', type=int, default=100)
+    main(parser.parse_args())
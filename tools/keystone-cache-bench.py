@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""
+Count the Keystone round-trips of the client lookups a build makes, with
+and without the endpoint and client caches, against a stub Keystone.
+
+    tools/keystone-cache-bench.py --builds 100 --tenants 5
+"""
+
+import argparse
+
+import mock
+from oslo.config import cfg
+
+from solum.common import cache
+from solum.common import clients
+from solum.common import context
+
+
+class StubKeystone(object):
+    """Counts what would have been requests to Keystone."""
+
+    calls = 0
+
+    def __init__(self, **kwargs):
+        self.auth_ref = mock.Mock()
+        self.auth_ref.will_expire_soon.return_value = False
+        self.auth_token = kwargs.get('token')
+        self.service_catalog = mock.Mock()
+        self.service_catalog.url_for.side_effect = (
+            lambda **kw: 'http://%s' % kw['service_type'])
+
+    def authenticate(self):
+        StubKeystone.calls += 1
+
+
+def _build(ctxt):
+    # What one build asks for: the image and object store URLs of the
+    # build environment, the log upload and the deploy.
+    osc = clients.cached_clients(ctxt)
+    osc.url_for(service_type='image', endpoint_type='publicURL')
+    osc.url_for(service_type='object-store', endpoint_type='publicURL',
+                region_name='RegionOne')
+    clients.cached_clients(ctxt).url_for(service_type='object-store',
+                                         endpoint_type='publicURL',
+                                         region_name='RegionOne')
+    clients.cached_clients(ctxt).url_for(service_type='orchestration',
+                                         endpoint_type='publicURL',
+                                         region_name='RegionOne')
+
+
+def _run(label, builds, tenants):
+    cache.clear_all()
+    StubKeystone.calls = 0
+    for i in range(builds):
+        tenant = 't%d' % (i % tenants)
+        ctxt = context.RequestContext(auth_token='token-%s' % tenant,
+                                      tenant=tenant,
+                                      auth_url='http://keystone/v2.0')
+        _build(ctxt)
+    print('%-16s %6d Keystone round-trips, %.2f per build' %
+          (label, StubKeystone.calls, float(StubKeystone.calls) / builds))
+
+
+def main(args):
+    cfg.CONF([], project='solum')
+    with mock.patch('keystoneclient.v3.client.Client', StubKeystone):
+        cfg.CONF.set_override('catalog_cache_ttl', 0)
+        cfg.CONF.set_override('client_cache_ttl', 0)
+        _run('without caches', args.builds, args.tenants)
+        cfg.CONF.clear_override('catalog_cache_ttl')
+        cfg.CONF.clear_override('client_cache_ttl')
+        _run('with caches', args.builds, args.tenants)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--builds', type=int, default=100)
+    parser.add_argument('--tenants', type=int, default=5)
+    main(parser.parse_args())
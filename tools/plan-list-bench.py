@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""
+Time PlanList.get_all over many plans, reading only the plan uuids or
+rendering raw_content as well, with the documents stored as JSON and as
+legacy YAML.
+
+    tools/plan-list-bench.py --plans 10000
+"""
+
+import argparse
+import time
+import uuid
+
+from oslo.config import cfg
+from oslo.db import options
+
+from solum.common import context
+from solum.common import yamlutils
+from solum import objects
+from solum.objects.sqlalchemy import models
+
+RAW_CONTENT = {
+    'version': 1,
+    'name': 'ex1',
+    'description': 'Nodejs express.',
+    'artifacts': [{'name': 'nodeus',
+                   'artifact_type': 'heroku',
+                   'content': {'href': 'https://github.com/a/nodejs.git',
+                               'private': False},
+                   'language_pack': 'auto',
+                   'unittest_cmd': 'npm test',
+                   'ports': [80, 443]}],
+}
+
+
+def _seed(plans, encode):
+    table = objects.registry.Plan.__table__
+    objects.IMPL.get_engine().execute(table.delete())
+    objects.IMPL.get_engine().execute(table.insert(), [
+        {'uuid': str(uuid.uuid4()), 'project_id': 'p0',
+         'name': 'plan%d' % i, 'raw_content': encode(RAW_CONTENT)}
+        for i in range(plans)])
+
+
+def _run(label, render):
+    ctxt = context.RequestContext(tenant='p0')
+    start = time.time()
+    for p in objects.registry.PlanList.get_all(ctxt):
+        p.uuid
+        if render:
+            p.raw_content
+    print('%-24s %8.3fs' % (label, time.time() - start))
+
+
+def main(args):
+    cfg.CONF([], project='solum')
+    options.set_defaults(cfg.CONF, connection=args.connection)
+    objects.load()
+    models.Base.metadata.create_all(objects.IMPL.get_engine())
+
+    for fmt, encode in (('json', models.dump_dict),
+                        ('yaml', yamlutils.dump)):
+        _seed(args.plans, encode)
+        _run('%s, uuids only' % fmt, False)
+        _run('%s, rendered' % fmt, True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connection',
+                        default='sqlite:////tmp/solum-bench.sqlite')
+    parser.add_argument('--plans', type=int, default=10000)
+    main(parser.parse_args())
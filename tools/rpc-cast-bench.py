@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""
+Measure casts per second through the conductor API, building a transport
+and client for every cast as before, and with the shared ones. Uses the
+in-memory fake driver, so only the client side cost is measured.
+
+    tools/rpc-cast-bench.py --casts 5000
+"""
+
+import argparse
+import os
+import time
+
+from oslo.config import cfg
+from oslo import messaging
+
+from solum.common import context
+from solum.common.rpc import service
+from solum.conductor import api
+
+
+def _run(label, make_api, casts):
+    ctxt = context.RequestContext(auth_token='a' * 32, tenant='fake_project')
+    start = time.time()
+    for i in range(casts):
+        make_api(ctxt).update_assembly(i, {'status': 'BUILDING'})
+    print('%-8s %10.0f casts/s' % (label, casts / (time.time() - start)))
+
+
+def main(args):
+    cfg.CONF([], project='solum')
+    cfg.CONF.set_override('update_batch_window', 0, group='conductor')
+
+    def per_cast(ctxt):
+        transport = messaging.get_transport(
+            cfg.CONF, url='fake:', aliases=service.TRANSPORT_ALIASES)
+        return api.API(transport=transport, context=ctxt)
+
+    _run('before', per_cast, args.casts)
+
+    service._transport = messaging.get_transport(cfg.CONF, url='fake:')
+    service._transport_pid = os.getpid()
+    _run('after', lambda ctxt: api.API(context=ctxt), args.casts)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--casts', type=int, default=5000)
+    main(parser.parse_args())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# Copyright 2015 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""
+Measure the size and the serialize/deserialize time of the request
+context sent with every RPC message, in the full and compact formats.
+
+    tools/rpc-context-bench.py --services 30 --repeat 10000
+"""
+
+import argparse
+import time
+
+from oslo.config import cfg
+
+from solum.common import context
+from solum.common.rpc import service
+from solum.openstack.common import jsonutils
+
+
+def _token_info(services):
+    endpoints = [{'interface': interface, 'region': 'RegionOne',
+                  'url': 'http://10.0.0.1:%d/v1/fake_project' % (8000 + i),
+                  'id': '%032x' % i}
+                 for i in range(services)
+                 for interface in ('public', 'internal', 'admin')]
+    catalog = [{'type': 'service%d' % i, 'id': '%032x' % i,
+                'endpoints': endpoints[i * 3:i * 3 + 3]}
+               for i in range(services)]
+    return {'token': {'catalog': catalog,
+                      'expires_at': '2015-01-01T00:00:00.000000Z',
+                      'project': {'id': 'fake_project', 'name': 'demo'},
+                      'roles': [{'id': 'r1', 'name': 'Member'}],
+                      'user': {'id': 'fake_user', 'name': 'demo'}}}
+
+
+def _run(label, ctxt, repeat):
+    serializer = service.RequestContextSerializer()
+    start = time.time()
+    for _ in range(repeat):
+        msg = jsonutils.dumps(serializer.serialize_context(ctxt))
+        serializer.deserialize_context(jsonutils.loads(msg))
+    elapsed = (time.time() - start) * 1000000 / repeat
+    print('%-8s %8d bytes %10.1fus per round trip' %
+          (label, len(msg), elapsed))
+
+
+def main(args):
+    cfg.CONF([], project='solum')
+    token_info = _token_info(args.services)
+    ctxt = context.RequestContext(auth_token='a' * 32, user='fake_user',
+                                  tenant='fake_project',
+                                  auth_url='http://10.0.0.1:5000/v3',
+                                  roles=['Member'],
+                                  auth_token_info=token_info)
+    context.remember_token_info(ctxt.auth_token, token_info, 3600)
+
+    cfg.CONF.set_override('compact_rpc_context', False)
+    _run('full', ctxt, args.repeat)
+    cfg.CONF.set_override('compact_rpc_context', True)
+    _run('compact', ctxt, args.repeat)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--services', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=10000)
+    main(parser.parse_args())